@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+配置加载基准测试
+
+生成包含 N 个用户、M 本书的多用户配置文件，测量 ConfigManager 完整加载耗时，
+并分别统计 YAML 解析与配置模式（标量配置项）解析的耗时。
+--pure-yaml 强制使用纯 Python 的 YAML 解析器，用于对比 libyaml 带来的差异。
+
+示例：
+    python benchmarks/bench_config_load.py --users 1000 --books 200
+    python benchmarks/bench_config_load.py --users 1000 --books 200 --pure-yaml
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weread_bot import config_manager  # noqa: E402
+from weread_bot.config_manager import ConfigManager  # noqa: E402
+from weread_bot.config_schema import resolve_schema  # noqa: E402
+
+
+def build_config_data(users: int, books: int, chapters: int) -> dict:
+    return {
+        "app": {"startup_mode": "daemon", "max_concurrent_users": 8},
+        "reading": {
+            "mode": "smart_random",
+            "books": [
+                {
+                    "name": f"书籍{i}",
+                    "book_id": f"{i:08d}",
+                    "chapters": [{"chapter_id": f"c{i}_{j}", "chapter_index": j} for j in range(chapters)],
+                }
+                for i in range(books)
+            ],
+        },
+        "daemon": {"enabled": True, "continuous": True},
+        "curl_config": {
+            "users": [
+                {"name": f"user{i:05d}", "file_path": f"curl/user{i:05d}.txt", "schedule": "0 * * * *"}
+                for i in range(users)
+            ]
+        },
+    }
+
+
+def measure(func, repeat: int) -> float:
+    """多次执行取中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="配置加载基准测试")
+    parser.add_argument("--users", type=int, default=1000, help="用户数")
+    parser.add_argument("--books", type=int, default=200, help="书籍数")
+    parser.add_argument("--chapters", type=int, default=30, help="每本书的章节数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取中位数）")
+    parser.add_argument("--pure-yaml", action="store_true", help="使用纯 Python 的 YAML 解析器")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.pure_yaml:
+        config_manager._YAML_LOADER = yaml.SafeLoader
+    loader = config_manager._yaml_loader()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.yaml"
+        data = build_config_data(args.users, args.books, args.chapters)
+        path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+        text = path.read_text(encoding="utf-8")
+
+        def load():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return ConfigManager(str(path)).config
+
+        config = load()
+        total_ms = measure(load, args.repeat)
+
+        def parse_yaml():
+            with open(path, "r", encoding="utf-8") as f:
+                return yaml.load(f, Loader=loader)
+
+        yaml_ms = measure(parse_yaml, args.repeat)
+        schema_ms = measure(lambda: resolve_schema(data), max(args.repeat, 100))
+
+    print("📊 配置加载基准测试结果")
+    print(f"📄 配置文件: {len(text) / 1024:.0f} KB, {len(config.users)} 个用户, {len(config.reading.books)} 本书")
+    print(f"🧩 YAML解析器: {loader.__name__}")
+    print(f"⏱️ 完整加载: {total_ms:.2f} 毫秒")
+    print(f"📖 YAML解析: {yaml_ms:.2f} 毫秒")
+    print(f"⚙️  配置项解析: {schema_ms * 1000:.1f} 微秒")
+    print(f"👥 每用户: {total_ms * 1000 / max(1, len(config.users)):.1f} 微秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+calculate_hash 微基准测试与等价性校验
+
+1. 随机生成大量字符串（含空串、单字符、ASCII、中文、emoji 及边界长度），
+   校验 calculate_hash、calculate_hash_many 与逐字符循环的原始实现逐位一致；
+2. 对比原始实现、calculate_hash 和 calculate_hash_many 的吞吐量。
+
+calculate_hash_many 在安装了 NumPy 时使用数组运算，否则回退为逐个计算。
+
+示例：
+    python benchmarks/bench_hash.py --cases 20000 --batch 5000 --length 380
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_signing import reference_calculate_hash  # noqa: E402
+from weread_bot import utils  # noqa: E402
+from weread_bot.utils import calculate_hash, calculate_hash_many  # noqa: E402
+
+
+ALPHABETS = (
+    string.ascii_letters + string.digits + "%=&-_.~",
+    string.printable,
+    "阅读微信书籍章节" + string.ascii_lowercase,
+    "\x00\x7f\xffĀ￿\U0001f389\U0010ffff",
+)
+EDGE_LENGTHS = (0, 1, 2, 3, 14, 15, 16, 29, 30, 31, 59, 60, 61)
+
+
+def random_string(rng: random.Random) -> str:
+    length = rng.choice(EDGE_LENGTHS) if rng.random() < 0.3 else rng.randint(0, 1200)
+    alphabet = rng.choice(ALPHABETS)
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def check_equivalence(cases: int, seed: int) -> int:
+    """随机化等价性校验，返回不一致的数量"""
+    rng = random.Random(seed)
+    samples = [random_string(rng) for _ in range(cases)]
+    expected = [reference_calculate_hash(s) for s in samples]
+
+    mismatches = sum(1 for s, e in zip(samples, expected) if calculate_hash(s) != e)
+    batch = calculate_hash_many(samples)
+    mismatches += sum(1 for b, e in zip(batch, expected) if b != e)
+    # 乱序和小批量也必须一致
+    for size in (1, 2, 7, 1025):
+        chunk = samples[:size]
+        mismatches += sum(1 for b, e in zip(calculate_hash_many(chunk), expected[:size]) if b != e)
+    return mismatches
+
+
+def bench(label: str, func, payloads, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payloads)
+        best = min(best, time.perf_counter() - start)
+    rate = len(payloads) / best
+    print(f"{label:<24} {rate:>12,.0f} 次/秒  ({best * 1e6 / len(payloads):.2f} 微秒/次)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="calculate_hash 微基准测试与等价性校验")
+    parser.add_argument("--cases", type=int, default=20000, help="等价性校验的随机用例数")
+    parser.add_argument("--batch", type=int, default=5000, help="吞吐量测试的字符串数量")
+    parser.add_argument("--length", type=int, default=380, help="吞吐量测试的字符串长度（接近阅读请求编码后长度）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    np = utils.load_numpy()
+    print(f"🧮 NumPy: {'已安装 ' + np.__version__ if np is not None else '未安装（calculate_hash_many 回退为逐个计算）'}")
+
+    mismatches = check_equivalence(args.cases, args.seed)
+    if mismatches:
+        print(f"❌ 结果不一致: {mismatches} 处")
+        sys.exit(1)
+    print(f"✅ {args.cases} 个随机用例结果一致")
+
+    rng = random.Random(args.seed)
+    alphabet = ALPHABETS[0]
+    payloads = ["".join(rng.choice(alphabet) for _ in range(args.length)) for _ in range(args.batch)]
+
+    reference_rate = bench("原始逐字符循环", lambda items: [reference_calculate_hash(s) for s in items], payloads, args.repeat)
+    scalar_rate = bench("calculate_hash", lambda items: [calculate_hash(s) for s in items], payloads, args.repeat)
+    batch_rate = bench("calculate_hash_many", calculate_hash_many, payloads, args.repeat)
+    print(f"🚀 相对原始实现: calculate_hash {scalar_rate / reference_rate:.1f}x, calculate_hash_many {batch_rate / reference_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+阅读循环离线基准测试
+
+在独立进程中启动本地模拟服务器，使用 N 个模拟用户驱动 WeReadSessionManager，
+压缩启动延迟和阅读间隔后完整跑完阅读会话，报告：
+  - 吞吐量（请求/秒）
+  - 每个请求消耗的CPU时间（仅被测进程）
+  - 每个用户的峰值内存（tracemalloc）
+  - 请求延迟分位数（p50/p95/p99/max）
+
+示例：
+    python benchmarks/bench_read_loop.py --users 50 --reads-per-user 60 --latency-ms 2-10
+    python benchmarks/bench_read_loop.py --json result.json
+    python benchmarks/bench_read_loop.py --baseline result.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from mock_server import (  # noqa: E402
+    FIX_SYNCKEY_PATH,
+    READ_PATH,
+    RENEW_PATH,
+    STATS_PATH,
+    MockOptions,
+    start_in_process,
+)
+from weread_bot.config import UserConfig, WeReadConfig  # noqa: E402
+from weread_bot.http_client import HttpConnectionPool  # noqa: E402
+from weread_bot.session import WeReadSessionManager  # noqa: E402
+
+
+# 基线对比时认为"越大越好"与"越小越好"的指标
+HIGHER_IS_BETTER = ("requests_per_sec",)
+LOWER_IS_BETTER = ("cpu_ms_per_request", "latency_p99_ms")
+
+
+def build_curl(index: int) -> str:
+    """生成模拟用户的CURL命令"""
+    now = int(time.time())
+    data = {
+        "appId": f"wb18262600000{index:04d}",
+        "b": "bench_book_0001",
+        "c": f"bench_chapter_{index % 10:04d}",
+        "ci": 1,
+        "co": 0,
+        "sm": "",
+        "pr": 1,
+        "rt": 30,
+        "ts": now * 1000,
+        "rn": 1,
+        "sg": "0" * 64,
+        "ct": now,
+        "ps": f"ps{index:08d}",
+        "pc": f"pc{index:08d}",
+    }
+    return (
+        "curl 'https://weread.qq.com/web/book/read' "
+        "-H 'accept: application/json, text/plain, */*' "
+        f"-H 'cookie: wr_vid={100000 + index}; wr_skey=bench{index:04d}; wr_rt=bench' "
+        f"--data-raw '{json.dumps(data)}'"
+    )
+
+
+def build_config(args: argparse.Namespace) -> WeReadConfig:
+    """构建压缩时间间隔的基准测试配置"""
+    config = WeReadConfig()
+    config.startup_delay = "0"
+    config.reading.target_duration = "1"
+    config.reading.reading_interval = args.interval
+    config.network.timeout = 10
+    config.network.rate_limit = 0
+    config.network.retry_delay = "0.01-0.05"
+    config.network.retry_max_delay = 1
+    config.network.max_connections = args.max_connections
+    config.network.max_keepalive_connections = args.max_connections
+    config.users = [UserConfig(name=f"bench{i:04d}", content=build_curl(i)) for i in range(args.users)]
+    return config
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_benchmark(args: argparse.Namespace, base_url: str) -> Dict[str, object]:
+    config = build_config(args)
+    latencies: List[float] = []
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    pool = HttpConnectionPool.from_network_config(config.network)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        managers = []
+        for user in config.users:
+            manager = WeReadSessionManager(config, user, http_pool=pool)
+            manager.READ_URL = base_url + READ_PATH
+            manager.RENEW_URL = base_url + RENEW_PATH
+            manager.FIX_SYNCKEY_URL = base_url + FIX_SYNCKEY_PATH
+            record = manager.http_client._record_request_time
+
+            def _record(elapsed: float, _record=record):
+                latencies.append(elapsed)
+                _record(elapsed)
+
+            manager.http_client._record_request_time = _record
+            managers.append(manager)
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        results = await asyncio.gather(
+            *(manager.start_reading_session() for manager in managers), return_exceptions=True
+        )
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    peak_memory = 0
+    if args.tracemalloc:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    pool_stats = pool.get_stats()
+    await pool.close()
+
+    async with httpx.AsyncClient() as client:
+        server_stats = (await client.get(base_url + STATS_PATH)).json()
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    sessions = [r for r in results if not isinstance(r, BaseException)]
+    requests = len(latencies)
+    latencies.sort()
+
+    return {
+        "users": args.users,
+        "requests": requests,
+        "server_requests": server_stats["total_requests"],
+        "wall_seconds": round(wall, 3),
+        "requests_per_sec": round(requests / wall, 1) if wall else 0.0,
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 3) if requests else 0.0,
+        "peak_memory_kb_per_user": round(peak_memory / 1024 / args.users, 1) if args.tracemalloc else None,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "latency_max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+        "successful_reads": sum(s.successful_reads for s in sessions),
+        "failed_reads": sum(s.failed_reads for s in sessions),
+        "failed_sessions": len(failures),
+        "new_connections": pool_stats["new_connections"],
+        "server_responses": server_stats["responses"],
+    }
+
+
+def compare_with_baseline(result: Dict[str, object], baseline: Dict[str, object], max_regression: float) -> List[str]:
+    """与基线结果对比，返回超出允许回退幅度的指标说明"""
+    regressions = []
+    for key in HIGHER_IS_BETTER:
+        if baseline.get(key) and result[key] < baseline[key] * (1 - max_regression):
+            regressions.append(f"{key}: {result[key]} < 基线 {baseline[key]}")
+    for key in LOWER_IS_BETTER:
+        if baseline.get(key) and result[key] > baseline[key] * (1 + max_regression):
+            regressions.append(f"{key}: {result[key]} > 基线 {baseline[key]}")
+    return regressions
+
+
+def print_report(result: Dict[str, object]):
+    memory = result["peak_memory_kb_per_user"]
+    print("📊 阅读循环基准测试结果")
+    print(f"👥 用户数: {result['users']}, 会话失败: {result['failed_sessions']}")
+    print(f"🌐 请求数: {result['requests']} (服务器收到 {result['server_requests']}), 新建连接 {result['new_connections']} 次")
+    print(f"✅ 成功阅读: {result['successful_reads']}, ❌ 失败阅读: {result['failed_reads']}")
+    print(f"⏱️ 总耗时: {result['wall_seconds']} 秒")
+    print(f"🚀 吞吐量: {result['requests_per_sec']} 请求/秒")
+    print(f"🧮 CPU: {result['cpu_ms_per_request']} 毫秒/请求")
+    print(f"💾 峰值内存: {memory} KB/用户" if memory is not None else "💾 峰值内存: 未统计 (--no-tracemalloc)")
+    print(
+        f"📈 延迟: p50 {result['latency_p50_ms']}ms, p95 {result['latency_p95_ms']}ms, "
+        f"p99 {result['latency_p99_ms']}ms, max {result['latency_max_ms']}ms"
+    )
+    print(f"🧪 服务器响应分布: {result['server_responses']}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="阅读循环离线基准测试")
+    parser.add_argument("--users", type=int, default=20, help="模拟用户数")
+    parser.add_argument("--reads-per-user", type=int, default=60, help="每个用户完成会话所需的成功阅读次数")
+    parser.add_argument("--interval", default="0", help="阅读间隔（秒），支持区间，如 0-0.05")
+    parser.add_argument("--max-connections", type=int, default=100, help="共享连接池最大连接数")
+    parser.add_argument("--latency-ms", default="0", help="模拟服务器响应延迟（毫秒），支持区间")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟服务器返回 HTTP 500 的概率")
+    parser.add_argument("--missing-synckey-rate", type=float, default=0.0, help="成功响应缺失 synckey 的概率")
+    parser.add_argument("--reject-s-rate", type=float, default=0.0, help="拒绝携带 s 字段的阅读请求的概率")
+    parser.add_argument("--seed", type=int, default=None, help="模拟服务器随机种子")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false", help="不统计内存（tracemalloc 会增加CPU开销）")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    parser.add_argument("--baseline", help="基线结果JSON文件，超出回退幅度时以非零状态退出")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="允许的最大回退比例")
+    parser.add_argument("--verbose", action="store_true", help="显示会话日志")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    options = MockOptions(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        missing_synckey_rate=args.missing_synckey_rate,
+        reject_s_rate=args.reject_s_rate,
+        add_time=max(1, math.ceil(60 / max(1, args.reads_per_user))),
+        seed=args.seed,
+    )
+    process, base_url = start_in_process(options)
+    try:
+        result = asyncio.run(run_benchmark(args, base_url))
+    finally:
+        process.terminate()
+        process.join()
+
+    print_report(result)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 结果已写入: {args.json_path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(result, baseline, args.max_regression)
+        if regressions:
+            print("❌ 性能回退超出允许范围:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ 未发现超出允许范围的性能回退")
+
+
+if __name__ == "__main__":
+    main()
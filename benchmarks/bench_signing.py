@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+阅读请求签名基准测试
+
+对比原始实现（每次排序并 URL 编码全部字段 + 逐字符循环的 calculate_hash + SHA-256）与
+ReadPayloadSigner 的签名速度，并校验两者结果完全一致。
+
+示例：
+    python benchmarks/bench_signing.py --users 1000 --rounds 5
+"""
+import argparse
+import hashlib
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from weread_bot.session import WeReadSessionManager  # noqa: E402
+from weread_bot.signing import ReadPayloadSigner  # noqa: E402
+from weread_bot.utils import calculate_hash, encode_data  # noqa: E402
+
+
+KEY = WeReadSessionManager.KEY
+
+
+def reference_calculate_hash(input_string: str) -> str:
+    """逐字符循环的原始 calculate_hash 实现，作为正确性和速度基准"""
+    _7032f5 = 0x15051505
+    _cc1055 = _7032f5
+    length = len(input_string)
+    _19094e = length - 1
+
+    while _19094e > 0:
+        char_code = ord(input_string[_19094e])
+        shift_amount = (length - _19094e) % 30
+        _7032f5 = 0x7FFFFFFF & (_7032f5 ^ char_code << shift_amount)
+
+        prev_char_code = ord(input_string[_19094e - 1])
+        prev_shift_amount = _19094e % 30
+        _cc1055 = 0x7FFFFFFF & (_cc1055 ^ prev_char_code << prev_shift_amount)
+        _19094e -= 2
+
+    return hex(_7032f5 + _cc1055)[2:].lower()
+
+
+def build_payloads(users: int) -> List[Dict[str, object]]:
+    payloads = []
+    for index in range(users):
+        data = WeReadSessionManager.DEFAULT_DATA.copy()
+        data.pop("s", None)
+        data.update(
+            {
+                "appId": f"wb18262600000{index:04d}",
+                "b": f"{random.getrandbits(80):020x}",
+                "c": f"{random.getrandbits(80):020x}",
+                "ci": random.randint(1, 200),
+                "co": 0,
+                "sm": "[插图]第一章 测试章节内容摘要",
+                "pr": 1,
+                "ps": f"{random.getrandbits(64):016x}",
+                "pc": f"{random.getrandbits(64):016x}",
+            }
+        )
+        payloads.append(data)
+    return payloads
+
+
+def sign_legacy(item, last_time: int, current_time: int) -> str:
+    """原始签名流程（与重构前的 _simulate_reading_request 相同）"""
+    data, _ = item
+    data["ct"] = current_time
+    data["rt"] = current_time - last_time
+    data["ts"] = int(current_time * 1000) + random.randint(0, 1000)
+    data["rn"] = random.randint(0, 1000)
+    signature_string = f"{data['ts']}{data['rn']}{KEY}"
+    data["sg"] = hashlib.sha256(signature_string.encode()).hexdigest()
+    return reference_calculate_hash(encode_data(data))
+
+
+def sign_fast(item, last_time: int, current_time: int) -> str:
+    data, signer = item
+    signer.stamp(data, last_time, current_time)
+    return signer.signature(data)
+
+
+def run(label: str, items, rounds: int, sign) -> float:
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        now = int(time.time()) + round_index
+        for item in items:
+            sign(item, now - 30, now)
+    elapsed = time.perf_counter() - start
+    rate = len(items) * rounds / elapsed
+    print(f"{label:<10} {rate:>12,.0f} 签名/秒  ({elapsed * 1e6 / (len(items) * rounds):.1f} 微秒/次)")
+    return rate
+
+
+def verify(payloads, signers) -> int:
+    """校验 ReadPayloadSigner 与 encode_data + calculate_hash 完全一致"""
+    mismatches = 0
+    now = int(time.time())
+    for data, signer in zip(payloads, signers):
+        signer.stamp(data, now - 30, now)
+        encoded = encode_data(data)
+        if signer.encode(data) != encoded or signer.signature(data) != reference_calculate_hash(encoded):
+            mismatches += 1
+        if calculate_hash(encoded) != reference_calculate_hash(encoded):
+            mismatches += 1
+        # 换章后缓存必须失效
+        data["c"] = f"{random.getrandbits(80):020x}"
+        if signer.signature(data) != reference_calculate_hash(encode_data(data)):
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="阅读请求签名基准测试")
+    parser.add_argument("--users", type=int, default=1000, help="模拟用户数")
+    parser.add_argument("--rounds", type=int, default=5, help="每个用户签名轮数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    payloads = build_payloads(args.users)
+    signers = [ReadPayloadSigner(KEY) for _ in payloads]
+
+    mismatches = verify([dict(p) for p in payloads], signers)
+    if mismatches:
+        print(f"❌ 签名结果不一致: {mismatches} 处")
+        sys.exit(1)
+    print(f"✅ 签名结果一致（{args.users} 个用户）")
+
+    legacy_rate = run("原始实现", [(dict(p), None) for p in payloads], args.rounds, sign_legacy)
+    fast_rate = run("签名引擎", [(dict(p), s) for p, s in zip(payloads, signers)], args.rounds, sign_fast)
+    print(f"🚀 加速比: {fast_rate / legacy_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
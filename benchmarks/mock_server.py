@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+微信读书接口本地模拟服务器（仅用于基准测试）
+
+模拟 /web/book/read、/web/login/renewal、/web/book/chapterInfos 三个接口，
+支持 HTTP/1.1 keep-alive，可配置延迟、错误率、缺失 synckey 概率以及拒绝 s 字段的概率。
+
+单独运行：
+    python benchmarks/mock_server.py --port 8080 --latency-ms 5-20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import secrets
+import urllib.parse
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+
+READ_PATH = "/web/book/read"
+RENEW_PATH = "/web/login/renewal"
+FIX_SYNCKEY_PATH = "/web/book/chapterInfos"
+STATS_PATH = "/__stats"
+
+REASONS = {200: "OK", 404: "Not Found", 500: "Internal Server Error"}
+
+
+@dataclass
+class MockOptions:
+    """模拟服务器行为参数"""
+    host: str = "127.0.0.1"
+    port: int = 0
+    latency_ms: str = "0"
+    error_rate: float = 0.0
+    missing_synckey_rate: float = 0.0
+    reject_s_rate: float = 0.0
+    add_time: int = 30
+    seed: Optional[int] = None
+
+
+def _parse_range(value: str) -> Tuple[float, float]:
+    if "-" in value:
+        low, high = value.split("-", 1)
+        return float(low), float(high)
+    return float(value), float(value)
+
+
+class MockWeReadServer:
+    """微信读书接口模拟服务器"""
+
+    def __init__(self, options: MockOptions = None):
+        self.options = options or MockOptions()
+        self._latency = _parse_range(self.options.latency_ms)
+        self._random = random.Random(self.options.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._synckey = 0
+        self.requests: Counter = Counter()
+        self.responses: Counter = Counter()
+        self.connections = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.options.host}:{self.options.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.options.host, self.options.port)
+        self.options.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "connections": self.connections,
+            "requests": dict(self.requests),
+            "responses": dict(self.responses),
+            "total_requests": sum(self.requests.values()),
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0") or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                parts = request_line.decode("latin-1").split()
+                path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+                status, payload, extra_headers = await self._route(path, headers, body)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                head.extend(f"{name}: {value}" for name, value in extra_headers)
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, path: str, headers: Dict[str, str], body: bytes):
+        if path == STATS_PATH:
+            return 200, self.get_stats(), []
+
+        self.requests[path] += 1
+        low, high = self._latency
+        if high > 0:
+            await asyncio.sleep(self._random.uniform(low, high) / 1000)
+
+        if path not in (READ_PATH, RENEW_PATH, FIX_SYNCKEY_PATH):
+            self.responses["not_found"] += 1
+            return 404, {"errcode": -1, "errmsg": "not found"}, []
+
+        if self._random.random() < self.options.error_rate:
+            self.responses["error"] += 1
+            return 500, {"errcode": -1, "errmsg": "mock server error"}, []
+
+        if path == RENEW_PATH:
+            self.responses["renewed"] += 1
+            skey = secrets.token_hex(4)
+            return 200, {"succ": 1}, [("Set-Cookie", f"wr_skey={skey}; Path=/; HttpOnly")]
+
+        if path == FIX_SYNCKEY_PATH:
+            self.responses["fixed"] += 1
+            return 200, {"data": []}, []
+
+        request_data = self._parse_body(headers, body)
+        if "s" in request_data and self._random.random() < self.options.reject_s_rate:
+            self.responses["rejected_s"] += 1
+            return 200, {"errcode": -2012, "errmsg": "签名错误"}, []
+
+        self._synckey += 1
+        payload = {"succ": 1, "addTime": self.options.add_time}
+        if self._random.random() < self.options.missing_synckey_rate:
+            self.responses["missing_synckey"] += 1
+        else:
+            payload["synckey"] = self._synckey
+            self.responses["accepted"] += 1
+        return 200, payload, []
+
+    @staticmethod
+    def _parse_body(headers: Dict[str, str], body: bytes) -> Dict[str, object]:
+        if not body:
+            return {}
+        if "application/x-www-form-urlencoded" in headers.get("content-type", ""):
+            return dict(urllib.parse.parse_qsl(body.decode("utf-8")))
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+def _run_server_process(options: MockOptions, conn):
+    async def main():
+        server = MockWeReadServer(options)
+        await server.start()
+        conn.send(server.options.port)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def start_in_process(options: MockOptions) -> Tuple[multiprocessing.Process, str]:
+    """在独立进程中启动模拟服务器，避免服务器的CPU开销计入被测进程
+
+    返回 (进程, base_url)，使用完毕后调用 process.terminate()。
+    """
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_server_process, args=(options, child_conn), daemon=True)
+    process.start()
+    if not parent_conn.poll(30):
+        process.terminate()
+        raise RuntimeError("模拟服务器启动超时")
+    port = parent_conn.recv()
+    return process, f"http://{options.host}:{port}"
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="微信读书接口本地模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", default="0", help="响应延迟（毫秒），支持区间，如 5-20")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 HTTP 500 的概率")
+    parser.add_argument("--missing-synckey-rate", type=float, default=0.0, help="成功响应中缺失 synckey 的概率")
+    parser.add_argument("--reject-s-rate", type=float, default=0.0, help="拒绝携带 s 字段的阅读请求的概率")
+    parser.add_argument("--add-time", type=int, default=30, help="每次阅读成功记入的秒数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    return parser
+
+
+def options_from_args(args: argparse.Namespace) -> MockOptions:
+    fields = MockOptions.__dataclass_fields__
+    return MockOptions(**{name: value for name, value in vars(args).items() if name in fields})
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    server = MockWeReadServer(options_from_args(args))
+    print(f"🧪 模拟服务器参数: {asdict(server.options)}")
+    print(f"🧪 模拟服务器监听: http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
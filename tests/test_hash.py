@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from weread_bot import utils
+from weread_bot.utils import calculate_hash, calculate_hash_many
+
+# 含 ASCII、中文、代理区之外的高位码点和 emoji
+ALPHABETS = (
+    "abcdefghijklmnopqrstuvwxyz0123456789%=&-_.~",
+    "阅读微信书籍章节abc",
+    "\x00\x7f\xffĀ￿\U0001f389\U0010ffff",
+)
+# 移位量以30为周期，覆盖周期边界附近的长度
+EDGE_LENGTHS = (0, 1, 2, 3, 14, 15, 16, 29, 30, 31, 59, 60, 61)
+
+
+def reference_hash(input_string: str) -> str:
+    """逐字符循环的原始实现"""
+    first = second = 0x15051505
+    length = len(input_string)
+    index = length - 1
+    while index > 0:
+        first = 0x7FFFFFFF & (first ^ ord(input_string[index]) << (length - index) % 30)
+        second = 0x7FFFFFFF & (second ^ ord(input_string[index - 1]) << index % 30)
+        index -= 2
+    return hex(first + second)[2:].lower()
+
+
+def random_strings(seed: int, count: int = 300):
+    rng = random.Random(seed)
+    strings = ["", "a", "ab", "abc"]
+    for _ in range(count):
+        length = rng.choice(EDGE_LENGTHS) if rng.random() < 0.3 else rng.randint(0, 400)
+        alphabet = rng.choice(ALPHABETS)
+        strings.append("".join(rng.choice(alphabet) for _ in range(length)))
+    rng.shuffle(strings)
+    return strings
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calculate_hash_matches_reference(seed):
+    for s in random_strings(seed):
+        assert calculate_hash(s) == reference_hash(s), s
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calculate_hash_many_fallback(monkeypatch, seed):
+    monkeypatch.setattr(utils, "load_numpy", lambda: None)
+    strings = random_strings(seed)
+    assert calculate_hash_many(strings) == [calculate_hash(s) for s in strings]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calculate_hash_many_numpy(seed):
+    pytest.importorskip("numpy")
+    assert utils.load_numpy() is not None
+    strings = random_strings(seed)
+    expected = [calculate_hash(s) for s in strings]
+    assert calculate_hash_many(strings) == expected
+    # 跨批次、小批量以及全部为奇数/偶数长度的批次
+    for size in (2, 3, 7, 64):
+        assert calculate_hash_many(strings[:size]) == expected[:size]
+    odd = [s for s in strings if len(s) % 2 == 1]
+    assert calculate_hash_many(odd) == [calculate_hash(s) for s in odd]
+
+
+def test_calculate_hash_many_numpy_crosses_batch_size(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(utils, "HASH_BATCH_SIZE", 16)
+    strings = random_strings(11, count=100)
+    assert calculate_hash_many(strings) == [calculate_hash(s) for s in strings]
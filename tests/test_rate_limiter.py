@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from weread_bot import http_client
+from weread_bot.http_client import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(http_client.time, "monotonic", fake)
+    return fake
+
+
+def dispatch(limiter: RateLimiter, clock: FakeClock, user: str, host: str = "weread.qq.com") -> float:
+    return clock.now + limiter.reserve(host, user)
+
+
+def assert_spacing(times, min_gap: float):
+    times = sorted(times)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert all(gap >= min_gap - 1e-6 for gap in gaps), gaps
+
+
+def test_shared_host_requests_are_spaced_and_fill_free_slots(clock):
+    limiter = RateLimiter(rate_limit=60, host_rate_limit=120, burst=1)
+
+    first = [dispatch(limiter, clock, "u1") for _ in range(2)]
+    second = [dispatch(limiter, clock, "u2") for _ in range(2)]
+
+    assert first == pytest.approx([0.0, 1.0])
+    # u2 使用 u1 两次请求之间主机令牌桶的空闲时段
+    assert second == pytest.approx([0.5, 1.5])
+    assert_spacing(first + second, 0.5)
+
+
+def test_random_arrivals_respect_host_and_user_limits(clock):
+    limiter = RateLimiter(rate_limit=30, host_rate_limit=120, burst=1)
+    rng = random.Random(7)
+    per_user = {f"u{i}": [] for i in range(4)}
+    host_times = []
+
+    for _ in range(200):
+        clock.now += rng.uniform(0, 0.3)
+        user = rng.choice(sorted(per_user))
+        at = dispatch(limiter, clock, user)
+        assert at >= clock.now
+        per_user[user].append(at)
+        host_times.append(at)
+
+    assert_spacing(host_times, 0.5)
+    for times in per_user.values():
+        assert_spacing(times, 2.0)
+
+
+def test_burst_allows_back_to_back_requests(clock):
+    limiter = RateLimiter(rate_limit=0, host_rate_limit=60, burst=3)
+
+    times = [dispatch(limiter, clock, f"u{i}") for i in range(5)]
+
+    assert times == pytest.approx([0.0, 0.0, 0.0, 1.0, 2.0])
+
+
+def test_try_acquire_does_not_take_reserved_slot(clock):
+    limiter = RateLimiter(rate_limit=0, host_rate_limit=60, burst=1)
+
+    assert limiter.try_acquire("weread.qq.com", "u1")
+    assert not limiter.try_acquire("weread.qq.com", "u2")
+    clock.now = 1.0
+    assert limiter.try_acquire("weread.qq.com", "u2")
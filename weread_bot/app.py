@@ -2,21 +2,23 @@ import asyncio
 import signal
 import argparse
 import logging
-from datetime import datetime, timedelta
-from typing import Set
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
 
-try:
-    from zoneinfo import ZoneInfo
-except ImportError:
-    from backports.zoneinfo import ZoneInfo
-
-from croniter import croniter
-
-from .config import WeReadConfig
+from .config import UserConfig, WeReadConfig
 from .config_manager import ConfigManager
+from .config_schema import ConfigValidationError
+from .http_client import HttpConnectionPool
 from .logger import setup_logging
+from .metrics import MetricsServer, registry as metrics_registry
+from .reload import ConfigDiff, FileWatcher, apply_live_changes, diff_configs, watched_paths
+from .scheduler import JobScheduler, ScheduledJob, wait_for_shutdown
+from .state import get_state_store
 from .session import WeReadSessionManager
-from .notification import NotificationService
+from .sharding import ShardedRunner, UserSessionResult, run_user_session
+from .notification import NotificationService, NotificationAggregator
 
 
 class WeReadApplication:
@@ -28,9 +30,24 @@ class WeReadApplication:
     _daily_session_count = 0
     _last_session_date = None
 
-    def __init__(self, config: WeReadConfig):
+    def __init__(self, config: WeReadConfig, config_path: str = None):
         self.config = config
+        # 配置文件路径，热重载时重新加载
+        self.config_path = config_path
+        # 热重载后的回调，由正在运行的调度循环注册
+        self._reload_listeners: List[Callable[[ConfigDiff], None]] = []
+        # 所有会话共享的连接池，生命周期与应用程序一致（跨定时/守护进程轮次复用）
+        self.http_pool = HttpConnectionPool.from_network_config(config.network)
+        # 共享的通知服务（复用同一个 httpx 客户端）
+        self.notification_service = NotificationService(config.notification)
+        # 多用户运行时的通知聚合器，按时间窗口合并消息
+        self.notifier = NotificationAggregator(
+            self.notification_service, config.notification.digest_window
+        )
         WeReadApplication._instance = self
+        # 关闭信号事件，所有等待都挂在它上面，收到信号后立即唤醒（在 run() 中绑定事件循环）
+        self.shutdown_event: asyncio.Event = None
+        self._loop: asyncio.AbstractEventLoop = None
 
         # 设置信号处理
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -52,6 +69,8 @@ class WeReadApplication:
         else:
             print(f"📡 收到信号 {signum}，准备优雅关闭...")
             WeReadApplication._shutdown_requested = True
+            if self._loop is not None and self.shutdown_event is not None:
+                self._loop.call_soon_threadsafe(self.shutdown_event.set)
 
             if WeReadApplication._current_session_managers:
                 print(f"⏳ 正在等待 {len(WeReadApplication._current_session_managers)} 个会话完成...")
@@ -59,15 +78,106 @@ class WeReadApplication:
     async def run(self):
         """根据配置的启动模式运行应用程序"""
         startup_mode = self.config.startup_mode.lower()
+        self._loop = asyncio.get_running_loop()
+        self.shutdown_event = asyncio.Event()
+        if WeReadApplication._shutdown_requested:
+            self.shutdown_event.set()
+
+        # 定时/守护进程模式下启动本地指标端点
+        metrics_server = None
+        if self.config.metrics.enabled and startup_mode in ("scheduled", "daemon"):
+            metrics_server = MetricsServer(
+                metrics_registry, self.config.metrics.host, self.config.metrics.port
+            )
+            try:
+                await metrics_server.start()
+            except OSError as e:
+                logging.error(f"❌ 指标端点启动失败: {e}")
+                metrics_server = None
 
-        if startup_mode == "immediate":
-            await self._run_immediate_mode()
-        elif startup_mode == "scheduled":
-            await self._run_scheduled_mode()
-        elif startup_mode == "daemon":
-            await self._run_daemon_mode()
-        else:
-            raise ValueError(f"未知的启动模式: {self.config.startup_mode}")
+        # 定时/守护进程模式下监视配置文件与CURL文件，变化时增量应用
+        reload_task = None
+        if self.config.hot_reload and self.config_path and startup_mode in ("scheduled", "daemon"):
+            reload_task = asyncio.create_task(self._watch_config())
+
+        try:
+            if startup_mode == "immediate":
+                await self._run_immediate_mode()
+            elif startup_mode == "scheduled":
+                await self._run_scheduled_mode()
+            elif startup_mode == "daemon":
+                await self._run_daemon_mode()
+            else:
+                raise ValueError(f"未知的启动模式: {self.config.startup_mode}")
+        finally:
+            if reload_task:
+                reload_task.cancel()
+                await asyncio.gather(reload_task, return_exceptions=True)
+            if metrics_server:
+                await metrics_server.close()
+            logging.info(self.http_pool.format_stats())
+            logging.info(self.http_pool.rate_limiter.format_stats())
+            await self.http_pool.close()
+            await self.notifier.aclose()
+            await self.notification_service.aclose()
+
+    async def _watch_config(self):
+        """监视配置文件与CURL文件，变化后重新加载并应用差异"""
+        watcher = FileWatcher(self.shutdown_event, self.config.hot_reload_interval)
+        watcher.watch(watched_paths(self.config_path, self.config))
+        print(f"👀 配置热重载已启用 ({watcher.mode})，监视 {len(watcher.paths)} 个文件")
+
+        async def on_change(changed: Set[str]):
+            logging.info(f"📝 检测到文件变化: {', '.join(sorted(changed))}")
+            self.reload_config(changed)
+            # 新增用户的CURL文件也纳入监视
+            watcher.watch(watched_paths(self.config_path, self.config))
+
+        await watcher.run(on_change)
+
+    def reload_config(self, changed_files: Set[str] = ()) -> Optional[ConfigDiff]:
+        """重新加载配置并应用可热更新的差异，配置文件无法解析时保留当前配置"""
+        try:
+            manager = ConfigManager(self.config_path)
+        except ConfigValidationError as e:
+            logging.error(f"❌ 配置热重载已跳过，继续使用当前配置: {e}")
+            return None
+        if manager.load_error:
+            logging.error(f"❌ 配置热重载已跳过，继续使用当前配置: {manager.load_error}")
+            return None
+        new_config = manager.config
+        # 启动模式可能来自命令行参数，不随配置文件变化
+        new_config.startup_mode = self.config.startup_mode
+
+        diff = diff_configs(self.config, new_config, changed_files)
+        if not diff:
+            logging.info("ℹ️ 配置文件已变化，但没有需要应用的差异")
+            return diff
+
+        apply_live_changes(self.config, new_config, diff)
+        if "notification" in diff.changed_sections:
+            self.notifier.window = max(0.0, self.config.notification.digest_window)
+
+        # 正在运行的会话换用新的CURL，未单独配置CURL的会话跟随全局CURL
+        changed_users = {user.name: user for user in diff.changed_users}
+        for manager in list(WeReadApplication._current_session_managers):
+            user_config = manager.user_config
+            if user_config and user_config.name in changed_users:
+                manager.reload_user_config(changed_users[user_config.name])
+            elif diff.global_curl_changed and not (user_config and (user_config.file_path or user_config.content)):
+                manager.reload_user_config(user_config)
+
+        for listener in list(self._reload_listeners):
+            listener(diff)
+
+        print(f"🔄 配置已热重载: {diff.describe()}")
+        if diff.restart_required:
+            logging.warning(f"⚠️ 以下配置的修改需要重启后生效: {', '.join(diff.restart_required)}")
+        return diff
+
+    def _find_user(self, name: str) -> Optional[UserConfig]:
+        """按名称查找当前配置中的用户（热重载后可能已被移除或替换）"""
+        return next((user for user in self.config.users if user.name == name), None)
 
     async def _run_immediate_mode(self):
         """立即执行模式"""
@@ -82,44 +192,184 @@ class WeReadApplication:
             logging.error("❌ 定时模式已启用，但schedule配置未启用")
             return
 
-        timezone_name = self.config.schedule.timezone or "Asia/Shanghai"
-        try:
-            tz = ZoneInfo(timezone_name)
-        except Exception:
-            logging.error(f"❌ 无效的时区配置: {timezone_name}")
+        tz = self._schedule_timezone()
+        if tz is None:
             return
 
+        # croniter 只有定时模式使用，首次使用时才导入
+        from croniter import croniter
+
         try:
             cron_iter = croniter(self.config.schedule.cron_expression, datetime.now(tz))
         except Exception as e:
             logging.error(f"❌ 无效的cron表达式: {e}")
             return
 
-        print(f"⏰ 定时任务已启动 (时区 {timezone_name})，表达式: {self.config.schedule.cron_expression}")
+        print(f"⏰ 定时任务已启动 (时区 {tz.key})，表达式: {self.config.schedule.cron_expression}")
 
-        while not WeReadApplication._shutdown_requested:
+        users = self.config.users
+        if users and (self.config.schedule.splay > 0 or any(user.schedule for user in users)):
+            await self._run_per_user_schedule(tz)
+            print("👋 定时任务已停止")
+            return
+
+        scheduler = JobScheduler(self.shutdown_event)
+        # 等待中的任务；执行期间为 None，执行完再排下一次
+        job: Optional[ScheduledJob] = None
+
+        def next_cron_time() -> datetime:
             next_run = cron_iter.get_next(datetime)
             if next_run.tzinfo is None:
                 next_run = next_run.replace(tzinfo=tz)
-            now = datetime.now(tz)
-            wait_seconds = (next_run - now).total_seconds()
-
-            if wait_seconds <= 0:
-                continue
-
+            return next_run
+
+        def schedule_next():
+            nonlocal job
+            # 跳过执行期间已错过的时间点
+            next_run = next_cron_time()
+            while next_run.timestamp() <= time.time():
+                next_run = next_cron_time()
             print(f"🗓️ 下一次执行时间: {next_run.astimezone(tz).strftime('%Y-%m-%d %H:%M:%S %Z')}")
+            job = scheduler.schedule(next_run.timestamp(), "cron")
 
-            while wait_seconds > 0 and not WeReadApplication._shutdown_requested:
-                await asyncio.sleep(min(wait_seconds, 1))
-                now = datetime.now(tz)
-                wait_seconds = (next_run - now).total_seconds()
+        def on_reload(diff: ConfigDiff):
+            nonlocal cron_iter, tz
+            if "schedule" not in diff.changed_sections:
+                return
+            new_tz = self._schedule_timezone()
+            try:
+                new_iter = croniter(self.config.schedule.cron_expression, datetime.now(new_tz or tz))
+            except Exception as e:
+                logging.error(f"❌ 新的cron表达式无效，继续使用原表达式: {e}")
+                return
+            cron_iter, tz = new_iter, new_tz or tz
+            if job is not None:
+                scheduler.cancel(job)
+                schedule_next()
+
+        schedule_next()
+        self._reload_listeners.append(on_reload)
+        try:
+            while await scheduler.next_job() is not None:
+                job = None
+                await self.run_single_session()
+                if WeReadApplication._shutdown_requested:
+                    break
+                schedule_next()
+        finally:
+            self._reload_listeners.remove(on_reload)
 
-            if WeReadApplication._shutdown_requested:
-                break
+        print("👋 定时任务已停止")
 
-            await self.run_single_session()
+    def _schedule_timezone(self):
+        """定时任务使用的时区，配置无效时返回 None"""
+        try:
+            from zoneinfo import ZoneInfo
+        except ImportError:
+            from backports.zoneinfo import ZoneInfo
 
-        print("👋 定时任务已停止")
+        timezone_name = self.config.schedule.timezone or "Asia/Shanghai"
+        try:
+            return ZoneInfo(timezone_name)
+        except Exception:
+            logging.error(f"❌ 无效的时区配置: {timezone_name}")
+            return None
+
+    async def _run_per_user_schedule(self, tz):
+        """按用户调度：每个用户独立的cron与错峰偏移，到期会话进入优先队列，由全局并发上限控制执行"""
+        from croniter import croniter
+
+        scheduler = JobScheduler(self.shutdown_event)
+        semaphore = asyncio.Semaphore(max(1, self.config.max_concurrent_users))
+        running: Dict[str, asyncio.Task] = {}
+        jobs: Dict[str, ScheduledJob] = {}
+
+        def schedule_user(user: UserConfig) -> datetime:
+            users = self.config.users
+            index = users.index(user)
+            expression = user.schedule or self.config.schedule.cron_expression
+            splay = user.splay if user.splay is not None else self.config.schedule.splay
+            # 各用户的偏移按顺序均匀分布在错峰窗口内
+            offset = max(0, splay) * index / len(users)
+            # 从当前时间计算下一次触发，执行期间错过的时间点不补跑
+            next_run = croniter(expression, datetime.now(tz)).get_next(datetime)
+            if next_run.tzinfo is None:
+                next_run = next_run.replace(tzinfo=tz)
+            due = next_run.timestamp() + offset
+            jobs[user.name] = scheduler.schedule(due, user.name, priority=index)
+            return datetime.fromtimestamp(due, tz)
+
+        def schedule_all():
+            for job in jobs.values():
+                scheduler.cancel(job)
+            jobs.clear()
+            for user in self.config.users:
+                try:
+                    next_time = schedule_user(user)
+                except Exception as e:
+                    logging.error(f"❌ 用户 {user.name} 的cron表达式无效，已跳过: {e}")
+                    continue
+                print(
+                    f"🗓️ 用户 {user.name} 下一次执行时间: {next_time.strftime('%Y-%m-%d %H:%M:%S %Z')}"
+                    f" ({user.schedule or self.config.schedule.cron_expression})"
+                )
+
+        def on_reload(diff: ConfigDiff):
+            nonlocal semaphore, tz
+            if "max_concurrent_users" in diff.changed_sections:
+                # 进行中的会话继续占用旧的并发名额，之后的会话使用新上限
+                semaphore = asyncio.Semaphore(max(1, self.config.max_concurrent_users))
+            if "schedule" in diff.changed_sections:
+                tz = self._schedule_timezone() or tz
+            # 错峰偏移依赖用户顺序和总数，用户或调度配置变化时全部重新排期
+            if diff.added_users or diff.removed_users or diff.changed_users or "schedule" in diff.changed_sections:
+                schedule_all()
+
+        schedule_all()
+        print(f"⚙️  按用户调度 {len(scheduler)} 个用户，最大并发用户数: {self.config.max_concurrent_users}")
+
+        self._reload_listeners.append(on_reload)
+        try:
+            while True:
+                job = await scheduler.next_job()
+                if job is None:
+                    break
+                user = self._find_user(job.name)
+                if user is None:
+                    continue
+                next_time = schedule_user(user)
+
+                if user.name in running:
+                    logging.warning(f"⚠️ 用户 {user.name} 上一次会话仍在执行，跳过本次触发")
+                    continue
+
+                logging.debug(f"🗓️ 用户 {user.name} 下一次执行时间: {next_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+                task = asyncio.create_task(self._run_scheduled_user(user, semaphore))
+                running[user.name] = task
+                task.add_done_callback(lambda _, name=user.name: running.pop(name, None))
+        finally:
+            self._reload_listeners.remove(on_reload)
+
+        if running:
+            print(f"⏳ 正在等待 {len(running)} 个会话完成...")
+            await asyncio.gather(*running.values(), return_exceptions=True)
+
+    async def _run_scheduled_user(self, user: UserConfig, semaphore: asyncio.Semaphore):
+        """执行单个用户的定时会话，统计与错误通过通知聚合器合并发送"""
+        result = await run_user_session(
+            self.config,
+            user,
+            self.http_pool,
+            semaphore,
+            lambda: WeReadApplication._shutdown_requested,
+            WeReadApplication._current_session_managers,
+        )
+        if result is None:
+            return
+        if result.error:
+            self.notifier.add(result.error)
+        elif self.config.notification.enabled and self.config.notification.include_statistics:
+            self.notifier.add(result.stats.get_statistics_summary())
 
     async def _run_daemon_mode(self):
         """守护进程模式"""
@@ -129,6 +379,11 @@ class WeReadApplication:
             logging.error("❌ 守护进程模式已启用，但daemon配置未启用")
             return
 
+        if self.config.daemon.continuous and self.config.users:
+            await self._run_continuous_daemon()
+            print("👋 守护进程已停止")
+            return
+
         while not WeReadApplication._shutdown_requested:
             # 检查每日会话限制
             current_date = datetime.now().date()
@@ -154,18 +409,135 @@ class WeReadApplication:
                     )
                     print(f"😴 守护进程等待 {interval_minutes} 分钟后执行下一次会话...")
 
-                    # 分段等待，以便能够响应关闭信号
-                    for _ in range(interval_minutes * 60):
-                        if WeReadApplication._shutdown_requested:
-                            break
-                        await asyncio.sleep(1)
+                    # 收到关闭信号时立即结束等待
+                    await wait_for_shutdown(self.shutdown_event, interval_minutes * 60)
 
             except Exception as e:
                 logging.error(f"❌ 守护进程会话执行失败: {e}")
-                await asyncio.sleep(300)
+                await wait_for_shutdown(self.shutdown_event, 300)
 
         print("👋 守护进程已停止")
 
+    async def _run_continuous_daemon(self):
+        """连续守护模式：每个用户独立执行 运行 → 冷却 → 运行，到期的用户进入优先队列，
+        由 max_concurrent_users 限制同时执行的会话数，每日会话数按用户分别计算"""
+        from .utils import RandomHelper
+
+        users = self.config.users
+        concurrency = max(1, min(self.config.max_concurrent_users, len(users)))
+        scheduler = JobScheduler(self.shutdown_event)
+        semaphore = asyncio.Semaphore(concurrency)
+        running: Dict[str, asyncio.Task] = {}
+        jobs: Dict[str, ScheduledJob] = {}
+        # user -> [日期, 当日已开始的会话数]
+        daily: Dict[str, List] = {}
+
+        store = get_state_store(self.config.state.file) if self.config.state.enabled else None
+        tz = self._schedule_timezone()
+
+        def current_day() -> date:
+            # 每日会话数按 schedule.timezone 的日期计算
+            return datetime.now(tz).date()
+
+        def init_counter(name: str):
+            today = current_day()
+            count = 0
+            if store:
+                # 重启后沿用当日已完成的会话数
+                state = store.get(name)
+                if state.daily_date == today.isoformat():
+                    count = state.daily_sessions
+            daily[name] = [today, count]
+
+        def schedule_user(name: str, due: float):
+            index = next((i for i, user in enumerate(self.config.users) if user.name == name), 0)
+            jobs[name] = scheduler.schedule(due, name, priority=index)
+
+        now = time.time()
+        for user in users:
+            init_counter(user.name)
+            schedule_user(user.name, now)
+
+        print(
+            f"🔁 连续守护模式: {len(users)} 个用户，最大并发 {concurrency}，"
+            f"每个用户每日最多 {self.config.daemon.max_daily_sessions} 个会话"
+        )
+
+        async def run_user(user: UserConfig):
+            await self._run_scheduled_user(user, semaphore)
+            # 会话期间用户可能已被热重载移除
+            if WeReadApplication._shutdown_requested or self._find_user(user.name) is None:
+                return
+            interval_minutes = RandomHelper.get_random_int_from_range(self.config.daemon.session_interval)
+            print(f"😴 用户 {user.name} 冷却 {interval_minutes} 分钟后执行下一次会话")
+            schedule_user(user.name, time.time() + interval_minutes * 60)
+
+        def on_reload(diff: ConfigDiff):
+            nonlocal semaphore
+            if "max_concurrent_users" in diff.changed_sections:
+                # 进行中的会话继续占用旧的并发名额，之后的会话使用新上限
+                semaphore = asyncio.Semaphore(max(1, min(self.config.max_concurrent_users, len(self.config.users))))
+            for name in diff.removed_users:
+                job = jobs.pop(name, None)
+                if job:
+                    scheduler.cancel(job)
+            for user in diff.added_users:
+                if user.name not in daily:
+                    init_counter(user.name)
+                # 仍在执行的会话结束后会自行排期
+                if user.name not in running:
+                    schedule_user(user.name, time.time())
+
+        self._reload_listeners.append(on_reload)
+        try:
+            while True:
+                job = await scheduler.next_job()
+                if job is None:
+                    break
+                user = self._find_user(job.name)
+                if user is None:
+                    continue
+
+                max_daily = self.config.daemon.max_daily_sessions
+                counter = daily[user.name]
+                today = current_day()
+                if counter[0] != today:
+                    counter[0], counter[1] = today, 0
+                if counter[1] >= max_daily:
+                    resume_at = self._next_day_start(user, today, tz)
+                    print(
+                        f"📊 用户 {user.name} 已达到每日最大会话数限制: {max_daily}，"
+                        f"{datetime.fromtimestamp(resume_at, tz):%m-%d %H:%M:%S} 继续"
+                    )
+                    schedule_user(user.name, resume_at)
+                    continue
+
+                counter[1] += 1
+                task = asyncio.create_task(run_user(user))
+                running[user.name] = task
+                task.add_done_callback(lambda _, name=user.name: running.pop(name, None))
+        finally:
+            self._reload_listeners.remove(on_reload)
+
+        if running:
+            print(f"⏳ 正在等待 {len(running)} 个会话完成...")
+            await asyncio.gather(*running.values(), return_exceptions=True)
+
+    def _next_day_start(self, user: UserConfig, today: date, tz) -> float:
+        """达到每日上限的用户次日继续的时间点
+
+        schedule.timezone 的次日零点加上按用户名稳定散列的错峰偏移，避免所有用户在零点同时到期；
+        错峰窗口为用户或全局的 splay，未设置时为 session_interval 的上限。
+        """
+        from .utils import RandomHelper
+
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+        window = user.splay if user.splay is not None else self.config.schedule.splay
+        if window <= 0:
+            window = RandomHelper.parse_range(self.config.daemon.session_interval)[1] * 60
+        offset = (zlib.crc32(user.name.encode("utf-8")) % 10000) / 10000 * window
+        return midnight.timestamp() + offset
+
     async def _wait_until_next_day(self):
         """等待到第二天"""
         now = datetime.now()
@@ -175,10 +547,7 @@ class WeReadApplication:
 
         print(f"⏰ 等待到明天 00:00，剩余 {wait_seconds/3600:.1f} 小时")
 
-        for _ in range(int(wait_seconds)):
-            if WeReadApplication._shutdown_requested:
-                break
-            await asyncio.sleep(1)
+        await wait_for_shutdown(self.shutdown_event, wait_seconds)
 
     @classmethod
     async def run_single_session(cls):
@@ -199,7 +568,7 @@ class WeReadApplication:
         """执行单用户会话"""
         session_manager = None
         try:
-            session_manager = WeReadSessionManager(instance.config)
+            session_manager = WeReadSessionManager(instance.config, http_pool=instance.http_pool)
             WeReadApplication._current_session_managers.add(session_manager)
 
             session_stats = await session_manager.start_reading_session()
@@ -210,8 +579,7 @@ class WeReadApplication:
             # 发送通知
             if instance.config.notification.enabled and instance.config.notification.include_statistics:
                 try:
-                    notification_service = NotificationService(instance.config.notification)
-                    await notification_service.send_notification_async(
+                    await instance.notification_service.send_notification_async(
                         session_stats.get_statistics_summary()
                     )
                 except Exception as e:
@@ -222,8 +590,7 @@ class WeReadApplication:
             logging.error(error_msg)
 
             try:
-                notification_service = NotificationService(instance.config.notification)
-                await notification_service.send_notification_async(error_msg)
+                await instance.notification_service.send_notification_async(error_msg)
             except Exception:
                 pass
         finally:
@@ -241,55 +608,55 @@ class WeReadApplication:
             concurrency = user_count
         print(f"⚙️  最大并发用户数: {concurrency}")
 
-        semaphore = asyncio.Semaphore(concurrency)
-        tasks = []
+        all_session_stats = []
+        successful_users = []
+        failed_users = []
 
-        async def run_for_user(user_config):
-            if WeReadApplication._shutdown_requested:
-                print("📡 收到关闭信号，跳过后续用户")
-                return None
+        def collect(result: UserSessionResult):
+            if result.success and result.stats:
+                all_session_stats.append((result.name, result.stats))
+                successful_users.append(result.name)
+            else:
+                failed_users.append(result.name)
 
-            async with semaphore:
-                if WeReadApplication._shutdown_requested:
-                    return None
+        worker_processes = min(instance.config.worker_processes, user_count)
+        if worker_processes > 1:
+            print(f"🧩 分片执行模式: {worker_processes} 个工作进程")
 
-                print(f"👤 开始执行用户 {user_config.name} 的阅读会话")
-                session_manager = WeReadSessionManager(instance.config, user_config)
-                WeReadApplication._current_session_managers.add(session_manager)
+            def on_result(result: UserSessionResult):
+                if result.error:
+                    instance.notifier.add(result.error)
 
-                try:
-                    session_stats = await session_manager.start_reading_session()
-                    print(f"📊 用户 {user_config.name} 会话统计:")
-                    print(session_stats.get_statistics_summary())
-                    return {"name": user_config.name, "stats": session_stats, "success": True}
-                except Exception as e:
-                    error_msg = f"❌ 用户 {user_config.name} 阅读会话执行失败: {e}"
-                    logging.error(error_msg)
-                    try:
-                        notification_service = NotificationService(instance.config.notification)
-                        await notification_service.send_notification_async(error_msg)
-                    except Exception:
-                        pass
-                    return {"name": user_config.name, "stats": None, "success": False}
-                finally:
-                    WeReadApplication._current_session_managers.discard(session_manager)
-
-        for user_config in instance.config.users:
-            tasks.append(asyncio.create_task(run_for_user(user_config)))
+            runner = ShardedRunner(instance.config, worker_processes)
+            results = await runner.run(lambda: WeReadApplication._shutdown_requested, on_result)
+            for result in results:
+                collect(result)
+        else:
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = [
+                asyncio.create_task(
+                    run_user_session(
+                        instance.config,
+                        user_config,
+                        instance.http_pool,
+                        semaphore,
+                        lambda: WeReadApplication._shutdown_requested,
+                        WeReadApplication._current_session_managers,
+                    )
+                )
+                for user_config in instance.config.users
+            ]
 
-        all_session_stats = []
-        successful_users = []
-        failed_users = []
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if not result:
+                    continue
+                if result.error:
+                    instance.notifier.add(result.error)
+                collect(result)
 
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            if not result:
-                continue
-            if result["success"] and result["stats"]:
-                all_session_stats.append((result["name"], result["stats"]))
-                successful_users.append(result["name"])
-            else:
-                failed_users.append(result["name"])
+        logging.info(instance.http_pool.format_stats())
+        logging.info(instance.http_pool.rate_limiter.format_stats())
 
         # 生成多用户会话总结
         await cls._generate_multi_user_summary(
@@ -328,11 +695,13 @@ class WeReadApplication:
         print(summary)
 
         if instance.config.notification.enabled and instance.config.notification.include_statistics:
-            try:
-                notification_service = NotificationService(instance.config.notification)
-                await notification_service.send_notification_async(summary)
-            except Exception as e:
-                logging.error(f"❌ 多用户总结通知发送失败: {e}")
+            instance.notifier.add(summary)
+
+        # 本轮的错误通知与总结合并为摘要一次性发送
+        try:
+            await instance.notifier.flush()
+        except Exception as e:
+            logging.error(f"❌ 多用户总结通知发送失败: {e}")
 
 
 def parse_arguments():
@@ -359,7 +728,14 @@ def parse_arguments():
     parser.add_argument(
         "--config", "-c", default="config.yaml", help="配置文件路径 (默认: config.yaml)"
     )
+    parser.add_argument(
+        "--config-cache",
+        help="配置快照文件路径，配置未变化时跳过解析直接加载 (默认读取环境变量 CONFIG_CACHE_FILE)",
+    )
     parser.add_argument("--verbose", "-v", action="store_true", help="启用详细日志输出")
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="输出启动阶段的导入与配置加载耗时分析后退出"
+    )
 
     return parser.parse_args()
 
@@ -368,9 +744,14 @@ async def main():
     """主函数"""
     args = parse_arguments()
 
+    if args.profile_startup:
+        from .startup_profile import profile_startup
+        print(profile_startup(args.config, args.config_cache))
+        return
+
     try:
         # 加载配置
-        config_manager = ConfigManager(args.config)
+        config_manager = ConfigManager(args.config, args.config_cache)
         config = config_manager.config
 
         # 使用配置设置日志
@@ -389,11 +770,13 @@ async def main():
         print(f"👥 用户数量: {len(config.users) if config.users else 1}\n")
 
         # 创建并运行应用程序
-        app = WeReadApplication(config)
+        app = WeReadApplication(config, args.config)
         await app.run()
 
     except KeyboardInterrupt:
         print("\n👋 用户中断，程序退出")
+    except ConfigValidationError as e:
+        logging.error(f"❌ {e}")
     except Exception as e:
         error_msg = f"❌ 程序运行错误: {e}"
         logging.error(error_msg, exc_info=True)
@@ -401,7 +784,10 @@ async def main():
         try:
             config_manager = ConfigManager(args.config if "args" in locals() else "config.yaml")
             notification_service = NotificationService(config_manager.config.notification)
-            await notification_service.send_notification_async(error_msg)
+            try:
+                await notification_service.send_notification_async(error_msg)
+            finally:
+                await notification_service.aclose()
         except Exception:
             pass
 
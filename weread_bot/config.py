@@ -1,8 +1,9 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
-import platform
 from pathlib import Path
 
+from .credited import DEFAULT_CREDITED_KEYS
+
 VERSION = "0.3.6"
 REPO = "https://github.com/funnyzak/weread-bot"
 
@@ -13,7 +14,15 @@ class NetworkConfig:
     timeout: int = 30
     retry_times: int = 3
     retry_delay: str = "5-15"
+    retry_max_delay: int = 60
+    retry_budget: int = 20
     rate_limit: int = 10
+    host_rate_limit: int = 0
+    global_rate_limit: int = 0
+    rate_burst: int = 1
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
 
 
 @dataclass
@@ -46,6 +55,7 @@ class ScheduleConfig:
     enabled: bool = False
     cron_expression: str = "0 */2 * * *"
     timezone: str = "Asia/Shanghai"
+    splay: int = 0
 
 
 @dataclass
@@ -54,6 +64,31 @@ class DaemonConfig:
     enabled: bool = False
     session_interval: str = "120-180"
     max_daily_sessions: int = 12
+    continuous: bool = False
+
+
+@dataclass
+class StateConfig:
+    """会话状态持久化配置"""
+    enabled: bool = False
+    file: str = "data/weread_state.db"
+
+
+@dataclass
+class CookieConfig:
+    """Cookie生命周期配置"""
+    ttl: int = 1800
+    renew_margin: int = 300
+    renew_spread: int = 600
+    max_concurrent_renewals: int = 2
+
+
+@dataclass
+class MetricsConfig:
+    """指标端点配置"""
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9108
 
 
 @dataclass
@@ -96,6 +131,8 @@ class UserConfig:
     file_path: str = ""
     content: str = ""
     reading_overrides: Dict[str, Any] = field(default_factory=dict)
+    schedule: str = ""
+    splay: Optional[int] = None
 
 
 @dataclass
@@ -111,6 +148,7 @@ class NotificationConfig:
     """通知配置"""
     enabled: bool = True
     include_statistics: bool = True
+    digest_window: int = 60
     channels: List[NotificationChannel] = field(default_factory=list)
 
 
@@ -118,6 +156,7 @@ class NotificationConfig:
 class HackConfig:
     """Hack配置"""
     cookie_refresh_ql: bool = False
+    credited_keys: List[str] = field(default_factory=lambda: list(DEFAULT_CREDITED_KEYS))
 
 
 @dataclass
@@ -128,6 +167,9 @@ class WeReadConfig:
     startup_mode: str = "immediate"
     startup_delay: str = "1-10"
     max_concurrent_users: int = 1
+    worker_processes: int = 1
+    hot_reload: bool = False
+    hot_reload_interval: float = 5.0
     curl_file_path: str = ""
     curl_content: str = ""
     users: List[UserConfig] = field(default_factory=list)
@@ -139,9 +181,14 @@ class WeReadConfig:
     schedule: ScheduleConfig = field(default_factory=ScheduleConfig)
     daemon: DaemonConfig = field(default_factory=DaemonConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    state: StateConfig = field(default_factory=StateConfig)
+    cookie: CookieConfig = field(default_factory=CookieConfig)
 
     def get_startup_info(self) -> str:
         """获取启动信息摘要"""
+        import platform
+
         startup_info = f"""
 📚 微信读书阅读机器人
 
@@ -161,6 +208,7 @@ class WeReadConfig:
   🔄 阅读间隔: {self.reading.reading_interval} 秒
   🎭 人类模拟: {'启用' if self.human_simulation.enabled else '禁用'}
   👥 最大并发用户: {self.max_concurrent_users}
+  🧩 工作进程数: {self.worker_processes}
 
 网络配置:
   ⏱️  超时时间: {self.network.timeout} 秒
@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from .config import WeReadConfig
+from .config_schema import PLACEHOLDER_RE
+
+# 快照格式版本，pickle 结构不兼容时递增
+SNAPSHOT_FORMAT = 1
+
+# 配置类定义或默认值变化（升级后新增/删除字段）时快照随之失效：
+# 包括定义配置类、加载逻辑和默认值的所有模块（credited.py 提供默认的 credited 参数名）
+_SOURCE_FILES = ("config.py", "config_manager.py", "config_schema.py", "credited.py")
+
+
+def _source_fingerprint() -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    package_dir = Path(__file__).resolve().parent
+    for name in _SOURCE_FILES:
+        try:
+            digest.update((package_dir / name).read_bytes())
+        except OSError:
+            digest.update(name.encode("utf-8"))
+    return digest.digest()
+
+
+def snapshot_key(config_path: str, env_keys: Iterable[str], environ: Mapping[str, str] = None) -> str:
+    """计算配置快照的键：配置文件内容、相关环境变量的值和配置类定义的哈希
+
+    除固定的环境变量外，配置文件中 ${VAR} 占位符引用的变量也计入。
+    """
+    environ = os.environ if environ is None else environ
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"{SNAPSHOT_FORMAT}\0".encode("utf-8"))
+    digest.update(_source_fingerprint())
+
+    try:
+        raw = Path(config_path).read_bytes()
+    except OSError:
+        raw = b""
+    digest.update(len(raw).to_bytes(8, "little"))
+    digest.update(raw)
+
+    placeholders = set(PLACEHOLDER_RE.findall(raw.decode("utf-8", errors="replace")))
+    for key in sorted(set(env_keys) | placeholders):
+        value = environ.get(key)
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\1" if value is None else b"\2" + value.encode("utf-8", errors="surrogateescape"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ConfigSnapshotCache:
+    """已解析配置的本地快照
+
+    配置文件和相关环境变量都没有变化时直接反序列化上一次构建好的 WeReadConfig，
+    跳过 YAML 解析、环境变量解析和用户/书籍对象的构建。
+    快照中包含已解析的令牌等敏感配置，文件权限为 0600，应放在仅当前用户可写的目录。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, key: str) -> Optional[WeReadConfig]:
+        """键一致时返回快照中的配置，否则（含文件不存在或损坏）返回 None"""
+        try:
+            with open(self.path, "rb") as f:
+                snapshot_key, config = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.debug(f"配置快照读取失败，重新加载配置: {e}")
+            return None
+        if snapshot_key != key or not isinstance(config, WeReadConfig):
+            return None
+        return config
+
+    def save(self, key: str, config: WeReadConfig):
+        """原子写入快照（先写临时文件再替换）"""
+        path = Path(self.path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+            try:
+                # mkstemp 创建的文件权限为 0600
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump((key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logging.warning(f"⚠️ 配置快照写入失败: {e}")
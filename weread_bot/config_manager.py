@@ -1,24 +1,83 @@
 import os
-import json
 import logging
 from pathlib import Path
-from typing import Any, List
-import yaml
+from typing import Any, List, Optional
 
 from .config import (
     WeReadConfig, ReadingConfig, NetworkConfig, HumanSimulationConfig,
     NotificationConfig, NotificationChannel, HackConfig, ScheduleConfig,
     DaemonConfig, LoggingConfig, UserConfig, BookInfo, ChapterInfo,
-    SmartRandomConfig
+    SmartRandomConfig, MetricsConfig, StateConfig, CookieConfig
+)
+from .config_schema import (
+    SCHEMA,
+    ConfigValidationError,
+    FieldError,
+    lookup,
+    parse_bool,
+    resolve_placeholders,
+    resolve_schema,
+)
+from .credited import DEFAULT_CREDITED_KEYS
+
+# YAML 解析器在首次解析时确定；有 libyaml 时使用 C 实现，大型多用户配置的解析快数倍
+_YAML_LOADER = None
+
+
+def _yaml_loader():
+    """导入 yaml 并返回使用的解析器（命中配置快照时不需要导入 yaml）"""
+    global _YAML_LOADER
+    if _YAML_LOADER is None:
+        import yaml
+        _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _YAML_LOADER
+
+
+def _parse_yaml(stream) -> Any:
+    """用 _yaml_loader() 返回的解析器解析单个 YAML 文档（与 yaml.load 相同）"""
+    loader = _yaml_loader()(stream)
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
+
+
+# 配置加载时读取的全部环境变量（配置模式之外的部分在下方各加载函数中读取），用于计算配置快照的键
+SNAPSHOT_ENV_KEYS = tuple(f.env_key for f in SCHEMA) + (
+    "HACK_CREDITED_KEYS", "ENABLED",
+    "PUSHPLUS_TOKEN", "TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID", "HTTP_PROXY", "HTTPS_PROXY",
+    "WXPUSHER_SPT", "BARK_SERVER", "BARK_DEVICE_KEY",
 )
 
 
 class ConfigManager:
     """配置管理器 - 负责从YAML和环境变量加载配置"""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", cache_path: str = None):
         self.config_path = config_path
-        self.config = self._load_config()
+        # 配置文件存在但读取/解析失败时记录错误信息（热重载据此放弃本次重载）
+        self.load_error: Optional[str] = None
+        # 配置快照文件，未指定时读取 CONFIG_CACHE_FILE，为空则不使用快照
+        self.cache_path = os.getenv("CONFIG_CACHE_FILE", "") if cache_path is None else cache_path
+        self.from_snapshot = False
+        self.config = self._load_with_snapshot() if self.cache_path else self._load_config()
+
+    def _load_with_snapshot(self) -> WeReadConfig:
+        """配置文件与相关环境变量未变化时直接使用快照，否则完整加载后写入新快照"""
+        from .config_cache import ConfigSnapshotCache, snapshot_key
+
+        cache = ConfigSnapshotCache(self.cache_path)
+        key = snapshot_key(self.config_path, SNAPSHOT_ENV_KEYS)
+        config = cache.load(key)
+        if config is not None:
+            self.from_snapshot = True
+            print(f"⚡ 已从配置快照加载: {self.cache_path} ({len(config.users)} 个用户)")
+            return config
+
+        config = self._load_config()
+        if not self.load_error:
+            cache.save(key, config)
+        return config
 
     def _load_config(self) -> WeReadConfig:
         """加载配置文件"""
@@ -28,214 +87,47 @@ class ConfigManager:
         if Path(self.config_path).exists():
             try:
                 with open(self.config_path, "r", encoding="utf-8") as f:
-                    config_data = yaml.safe_load(f) or {}
+                    config_data = _parse_yaml(f) or {}
                 print(f"✅ 已加载配置文件: {self.config_path}")
             except Exception as e:
+                self.load_error = str(e)
                 logging.warning(f"⚠️ 配置文件加载失败: {e}")
 
+        # 按配置模式一次解析全部标量配置项，类型错误与用户配置的错误汇总为 ConfigValidationError
+        errors: List[FieldError] = []
+        try:
+            values = resolve_schema(config_data)
+        except ConfigValidationError as e:
+            errors.extend(e.errors)
+        users = self._load_user_configs(config_data, errors)
+        if errors:
+            raise ConfigValidationError(errors)
+
         # 创建主配置对象
-        config = WeReadConfig(
-            startup_mode=self._get_config_value(
-                config_data, "app.startup_mode", "STARTUP_MODE", "immediate"
-            ),
-            startup_delay=self._get_config_value(
-                config_data, "app.startup_delay", "STARTUP_DELAY", "1-10"
-            ),
-            max_concurrent_users=int(
-                self._get_config_value(
-                    config_data, "app.max_concurrent_users", "MAX_CONCURRENT_USERS", "1"
-                )
-            ),
-            curl_file_path=self._get_config_value(
-                config_data, "curl_config.file_path", "WEREAD_CURL_BASH_FILE_PATH", ""
-            ),
-            curl_content=self._get_config_value(
-                config_data, "curl_config.content", "WEREAD_CURL_STRING", ""
-            ),
-            users=self._load_user_configs(config_data),
-        )
+        config = WeReadConfig(**values[""], users=users)
 
         # 加载阅读配置
         config.reading = ReadingConfig(
-            mode=self._get_config_value(
-                config_data, "reading.mode", "READING_MODE", "smart_random"
-            ),
-            target_duration=self._get_config_value(
-                config_data, "reading.target_duration", "TARGET_DURATION", "60-70"
-            ),
-            reading_interval=self._get_config_value(
-                config_data, "reading.reading_interval", "READING_INTERVAL", "25-35"
-            ),
-            use_curl_data_first=self._get_bool_config(
-                config_data, "reading.use_curl_data_first", "USE_CURL_DATA_FIRST", True
-            ),
-            fallback_to_config=self._get_bool_config(
-                config_data, "reading.fallback_to_config", "FALLBACK_TO_CONFIG", True
-            ),
+            **values["reading"],
             books=self._load_books(config_data),
-            smart_random=SmartRandomConfig(
-                book_continuity=float(
-                    self._get_config_value(
-                        config_data,
-                        "reading.smart_random.book_continuity",
-                        "BOOK_CONTINUITY",
-                        "0.8",
-                    )
-                ),
-                chapter_continuity=float(
-                    self._get_config_value(
-                        config_data,
-                        "reading.smart_random.chapter_continuity",
-                        "CHAPTER_CONTINUITY",
-                        "0.7",
-                    )
-                ),
-                book_switch_cooldown=int(
-                    self._get_config_value(
-                        config_data,
-                        "reading.smart_random.book_switch_cooldown",
-                        "BOOK_SWITCH_COOLDOWN",
-                        "300",
-                    )
-                ),
-            ),
-        )
-
-        # 加载网络配置
-        config.network = NetworkConfig(
-            timeout=int(
-                self._get_config_value(
-                    config_data, "network.timeout", "NETWORK_TIMEOUT", "30"
-                )
-            ),
-            retry_times=int(
-                self._get_config_value(
-                    config_data, "network.retry_times", "RETRY_TIMES", "3"
-                )
-            ),
-            retry_delay=self._get_config_value(
-                config_data, "network.retry_delay", "RETRY_DELAY", "5-15"
-            ),
-            rate_limit=int(
-                self._get_config_value(
-                    config_data, "network.rate_limit", "RATE_LIMIT", "10"
-                )
-            ),
-        )
-
-        # 加载人类行为模拟配置
-        config.human_simulation = HumanSimulationConfig(
-            enabled=self._get_bool_config(
-                config_data,
-                "human_simulation.enabled",
-                "HUMAN_SIMULATION_ENABLED",
-                False,
-            ),
-            reading_speed_variation=self._get_bool_config(
-                config_data,
-                "human_simulation.reading_speed_variation",
-                "READING_SPEED_VARIATION",
-                True,
-            ),
-            break_probability=float(
-                self._get_config_value(
-                    config_data,
-                    "human_simulation.break_probability",
-                    "BREAK_PROBABILITY",
-                    "0.1",
-                )
-            ),
-            break_duration=self._get_config_value(
-                config_data,
-                "human_simulation.break_duration",
-                "BREAK_DURATION",
-                "10-20",
-            ),
-            rotate_user_agent=self._get_bool_config(
-                config_data,
-                "human_simulation.rotate_user_agent",
-                "ROTATE_USER_AGENT",
-                False,
-            ),
+            smart_random=SmartRandomConfig(**values["reading.smart_random"]),
         )
-
-        # 加载通知配置
+        config.network = NetworkConfig(**values["network"])
+        config.human_simulation = HumanSimulationConfig(**values["human_simulation"])
         config.notification = NotificationConfig(
-            enabled=self._get_bool_config(
-                config_data, "notification.enabled", "NOTIFICATION_ENABLED", True
-            ),
-            include_statistics=self._get_bool_config(
-                config_data,
-                "notification.include_statistics",
-                "INCLUDE_STATISTICS",
-                True,
-            ),
+            **values["notification"],
             channels=self._load_notification_channels(config_data),
         )
-
-        # 加载hack配置
         config.hack = HackConfig(
-            cookie_refresh_ql=self._get_bool_config(
-                config_data, "hack.cookie_refresh_ql", "HACK_COOKIE_REFRESH_QL", False
-            ),
+            **values["hack"],
+            credited_keys=self._get_credited_keys(config_data),
         )
-
-        # 加载调度配置
-        config.schedule = ScheduleConfig(
-            enabled=self._get_bool_config(
-                config_data, "schedule.enabled", "SCHEDULE_ENABLED", False
-            ),
-            cron_expression=self._get_config_value(
-                config_data,
-                "schedule.cron_expression",
-                "CRON_EXPRESSION",
-                "0 */2 * * *",
-            ),
-            timezone=self._get_config_value(
-                config_data, "schedule.timezone", "TIMEZONE", "Asia/Shanghai"
-            ),
-        )
-
-        # 加载守护进程配置
-        config.daemon = DaemonConfig(
-            enabled=self._get_bool_config(
-                config_data, "daemon.enabled", "DAEMON_ENABLED", False
-            ),
-            session_interval=self._get_config_value(
-                config_data, "daemon.session_interval", "SESSION_INTERVAL", "120-180"
-            ),
-            max_daily_sessions=int(
-                self._get_config_value(
-                    config_data, "daemon.max_daily_sessions", "MAX_DAILY_SESSIONS", "12"
-                )
-            ),
-        )
-
-        # 加载日志配置
-        config.logging = LoggingConfig(
-            level=self._get_config_value(
-                config_data, "logging.level", "LOG_LEVEL", "INFO"
-            ),
-            format=self._get_config_value(
-                config_data, "logging.format", "LOG_FORMAT", "detailed"
-            ),
-            file=self._get_config_value(
-                config_data, "logging.file", "LOG_FILE", "logs/weread.log"
-            ),
-            max_size=self._get_config_value(
-                config_data, "logging.max_size", "LOG_MAX_SIZE", "10MB"
-            ),
-            backup_count=int(
-                self._get_config_value(
-                    config_data, "logging.backup_count", "LOG_BACKUP_COUNT", "5"
-                )
-            ),
-            console=self._get_bool_config(
-                config_data, "logging.console", "LOG_CONSOLE", True
-            ),
-        )
-
-        config.max_concurrent_users = max(1, config.max_concurrent_users)
+        config.schedule = ScheduleConfig(**values["schedule"])
+        config.daemon = DaemonConfig(**values["daemon"])
+        config.logging = LoggingConfig(**values["logging"])
+        config.metrics = MetricsConfig(**values["metrics"])
+        config.state = StateConfig(**values["state"])
+        config.cookie = CookieConfig(**values["cookie"])
         return config
 
     def _load_books(self, config_data: dict) -> List[BookInfo]:
@@ -293,13 +185,11 @@ class ConfigManager:
         """获取配置值，优先级：环境变量 > YAML > 默认值"""
         env_value = os.getenv(env_key)
         if env_value:
-            env_value = self._resolve_env_placeholders(env_value)
-            return self._parse_config_value(env_value, type(default))
+            return resolve_placeholders(env_value)
 
         yaml_value = self._get_nested_dict_value(config_data, yaml_path)
         if yaml_value is not None:
-            yaml_value = self._resolve_env_placeholders(str(yaml_value))
-            return self._parse_config_value(yaml_value, type(default))
+            return resolve_placeholders(str(yaml_value))
 
         return default
 
@@ -307,45 +197,23 @@ class ConfigManager:
         self, config_data: dict, yaml_path: str, env_key: str, default: bool
     ) -> bool:
         """获取布尔类型配置值"""
-        value = self._get_config_value(config_data, yaml_path, env_key, str(default))
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ("true", "1", "yes", "on")
-        return default
+        return parse_bool(self._get_config_value(config_data, yaml_path, env_key, str(default)))
+
+    def _get_credited_keys(self, config_data: dict) -> List[str]:
+        """获取记入时长字段列表，环境变量使用逗号分隔"""
+        keys = os.getenv("HACK_CREDITED_KEYS") or self._get_nested_dict_value(
+            config_data, "hack.credited_keys"
+        )
+        if isinstance(keys, str):
+            keys = keys.split(",")
+        if not isinstance(keys, list):
+            return list(DEFAULT_CREDITED_KEYS)
+        keys = [str(key).strip() for key in keys if str(key).strip()]
+        return keys or list(DEFAULT_CREDITED_KEYS)
 
     def _get_nested_dict_value(self, data: dict, path: str) -> Any:
         """从嵌套字典中获取值"""
-        keys = path.split(".")
-        current = data
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return None
-        return current
-
-    def _resolve_env_placeholders(self, value: str) -> str:
-        """解析环境变量占位符"""
-        import re
-        pattern = r"\$\{([^}]+)\}"
-
-        def replace_match(match):
-            env_var = match.group(1)
-            return os.getenv(env_var, match.group(0))
-
-        return re.sub(pattern, replace_match, value)
-
-    def _parse_config_value(self, value: str, target_type: type) -> Any:
-        """解析配置值为指定类型"""
-        if target_type == list:
-            if isinstance(value, str) and value.startswith("[") and value.endswith("]"):
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return []
-            return []
-        return value
+        return lookup(data, tuple(path.split(".")))
 
     def _load_notification_channels(self, config_data: dict) -> List[NotificationChannel]:
         """加载通知通道配置"""
@@ -444,19 +312,30 @@ class ConfigManager:
 
         return channels
 
-    def _load_user_configs(self, config_data: dict) -> List[UserConfig]:
-        """加载用户配置"""
+    def _load_user_configs(self, config_data: dict, errors: List[FieldError]) -> List[UserConfig]:
+        """加载用户配置，无法转换的字段追加到 errors"""
         users = []
         
         users_config = self._get_nested_dict_value(config_data, "curl_config.users")
         if users_config and isinstance(users_config, list):
             for user_data in users_config:
                 if isinstance(user_data, dict) and user_data.get("name"):
+                    name = user_data.get("name")
+                    splay = None
+                    if user_data.get("splay") is not None:
+                        raw = resolve_placeholders(str(user_data["splay"]))
+                        try:
+                            splay = int(raw)
+                        except ValueError:
+                            errors.append(FieldError(f"users[{name}].splay", "curl_config.users", raw, "整数"))
+                            continue
                     user = UserConfig(
-                        name=user_data.get("name"),
+                        name=name,
                         file_path=user_data.get("file_path", ""),
                         content=user_data.get("content", ""),
                         reading_overrides=user_data.get("reading_overrides", {}),
+                        schedule=str(user_data.get("schedule") or ""),
+                        splay=splay,
                     )
                     users.append(user)
                     print(f"✅ 已加载用户配置: {user.name}")
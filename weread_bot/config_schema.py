@@ -0,0 +1,203 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# ${VAR} 形式的环境变量占位符
+PLACEHOLDER_RE = re.compile(r"\$\{([^}]+)\}")
+
+TRUE_VALUES = ("true", "1", "yes", "on")
+
+
+@dataclass(frozen=True)
+class FieldError:
+    """单个配置项的校验错误"""
+    field: str
+    source: str
+    value: str
+    expected: str
+
+    def __str__(self) -> str:
+        return f"{self.field}: {self.source}={self.value!r} 不是有效的{self.expected}"
+
+
+class ConfigValidationError(ValueError):
+    """配置值无法转换为声明的类型，errors 中包含所有出错的配置项"""
+
+    def __init__(self, errors: List[FieldError]):
+        self.errors = errors
+        super().__init__("配置校验失败: " + "；".join(str(error) for error in errors))
+
+
+@dataclass(frozen=True)
+class ConfigField:
+    """一个配置项：写入 WeReadConfig 的位置、YAML路径、环境变量、类型与默认值
+
+    section 为 WeReadConfig 上的配置段（"" 表示顶层字段，"reading.smart_random" 表示嵌套段），
+    minimum 不为空时小于该值的配置按 minimum 处理。
+    """
+    section: str
+    name: str
+    yaml_path: str
+    env_key: str
+    type: type
+    default: Any
+    minimum: Optional[float] = None
+
+
+def _field(section, name, env_key, type_, default, yaml_path=None, minimum=None) -> ConfigField:
+    if yaml_path is None:
+        yaml_path = f"{section}.{name}" if section else f"app.{name}"
+    return ConfigField(section, name, yaml_path, env_key, type_, default, minimum)
+
+
+# 优先级：环境变量 > YAML > 默认值
+SCHEMA: Tuple[ConfigField, ...] = (
+    _field("", "startup_mode", "STARTUP_MODE", str, "immediate"),
+    _field("", "startup_delay", "STARTUP_DELAY", str, "1-10"),
+    _field("", "max_concurrent_users", "MAX_CONCURRENT_USERS", int, 1, minimum=1),
+    _field("", "worker_processes", "WORKER_PROCESSES", int, 1, minimum=1),
+    _field("", "hot_reload", "HOT_RELOAD", bool, False),
+    _field("", "hot_reload_interval", "HOT_RELOAD_INTERVAL", float, 5.0),
+    _field("", "curl_file_path", "WEREAD_CURL_BASH_FILE_PATH", str, "", "curl_config.file_path"),
+    _field("", "curl_content", "WEREAD_CURL_STRING", str, "", "curl_config.content"),
+
+    _field("reading", "mode", "READING_MODE", str, "smart_random"),
+    _field("reading", "target_duration", "TARGET_DURATION", str, "60-70"),
+    _field("reading", "reading_interval", "READING_INTERVAL", str, "25-35"),
+    _field("reading", "use_curl_data_first", "USE_CURL_DATA_FIRST", bool, True),
+    _field("reading", "fallback_to_config", "FALLBACK_TO_CONFIG", bool, True),
+    _field("reading.smart_random", "book_continuity", "BOOK_CONTINUITY", float, 0.8),
+    _field("reading.smart_random", "chapter_continuity", "CHAPTER_CONTINUITY", float, 0.7),
+    _field("reading.smart_random", "book_switch_cooldown", "BOOK_SWITCH_COOLDOWN", int, 300),
+
+    _field("network", "timeout", "NETWORK_TIMEOUT", int, 30),
+    _field("network", "retry_times", "RETRY_TIMES", int, 3),
+    _field("network", "retry_delay", "RETRY_DELAY", str, "5-15"),
+    _field("network", "retry_max_delay", "RETRY_MAX_DELAY", int, 60),
+    _field("network", "retry_budget", "RETRY_BUDGET", int, 20),
+    _field("network", "rate_limit", "RATE_LIMIT", int, 10),
+    _field("network", "host_rate_limit", "HOST_RATE_LIMIT", int, 0),
+    _field("network", "global_rate_limit", "GLOBAL_RATE_LIMIT", int, 0),
+    _field("network", "rate_burst", "RATE_BURST", int, 1),
+    _field("network", "max_connections", "MAX_CONNECTIONS", int, 100),
+    _field("network", "max_keepalive_connections", "MAX_KEEPALIVE_CONNECTIONS", int, 20),
+    _field("network", "keepalive_expiry", "KEEPALIVE_EXPIRY", float, 60.0),
+
+    _field("human_simulation", "enabled", "HUMAN_SIMULATION_ENABLED", bool, False),
+    _field("human_simulation", "reading_speed_variation", "READING_SPEED_VARIATION", bool, True),
+    _field("human_simulation", "break_probability", "BREAK_PROBABILITY", float, 0.1),
+    _field("human_simulation", "break_duration", "BREAK_DURATION", str, "10-20"),
+    _field("human_simulation", "rotate_user_agent", "ROTATE_USER_AGENT", bool, False),
+
+    _field("notification", "enabled", "NOTIFICATION_ENABLED", bool, True),
+    _field("notification", "include_statistics", "INCLUDE_STATISTICS", bool, True),
+    _field("notification", "digest_window", "NOTIFICATION_DIGEST_WINDOW", int, 60),
+
+    _field("hack", "cookie_refresh_ql", "HACK_COOKIE_REFRESH_QL", bool, False),
+
+    _field("schedule", "enabled", "SCHEDULE_ENABLED", bool, False),
+    _field("schedule", "cron_expression", "CRON_EXPRESSION", str, "0 */2 * * *"),
+    _field("schedule", "timezone", "TIMEZONE", str, "Asia/Shanghai"),
+    _field("schedule", "splay", "SCHEDULE_SPLAY", int, 0),
+
+    _field("daemon", "enabled", "DAEMON_ENABLED", bool, False),
+    _field("daemon", "session_interval", "SESSION_INTERVAL", str, "120-180"),
+    _field("daemon", "max_daily_sessions", "MAX_DAILY_SESSIONS", int, 12),
+    _field("daemon", "continuous", "DAEMON_CONTINUOUS", bool, False),
+
+    _field("logging", "level", "LOG_LEVEL", str, "INFO"),
+    _field("logging", "format", "LOG_FORMAT", str, "detailed"),
+    _field("logging", "file", "LOG_FILE", str, "logs/weread.log"),
+    _field("logging", "max_size", "LOG_MAX_SIZE", str, "10MB"),
+    _field("logging", "backup_count", "LOG_BACKUP_COUNT", int, 5),
+    _field("logging", "console", "LOG_CONSOLE", bool, True),
+
+    _field("metrics", "enabled", "METRICS_ENABLED", bool, False),
+    _field("metrics", "host", "METRICS_HOST", str, "127.0.0.1"),
+    _field("metrics", "port", "METRICS_PORT", int, 9108),
+
+    _field("state", "enabled", "STATE_ENABLED", bool, False),
+    _field("state", "file", "STATE_FILE", str, "data/weread_state.db"),
+
+    _field("cookie", "ttl", "COOKIE_TTL", int, 1800),
+    _field("cookie", "renew_margin", "COOKIE_RENEW_MARGIN", int, 300),
+    _field("cookie", "renew_spread", "COOKIE_RENEW_SPREAD", int, 600),
+    _field("cookie", "max_concurrent_renewals", "COOKIE_MAX_CONCURRENT_RENEWALS", int, 2),
+)
+
+_TYPE_NAMES = {int: "整数", float: "数字", bool: "布尔值", str: "字符串"}
+
+# 预先拆分好的 YAML 路径，加载时不再逐项 split
+_COMPILED = tuple((f, tuple(f.yaml_path.split("."))) for f in SCHEMA)
+
+
+def resolve_placeholders(value: str, environ: Mapping[str, str] = None) -> str:
+    """替换 ${VAR} 环境变量占位符，未设置的变量保持原样"""
+    if "${" not in value:
+        return value
+    environ = os.environ if environ is None else environ
+    return PLACEHOLDER_RE.sub(lambda match: environ.get(match.group(1), match.group(0)), value)
+
+
+def lookup(data: Any, keys: Tuple[str, ...]) -> Any:
+    """按拆分好的路径从嵌套字典中取值，不存在时返回 None"""
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+        if data is None:
+            return None
+    return data
+
+
+def parse_bool(value: str) -> bool:
+    return value.lower() in TRUE_VALUES
+
+
+def _convert(value: str, type_: type) -> Any:
+    if type_ is str:
+        return value
+    if type_ is bool:
+        return parse_bool(value)
+    return type_(value)
+
+
+def resolve_schema(config_data: dict, environ: Mapping[str, str] = None) -> Dict[str, Dict[str, Any]]:
+    """一次遍历 SCHEMA 解析全部配置项，返回 {配置段: {字段: 值}}
+
+    所有无法转换的值收集后一并抛出 ConfigValidationError。
+    """
+    environ = os.environ if environ is None else environ
+    sections: Dict[str, Dict[str, Any]] = {}
+    errors: List[FieldError] = []
+
+    for f, keys in _COMPILED:
+        values = sections.get(f.section)
+        if values is None:
+            values = sections[f.section] = {}
+
+        raw = environ.get(f.env_key)
+        source = f.env_key
+        if not raw:
+            raw = lookup(config_data, keys)
+            source = f.yaml_path
+            if raw is None:
+                values[f.name] = f.default
+                continue
+            raw = str(raw)
+
+        raw = resolve_placeholders(raw, environ)
+        try:
+            value = _convert(raw, f.type)
+        except ValueError:
+            name = f"{f.section}.{f.name}" if f.section else f.name
+            errors.append(FieldError(name, source, raw, _TYPE_NAMES[f.type]))
+            continue
+        if f.minimum is not None and value < f.minimum:
+            value = type(value)(f.minimum)
+        values[f.name] = value
+
+    if errors:
+        raise ConfigValidationError(errors)
+    return sections
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import CookieConfig
+
+
+class CookieLifecycleManager:
+    """wr_skey 生命周期管理
+
+    - 记录每个用户最近一次刷新时间，有效期内的会话直接复用，不再调用刷新接口；
+    - 主动刷新时间 = 刷新时间 + 有效期 - 提前量 - 按用户名散列的错峰偏移，
+      同一时刻刷新过的大量用户会在错峰窗口内分散续期；
+    - 同一用户并发的刷新请求合并为一次，全局同时进行的刷新数受限。
+    """
+
+    def __init__(self, config: CookieConfig = None):
+        self.config = config or CookieConfig()
+        # user -> (wr_skey, 刷新时间)
+        self._renewed: Dict[str, Tuple[str, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_size = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, config: CookieConfig):
+        if config != self.config:
+            self.config = config
+            self._semaphore = None
+
+    def observe(self, user: str, wr_skey: str, renewed_at: float = None):
+        """记录已知的 wr_skey（例如从状态存储恢复），只保留较新的记录"""
+        if not wr_skey:
+            return
+        renewed_at = time.time() if renewed_at is None else renewed_at
+        known = self._renewed.get(user)
+        if known is None or renewed_at >= known[1]:
+            self._renewed[user] = (wr_skey, renewed_at)
+
+    def forget(self, user: str):
+        """丢弃用户的刷新记录（例如热重载替换了该用户的CURL），下次使用前重新刷新"""
+        self._renewed.pop(user, None)
+
+    def current(self, user: str) -> Optional[str]:
+        known = self._renewed.get(user)
+        return known[0] if known else None
+
+    def renewed_at(self, user: str) -> float:
+        known = self._renewed.get(user)
+        return known[1] if known else 0.0
+
+    def expires_at(self, user: str) -> float:
+        return self.renewed_at(user) + self.config.ttl
+
+    def is_fresh(self, user: str, now: float = None) -> bool:
+        """wr_skey 在提前量之外仍然有效"""
+        if user not in self._renewed:
+            return False
+        now = time.time() if now is None else now
+        return now < self.expires_at(user) - self.config.renew_margin
+
+    def next_renewal_at(self, user: str) -> float:
+        """主动刷新的时间点"""
+        if user not in self._renewed:
+            return time.time()
+        return self.expires_at(user) - self.config.renew_margin - self._spread_offset(user)
+
+    def _spread_offset(self, user: str) -> float:
+        # 按用户名稳定散列到 [0, renew_spread)，重启后同一用户的错峰位置不变
+        return (zlib.crc32(user.encode("utf-8")) % 10000) / 10000 * max(0, self.config.renew_spread)
+
+    def _bind_loop(self):
+        # 每个事件循环使用独立的并发限制和在途请求表
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._inflight.clear()
+            self._semaphore = None
+        # 配置可能被原地修改（热重载），并发上限变化时重建
+        size = max(1, self.config.max_concurrent_renewals)
+        if self._semaphore is None or size != self._semaphore_size:
+            self._semaphore = asyncio.Semaphore(size)
+            self._semaphore_size = size
+
+    async def refresh(
+        self,
+        user: str,
+        renew: Callable[[], Awaitable[Optional[str]]],
+        force: bool = False,
+    ) -> Optional[str]:
+        """获取可用的 wr_skey
+
+        未过期且 force=False 时直接返回已有值；否则调用 renew 刷新。
+        同一用户已有刷新在进行时，等待其结果而不发起新的请求。
+        """
+        if not force and self.is_fresh(user):
+            return self.current(user)
+
+        self._bind_loop()
+        inflight = self._inflight.get(user)
+        if inflight is not None:
+            logging.debug(f"🍪 用户 {user} 的Cookie刷新已在进行，等待其结果")
+            return await asyncio.shield(inflight)
+
+        future = self._loop.create_future()
+        self._inflight[user] = future
+        try:
+            async with self._semaphore:
+                wr_skey = await renew()
+            if wr_skey:
+                self.observe(user, wr_skey)
+            future.set_result(wr_skey)
+            return wr_skey
+        except asyncio.CancelledError:
+            # 发起刷新的任务被取消时，等待者按刷新失败处理
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(user, None)
+
+    async def keep_fresh(self, user: str, refresh: Callable[[], Awaitable[bool]], retry_delay: float = 60.0):
+        """在会话期间按错峰时间点主动续期，直到任务被取消"""
+        while True:
+            delay = self.next_renewal_at(user) - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                # 等待期间可能已被其他请求刷新
+                if self.next_renewal_at(user) > time.time():
+                    continue
+            logging.debug(f"🍪 用户 {user} 的Cookie即将过期，主动刷新")
+            try:
+                ok = await refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.debug(f"⚠️ 用户 {user} 主动刷新Cookie异常: {e}")
+                ok = False
+            # 刷新失败或有效期配置过短时，避免连续请求
+            if not ok or self.next_renewal_at(user) <= time.time():
+                await asyncio.sleep(retry_delay)
+
+
+_lifecycle = CookieLifecycleManager()
+
+
+def get_cookie_lifecycle(config: CookieConfig = None) -> CookieLifecycleManager:
+    """获取进程内共享的 Cookie 生命周期管理器"""
+    if config is not None:
+        _lifecycle.configure(config)
+    return _lifecycle
@@ -0,0 +1,122 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# 服务器返回的记入时长字段，按优先级排列
+DEFAULT_CREDITED_KEYS = (
+    "addTime",
+    "add_time",
+    "readTime",
+    "read_time",
+    "time",
+    "duration",
+    "inc",
+    "increase",
+    "added",
+    "addedTime",
+)
+
+# 每个提取器缓存的响应结构数量上限
+MAX_CACHED_SHAPES = 64
+
+_MISSING = object()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+class CreditedExtractor:
+    """记入时长提取器
+
+    查找规则：在当前层按字段优先级查找数值字段，找不到时按插入顺序深度优先查找嵌套字典。
+    字段列表在创建时编译为优先级表和集合；命中的 JSON 路径按响应的顶层字段结构缓存，
+    同结构的后续响应只沿缓存路径校验取值，校验不通过时回退为完整查找，结果与完整查找一致。
+    """
+
+    def __init__(self, keys: Iterable[str] = DEFAULT_CREDITED_KEYS):
+        self.keys: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keys if k))
+        self._key_set = frozenset(self.keys)
+        self._higher: Dict[str, Tuple[str, ...]] = {k: self.keys[:i] for i, k in enumerate(self.keys)}
+        self._paths: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def extract(self, obj: Any) -> Optional[int]:
+        """提取记入时长，未找到时返回 None"""
+        if not isinstance(obj, dict):
+            return None
+
+        shape = tuple(obj)
+        path = self._paths.get(shape)
+        if path is not None:
+            value = self._resolve(obj, path)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        found = self._walk(obj, ())
+        if found is None:
+            return None
+        path, value = found
+        if len(self._paths) >= MAX_CACHED_SHAPES:
+            self._paths.clear()
+        self._paths[shape] = path
+        return value
+
+    def _numeric_key(self, node: Dict[str, Any], candidates: Tuple[str, ...]) -> Optional[str]:
+        """按优先级返回 node 中第一个数值类型的候选字段"""
+        if self._key_set.isdisjoint(node):
+            return None
+        for key in candidates:
+            if key in node and _is_number(node[key]):
+                return key
+        return None
+
+    def _walk(self, node: Dict[str, Any], path: Tuple[str, ...]) -> Optional[Tuple[Tuple[str, ...], int]]:
+        key = self._numeric_key(node, self.keys)
+        if key is not None:
+            return path + (key,), int(node[key])
+        for child_key, value in node.items():
+            if isinstance(value, dict):
+                found = self._walk(value, path + (child_key,))
+                if found is not None:
+                    return found
+        return None
+
+    def _resolve(self, node: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+        """沿缓存路径取值，并校验完整查找会得到同一结果"""
+        for step in path[:-1]:
+            # 当前层存在数值字段时完整查找会停在这一层
+            if self._numeric_key(node, self.keys) is not None:
+                return _MISSING
+            # 路径之前的兄弟字典会被先查找，无法确认时回退
+            for sibling_key, value in node.items():
+                if sibling_key == step:
+                    break
+                if isinstance(value, dict):
+                    return _MISSING
+            else:
+                return _MISSING
+            node = node[step]
+            if not isinstance(node, dict):
+                return _MISSING
+
+        leaf = path[-1]
+        if leaf not in node or not _is_number(node[leaf]):
+            return _MISSING
+        if self._numeric_key(node, self._higher[leaf]) is not None:
+            return _MISSING
+        return int(node[leaf])
+
+
+_extractors: Dict[Tuple[str, ...], CreditedExtractor] = {}
+
+
+def get_extractor(keys: Iterable[str] = DEFAULT_CREDITED_KEYS) -> CreditedExtractor:
+    """获取指定字段列表的共享提取器，同一字段列表的所有会话共用编译结果和路径缓存"""
+    keys = tuple(keys) or DEFAULT_CREDITED_KEYS
+    extractor = _extractors.get(keys)
+    if extractor is None:
+        extractor = _extractors[keys] = CreditedExtractor(keys)
+    return extractor
@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+ParsedCurl = Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]
+
+HEADER_OPTIONS = ("-H", "--header")
+COOKIE_OPTIONS = ("-b", "--cookie")
+DATA_OPTIONS = ("--data-raw", "--data", "-d", "--data-binary", "--data-ascii")
+
+# 解析结果缓存的条目上限（按内容哈希）
+MAX_CACHED_COMMANDS = 4096
+
+_SIMPLE_ESCAPES = {
+    "a": "\a", "b": "\b", "e": "\x1b", "E": "\x1b", "f": "\f", "n": "\n",
+    "r": "\r", "t": "\t", "v": "\v", "\\": "\\", "'": "'", '"': '"', "?": "?",
+}
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+
+def _read_ansi_c(command: str, i: int) -> Tuple[str, int]:
+    """读取 $'...' 的内容（i 指向开引号之后），返回 (文本, 闭引号之后的位置)"""
+    parts: List[str] = []
+    pending = bytearray()  # \xHH 与八进制转义按字节累积，按 UTF-8 解码
+
+    def flush():
+        if pending:
+            parts.append(pending.decode("utf-8", errors="replace"))
+            pending.clear()
+
+    n = len(command)
+    while i < n:
+        ch = command[i]
+        if ch == "'":
+            flush()
+            return "".join(parts), i + 1
+        if ch != "\\" or i + 1 >= n:
+            flush()
+            parts.append(ch)
+            i += 1
+            continue
+
+        esc = command[i + 1]
+        i += 2
+        if esc == "x":
+            digits = ""
+            while i < n and len(digits) < 2 and command[i] in _HEX_DIGITS:
+                digits += command[i]
+                i += 1
+            if digits:
+                pending.append(int(digits, 16))
+            else:
+                flush()
+                parts.append("\\x")
+        elif esc in "01234567":
+            digits = esc
+            while i < n and len(digits) < 3 and command[i] in "01234567":
+                digits += command[i]
+                i += 1
+            pending.append(int(digits, 8) & 0xFF)
+        elif esc in "uU":
+            width = 4 if esc == "u" else 8
+            digits = ""
+            while i < n and len(digits) < width and command[i] in _HEX_DIGITS:
+                digits += command[i]
+                i += 1
+            flush()
+            parts.append(chr(int(digits, 16)) if digits else "\\" + esc)
+        else:
+            flush()
+            parts.append(_SIMPLE_ESCAPES.get(esc, "\\" + esc))
+    raise ValueError("$'...' 引号未闭合")
+
+
+# 双引号内容：普通字符整段匹配，反斜杠只转义 " \ $ ` 和换行
+_DOUBLE_QUOTED_RE = re.compile(r'([^"\\]+)|\\(\r?\n|["\\$`])|(\\)|(")')
+
+# shell 词法单元，每次匹配消费一段同类字符
+_TOKEN_RE = re.compile(
+    r"(?P<ws>[ \t\r\n]+)"
+    r"|(?P<bare>[^ \t\r\n'\"\\$]+)"
+    r"|'(?P<single>[^']*)'"
+    r"|(?P<ansi>\$')"
+    r"|(?P<double>\")"
+    r"|\\(?P<escaped>\r\n|[\s\S])?"
+    r"|(?P<dollar>\$)"
+    r"|(?P<unclosed>')"
+)
+
+
+def _read_double_quoted(command: str, i: int, buf: List[str]) -> int:
+    """读取双引号内容（i 指向开引号之后），返回闭引号之后的位置"""
+    for match in _DOUBLE_QUOTED_RE.finditer(command, i):
+        text, escaped, backslash, closing = match.groups()
+        if text is not None:
+            buf.append(text)
+        elif escaped is not None:
+            if escaped[-1] != "\n":
+                buf.append(escaped)
+        elif backslash is not None:
+            buf.append(backslash)
+        else:
+            return match.end()
+    raise ValueError("双引号未闭合")
+
+
+def tokenize_curl(command: str) -> List[str]:
+    """按 POSIX shell 规则拆分 curl 命令
+
+    支持单引号、双引号（含转义）、$'...'（ANSI-C 转义）、反斜杠转义和行尾续行，
+    不做变量展开。引号未闭合时抛出 ValueError。
+    """
+    tokens: List[str] = []
+    buf: List[str] = []
+    in_token = False
+    i, n = 0, len(command)
+
+    while i < n:
+        match = _TOKEN_RE.match(command, i)
+        kind = match.lastgroup
+        i = match.end()
+        if kind == "ws":
+            if in_token:
+                tokens.append("".join(buf))
+                buf.clear()
+                in_token = False
+            continue
+        if kind == "unclosed":
+            raise ValueError("单引号未闭合")
+        if kind == "escaped":
+            escaped = match.group("escaped")
+            # 反斜杠+换行为续行，不产生字符
+            if escaped is None or escaped in ("\n", "\r\n"):
+                continue
+            buf.append(escaped)
+        elif kind == "ansi":
+            text, i = _read_ansi_c(command, i)
+            buf.append(text)
+        elif kind == "double":
+            i = _read_double_quoted(command, i, buf)
+        elif kind == "single":
+            buf.append(match.group("single"))
+        else:
+            buf.append(match.group())
+        in_token = True
+
+    if in_token:
+        tokens.append("".join(buf))
+    return tokens
+
+
+_OPTION_KINDS = {
+    **{option: "header" for option in HEADER_OPTIONS},
+    **{option: "cookie" for option in COOKIE_OPTIONS},
+    **{option: "data" for option in DATA_OPTIONS},
+}
+
+
+def _split_option(token: str) -> Tuple[Optional[str], Optional[str]]:
+    """识别 "-Hv" / "--header=v" 这类值与选项写在一起的参数，返回 (类型, 值)"""
+    if token.startswith("--"):
+        option, sep, value = token.partition("=")
+        if sep and option in _OPTION_KINDS:
+            return _OPTION_KINDS[option], value
+    elif token[:2] in _OPTION_KINDS:
+        return _OPTION_KINDS[token[:2]], token[2:]
+    return None, None
+
+
+def parse_curl_tokens(tokens: List[str]) -> ParsedCurl:
+    """从 curl 参数中提取 (headers, cookies, data)"""
+    headers_temp: Dict[str, str] = {}
+    cookie_option = None
+    data_str = None
+
+    i, n = 0, len(tokens)
+    while i < n:
+        token = tokens[i]
+        i += 1
+        if not token.startswith("-"):
+            continue
+        kind = _OPTION_KINDS.get(token)
+        if kind is not None:
+            if i >= n:
+                break
+            value = tokens[i]
+            i += 1
+        else:
+            kind, value = _split_option(token)
+            if kind is None:
+                continue
+
+        if kind == "header":
+            name, sep, header_value = value.partition(":")
+            if sep and name.strip():
+                headers_temp[name.strip()] = header_value.strip()
+        elif kind == "cookie":
+            if cookie_option is None:
+                cookie_option = value
+        elif data_str is None:
+            data_str = value
+
+    cookie_header = next((v for k, v in headers_temp.items() if k.lower() == "cookie"), "")
+    cookie_string = cookie_option if cookie_option is not None else cookie_header
+    cookies: Dict[str, str] = {}
+    for cookie in cookie_string.split(";"):
+        if "=" in cookie:
+            key, value = cookie.split("=", 1)
+            cookies[key.strip()] = value.strip()
+
+    headers = {k: v for k, v in headers_temp.items() if k.lower() != "cookie"}
+
+    request_data: Dict[str, Any] = {}
+    if data_str is not None:
+        data_str = data_str.strip()
+        try:
+            request_data = json.loads(data_str)
+        except json.JSONDecodeError as e:
+            logging.warning(f"解析请求数据失败: {e}, 数据内容: {data_str[:100]}...")
+        if not isinstance(request_data, dict):
+            request_data = {}
+
+    return headers, cookies, request_data
+
+
+def clone_parsed(parsed: ParsedCurl) -> ParsedCurl:
+    """复制解析结果，调用方修改副本不会影响缓存"""
+    headers, cookies, request_data = parsed
+    return dict(headers), dict(cookies), _clone_json(request_data)
+
+
+def _clone_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _clone_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone_json(v) for v in value]
+    return value
+
+
+class ParsedCurlCache:
+    """按内容哈希缓存 curl 解析结果（LRU）"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_COMMANDS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, ParsedCurl]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[ParsedCurl]:
+        parsed = self._entries.get(key)
+        if parsed is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return parsed
+
+    def put(self, key: bytes, parsed: ParsedCurl):
+        self._entries[key] = parsed
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# path -> (mtime_ns, size, 内容)
+_file_cache: Dict[str, Tuple[int, int, str]] = {}
+
+
+def read_curl_file(path: str) -> str:
+    """读取 CURL 文件，文件的修改时间和大小不变时直接返回缓存内容"""
+    stat = os.stat(path)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    _file_cache[path] = (stat.st_mtime_ns, stat.st_size, content)
+    return content
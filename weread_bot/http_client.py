@@ -1,34 +1,403 @@
 import asyncio
+import bisect
 import time
+import logging
+import weakref
 from typing import Tuple, Any, Dict, List
 import httpx
 
+from .metrics import RATE_LIMIT_WAIT, REQUEST_LATENCY
+from .retry import RetryPolicy, RetryBudget
+
+
+# 比较令牌数时的浮点误差容限
+_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """令牌桶：rate_limit 为每分钟补充的令牌数，burst 为突发容量
+
+    请求可以预留未来某一时刻的令牌，预留按发出时间排序保存，
+    到达发出时间后才计入令牌余量，因此早于已有预留的空闲时段仍可被其他请求使用。
+    """
+
+    def __init__(self, name: str, rate_limit: int, burst: int = 1):
+        self.name = name
+        self.rate_limit = max(0, rate_limit)
+        self.capacity = float(max(1, burst))
+        self._rate = self.rate_limit / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # 已预留、尚未到发出时间的请求（升序）
+        self._reserved: List[float] = []
+        # 等待时间统计
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_limit <= 0
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def _advance(self, now: float):
+        """把发出时间已到的预留计入令牌余量"""
+        while self._reserved and self._reserved[0] <= now:
+            self._refill(self._reserved.pop(0))
+            self._tokens -= 1
+        self._refill(now)
+
+    def _check(self, at: float) -> float:
+        """模拟在 at 时刻发出一个请求：可行时返回 at，否则返回下一个可能可行的时刻"""
+        tokens, updated = self._tokens, self._updated
+        pending = True
+        for reserved in self._reserved + [None]:
+            # 与已有预留同一时刻时排在其后
+            if pending and (reserved is None or at < reserved):
+                tokens = min(self.capacity, tokens + max(0.0, at - updated) * self._rate)
+                updated = max(updated, at)
+                if tokens < 1 - _EPSILON:
+                    return at + (1 - tokens) / self._rate
+                tokens -= 1
+                pending = False
+            if reserved is None:
+                break
+            tokens = min(self.capacity, tokens + max(0.0, reserved - updated) * self._rate)
+            updated = max(updated, reserved)
+            if tokens < 1 - _EPSILON:
+                # 会挤占这个已有的预留，只能排在它之后
+                return reserved
+            tokens -= 1
+        return at
+
+    def next_free(self, now: float, at: float = None) -> float:
+        """不早于 at（默认 now）且不影响已有预留的最早发出时刻"""
+        at = now if at is None else max(now, at)
+        if self.unlimited:
+            return at
+        self._advance(now)
+        while True:
+            candidate = self._check(at)
+            if candidate == at:
+                return at
+            at = candidate
+
+    def take(self, now: float, at: float):
+        """在 at 时刻消耗一个令牌，at 应取自 next_free"""
+        self.acquired += 1
+        if self.unlimited:
+            return
+        self._advance(now)
+        if at <= now:
+            self._tokens -= 1
+        else:
+            bisect.insort(self._reserved, at)
+
+    def record_wait(self, wait_time: float):
+        self.waits += 1
+        self.total_wait += wait_time
+        self.max_wait = max(self.max_wait, wait_time)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "rate_limit": self.rate_limit,
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "total_wait": round(self.total_wait, 3),
+            "avg_wait": round(self.total_wait / self.waits, 3) if self.waits else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
 
 class RateLimiter:
-    def __init__(self, rate_limit: int):
+    """分层令牌桶限速器：全局 → 主机 → 用户
+
+    所有会话共享同一个实例时，同一主机的请求共用一个预算；
+    acquire 先求出所有层级都有空闲令牌的最早时刻，再在该时刻从每个令牌桶预留令牌，
+    等待期间不持有锁。
+    """
+
+    def __init__(self, rate_limit: int, host_rate_limit: int = 0, global_rate_limit: int = 0, burst: int = 1):
         self.rate_limit = max(0, rate_limit)
-        self._interval = (60.0 / self.rate_limit) if self.rate_limit > 0 else 0
-        self._lock = asyncio.Lock()
-        self._last_acquire = 0.0
+        self.host_rate_limit = max(0, host_rate_limit)
+        self.burst = max(1, burst)
+        self._global = TokenBucket("global", global_rate_limit, self.burst)
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._users: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_network_config(cls, network_config) -> "RateLimiter":
+        """根据网络配置创建限速器"""
+        return cls(
+            network_config.rate_limit,
+            host_rate_limit=network_config.host_rate_limit,
+            global_rate_limit=network_config.global_rate_limit,
+            burst=network_config.rate_burst,
+        )
+
+    def _buckets(self, host: str, user: str) -> List[TokenBucket]:
+        buckets = [self._global]
+        if self.host_rate_limit > 0:
+            if host not in self._hosts:
+                self._hosts[host] = TokenBucket(f"host:{host}", self.host_rate_limit, self.burst)
+            buckets.append(self._hosts[host])
+        if self.rate_limit > 0:
+            if user not in self._users:
+                self._users[user] = TokenBucket(f"user:{user}", self.rate_limit, self.burst)
+            buckets.append(self._users[user])
+        return buckets
+
+    @staticmethod
+    def _dispatch_time(buckets: List[TokenBucket], now: float) -> float:
+        """所有令牌桶都能在该时刻发出请求的最早时间"""
+        dispatch = now
+        while True:
+            latest = dispatch
+            for bucket in buckets:
+                latest = bucket.next_free(now, latest)
+            if latest == dispatch:
+                return dispatch
+            dispatch = latest
+
+    def try_acquire(self, host: str = "", user: str = "") -> bool:
+        """非阻塞获取：所有层级都有可用令牌时才消耗并返回 True"""
+        now = time.monotonic()
+        buckets = self._buckets(host, user)
+        if self._dispatch_time(buckets, now) > now:
+            return False
+        for bucket in buckets:
+            bucket.take(now, now)
+        return True
+
+    def reserve(self, host: str = "", user: str = "") -> float:
+        """为一个请求预留令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        buckets = self._buckets(host, user)
+        limiting = [bucket for bucket in buckets if bucket.next_free(now) > now]
+        dispatch = self._dispatch_time(buckets, now)
+        for bucket in buckets:
+            bucket.take(now, dispatch)
+        wait_time = dispatch - now
+        if wait_time > 0:
+            for bucket in limiting:
+                bucket.record_wait(wait_time)
+        return wait_time
+
+    async def acquire(self, host: str = "", user: str = "") -> float:
+        """等待直到可以发出请求，返回等待的秒数"""
+        wait_time = self.reserve(host, user)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """获取各令牌桶的等待时间统计"""
+        buckets = [self._global, *self._hosts.values(), *self._users.values()]
+        return {bucket.name: bucket.get_stats() for bucket in buckets if not bucket.unlimited}
 
-    async def acquire(self):
-        if self.rate_limit <= 0:
+    def format_stats(self) -> str:
+        stats = self.get_stats()
+        waits = sum(item["waits"] for item in stats.values())
+        total_wait = sum(item["total_wait"] for item in stats.values())
+        max_wait = max((item["max_wait"] for item in stats.values()), default=0.0)
+        return f"🚦 限速统计: {len(stats)} 个令牌桶, 等待 {waits} 次, 累计等待 {total_wait:.1f} 秒, 最长等待 {max_wait:.1f} 秒"
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """共享连接池的传输层代理，关闭客户端时不会释放底层连接"""
+
+    def __init__(self, pool: "HttpConnectionPool"):
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool.handle_async_request(request)
+
+    async def aclose(self):
+        # 底层连接由 HttpConnectionPool 统一管理
+        pass
+
+
+class HttpConnectionPool:
+    """进程级共享的HTTP连接池
+
+    所有会话的 HttpClient 通过同一个传输层复用 TCP/TLS 连接，
+    每个客户端仍保留独立的 cookie jar，避免多用户之间串号。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        rate_limiter: RateLimiter = None,
+    ):
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max(1, max_connections),
+                max_keepalive_connections=max(0, max_keepalive_connections),
+                keepalive_expiry=keepalive_expiry,
+            )
+        )
+        # 共享限速器，保证所有用户对同一主机的总请求频率受控
+        self.rate_limiter = rate_limiter
+        self._clients: "weakref.WeakSet[httpx.AsyncClient]" = weakref.WeakSet()
+        self._closed = False
+        self.total_requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        # 在已有连接上完成的请求，以及其中本需要 TLS 握手的 HTTPS 请求
+        self.reused_requests = 0
+        self.handshakes_saved = 0
+        self.clients_created = 0
+        # 由 trace 事件记录的连接（网络流，TLS 连接记录握手后的流），连接被连接池释放后自动移除
+        self._streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        # 已发出、响应尚未关闭的请求数
+        self._in_flight = 0
+
+    @classmethod
+    def from_network_config(cls, network_config) -> "HttpConnectionPool":
+        """根据网络配置创建连接池"""
+        return cls(
+            max_connections=network_config.max_connections,
+            max_keepalive_connections=network_config.max_keepalive_connections,
+            keepalive_expiry=network_config.keepalive_expiry,
+            rate_limiter=RateLimiter.from_network_config(network_config),
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def create_client(self, timeout: int = 30) -> httpx.AsyncClient:
+        """创建共享连接池的客户端（cookie jar 独立）"""
+        if self._closed:
+            raise RuntimeError("连接池已关闭")
+        client = httpx.AsyncClient(timeout=timeout, transport=_SharedTransport(self))
+        self._clients.add(client)
+        self.clients_created += 1
+        return client
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream_trace = request.extensions.get("trace")
+        connected = False
+        tcp_stream = None
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                self._in_flight -= 1
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            nonlocal connected, tcp_stream
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+                connected = True
+                tcp_stream = info.get("return_value")
+                self._track_stream(tcp_stream)
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+                # 握手后连接改用 TLS 流，同一套接字只记录一次
+                if tcp_stream is not None:
+                    self._streams.discard(tcp_stream)
+                self._track_stream(info.get("return_value"))
+            elif event_name.endswith(".response_closed.complete"):
+                finish()
+            if upstream_trace is not None:
+                await upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.total_requests += 1
+        self._in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            finish()
+            raise
+        # 只有拿到响应且本次请求没有新建连接时才算复用（连接失败的请求会抛出异常，不计入）
+        if not connected:
+            self.reused_requests += 1
+            if request.url.scheme == "https":
+                self.handshakes_saved += 1
+        return response
+
+    def _track_stream(self, stream):
+        if stream is not None:
+            self._streams.add(stream)
+
+    @staticmethod
+    def _stream_open(stream) -> bool:
+        sock = stream.get_extra_info("socket")
+        return sock is None or sock.fileno() != -1
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取连接池统计：打开/空闲连接数、请求数、新建连接数、复用次数和节省的 TLS 握手次数
+
+        打开的连接来自 trace 事件记录的网络流（套接字未关闭的），空闲连接 = 打开的连接 - 进行中的请求。
+        """
+        open_connections = sum(1 for stream in list(self._streams) if self._stream_open(stream))
+        return {
+            "open": open_connections,
+            "idle": max(0, open_connections - self._in_flight),
+            "requests": self.total_requests,
+            "new_connections": self.new_connections,
+            "reused": self.reused_requests,
+            "tls_handshakes": self.tls_handshakes,
+            "handshakes_saved": self.handshakes_saved,
+            "clients": self.clients_created,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"🔌 连接池统计: 打开 {stats['open']} 个, 空闲 {stats['idle']} 个, "
+            f"请求 {stats['requests']} 次, 新建连接 {stats['new_connections']} 次, "
+            f"复用 {stats['reused']} 次, TLS 握手 {stats['tls_handshakes']} 次, "
+            f"节省握手 {stats['handshakes_saved']} 次"
+        )
+
+    async def close(self):
+        if self._closed:
             return
-        async with self._lock:
-            now = time.monotonic()
-            wait_time = self._interval - (now - self._last_acquire)
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-                now = time.monotonic()
-            self._last_acquire = now
+        self._closed = True
+        for client in list(self._clients):
+            if not client.is_closed:
+                await client.aclose()
+        await self._transport.aclose()
 
 
 class HttpClient:
-    def __init__(self, timeout: int = 30, retry_times: int = 3, rate_limit: int = 10):
-        self.config = type("cfg", (), {"timeout": timeout, "retry_times": retry_times, "retry_delay": "5-15", "rate_limit": rate_limit})
-        self.request_times: List[float] = []
-        self._rate_limiter = RateLimiter(rate_limit)
-        self._client = httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=20, max_keepalive_connections=20))
+    def __init__(
+        self,
+        timeout: int = 30,
+        retry_times: int = 3,
+        rate_limit: int = 10,
+        pool: HttpConnectionPool = None,
+        user: str = "default",
+        retry_policy: RetryPolicy = None,
+        retry_budget: int = 20,
+    ):
+        self.retry_policy = retry_policy or RetryPolicy(retry_times)
+        self.retry_budget = RetryBudget(retry_budget)
+        self.config = type("cfg", (), {"timeout": timeout, "retry_times": self.retry_policy.max_attempts, "retry_delay": f"{self.retry_policy.base_delay:g}-{self.retry_policy.max_delay:g}", "rate_limit": rate_limit})
+        self.user = user
+        # 仅保留累计值，延迟分布记录在指标直方图中
+        self._request_count = 0
+        self._request_time_total = 0.0
+        if pool is not None and pool.rate_limiter is not None:
+            self._rate_limiter = pool.rate_limiter
+        else:
+            self._rate_limiter = RateLimiter(rate_limit)
+        if pool is not None:
+            self._client = pool.create_client(timeout)
+        else:
+            self._client = httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=20, max_keepalive_connections=20))
 
     async def close(self):
         await self._client.aclose()
@@ -43,28 +412,47 @@ class HttpClient:
     async def _request_with_retries(self, url: str, headers: dict = None, cookies: dict = None, json_data: dict = None, data: Any = None) -> Tuple[Any, float]:
         attempts = max(1, self.config.retry_times)
         last_error = None
+        delay = 0.0
 
         for attempt in range(attempts):
+            # 限速等待单独统计，请求耗时从真正发出请求时开始计算
+            wait_time = await self._rate_limiter.acquire(httpx.URL(url).host, self.user)
+            RATE_LIMIT_WAIT.observe(wait_time, user=self.user)
             start_time = time.time()
             try:
-                await self._rate_limiter.acquire()
                 response = await self._client.post(url, headers=headers, cookies=cookies, json=json_data, data=data)
                 response.raise_for_status()
                 elapsed = time.time() - start_time
-                self.request_times.append(elapsed)
+                self._record_request_time(elapsed)
+                logging.debug(
+                    f"🌐 请求完成: {url} ({response.status_code}), 耗时 {elapsed:.3f} 秒",
+                    extra={"attempt": attempt + 1, "latency": round(elapsed, 4)},
+                )
                 return response, elapsed
             except Exception as exc:
                 elapsed = time.time() - start_time
-                self.request_times.append(elapsed)
+                self._record_request_time(elapsed)
                 last_error = exc
-                if attempt < attempts - 1:
-                    await asyncio.sleep(1)
-                else:
+                if attempt >= attempts - 1 or not self.retry_policy.is_retryable(exc):
+                    break
+                if not self.retry_budget.try_consume():
+                    logging.warning(f"⚠️ 用户 {self.user} 本次会话的重试预算已用尽，不再重试: {exc}")
                     break
+                delay = self.retry_policy.next_delay(delay, exc)
+                logging.debug(
+                    f"🔁 请求失败，{delay:.1f} 秒后重试 ({attempt + 1}/{attempts - 1}): {exc}",
+                    extra={"attempt": attempt + 1, "latency": round(elapsed, 4)},
+                )
+                await asyncio.sleep(delay)
 
         raise last_error if last_error else RuntimeError("请求失败")
 
+    def _record_request_time(self, elapsed: float):
+        self._request_count += 1
+        self._request_time_total += elapsed
+        REQUEST_LATENCY.observe(elapsed, user=self.user)
+
     def get_average_response_time(self) -> float:
-        if self.request_times:
-            return sum(self.request_times) / len(self.request_times)
+        if self._request_count:
+            return self._request_time_total / self._request_count
         return 0.0
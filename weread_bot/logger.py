@@ -1,12 +1,201 @@
+import atexit
+import contextvars
+import json
 import logging
+import queue
 import sys
-from pathlib import Path
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .config import LoggingConfig
 
 
+# print 重定向使用的日志记录器名称，其记录只写入日志文件
+PRINT_LOGGER_NAME = "weread.print"
+
+# 结构化日志支持的上下文字段，可通过 log_context 绑定或 extra 传入
+STRUCTURED_FIELDS = ("user", "book_id", "chapter_id", "attempt", "latency")
+
+_log_context: contextvars.ContextVar = contextvars.ContextVar("weread_log_context", default={})
+
+_sink = None
+_original_print = None
+
+
+def bind_log_context(**fields) -> contextvars.Token:
+    """在当前上下文（当前异步任务）中绑定日志字段，返回用于恢复的 token"""
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: contextvars.Token):
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    """在代码块内绑定日志上下文字段"""
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class _ContextFilter(logging.Filter):
+    """在调用线程中捕获当前的日志上下文，供写入线程格式化时使用"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.log_context = _log_context.get()
+        return True
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """入队前另存消息正文和异常堆栈
+
+    QueueHandler.prepare 会把异常堆栈合并进 msg 并清空 exc_info（文本格式直接使用合并后的 msg），
+    JsonFormatter 则从这里保存的属性输出独立的 message 和 exception 字段。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exception = None
+        if record.exc_info:
+            exception = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+        stack = record.stack_info
+
+        prepared = super().prepare(record)
+        prepared.log_message = message
+        prepared.log_exception = exception
+        prepared.log_stack = stack
+        # 调用栈已合并进 msg，避免写入线程格式化时重复输出
+        prepared.stack_info = None
+        return prepared
+
+
+class JsonFormatter(logging.Formatter):
+    """结构化JSON日志格式，每条记录输出一行合法的JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.__dict__.get("log_message")
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage() if message is None else message,
+        }
+        context = getattr(record, "log_context", None)
+        if context:
+            entry.update(context)
+        for key in STRUCTURED_FIELDS:
+            value = record.__dict__.get(key)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.__dict__.get("log_exception"):
+            entry["exception"] = record.log_exception
+        stack = record.stack_info or record.__dict__.get("log_stack")
+        if stack:
+            entry["stack"] = stack
+
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredFlushMixin:
+    """延迟刷新：逐条写入时不刷新，由日志写入线程在每批结束后统一刷新"""
+
+    def flush(self):
+        pass
+
+    def sync(self):
+        super().flush()
+
+
+class _BufferedStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+
+class _BufferedRotatingFileHandler(_DeferredFlushMixin, RotatingFileHandler):
+    pass
+
+
+class _BufferedFileHandler(_DeferredFlushMixin, logging.FileHandler):
+    pass
+
+
+class _SinkFormatter(logging.Formatter):
+    """print 记录沿用原有的 "[时间] 内容" 格式，其余记录使用配置的格式"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.name == PRINT_LOGGER_NAME:
+            return f"[{self.formatTime(record, '%Y-%m-%d %H:%M:%S')}] {record.getMessage()}"
+        return super().format(record)
+
+
+class LogSink:
+    """基于队列的日志写入器
+
+    所有日志记录（包括 print 重定向）经 QueueHandler 放入队列，
+    由单个后台线程批量取出写入各处理器，每批只刷新一次。
+    """
+
+    _STOP = object()
+
+    def __init__(self, handlers, batch_size: int = 256):
+        self.queue = queue.SimpleQueue()
+        self.handlers = list(handlers)
+        self.batch_size = max(1, batch_size)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="weread-log-sink", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is self._STOP:
+                    running = False
+                    continue
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+            for handler in self.handlers:
+                try:
+                    handler.sync()
+                except Exception:
+                    pass
+
+    def stop(self):
+        """写完队列中剩余的记录后停止后台线程"""
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join(timeout=5)
+        self._thread = None
+        for handler in self.handlers:
+            handler.close()
+
+
 def setup_logging(logging_config: LoggingConfig = None, verbose: bool = False):
     """设置日志系统"""
     if logging_config is None:
@@ -33,42 +222,55 @@ def setup_logging(logging_config: LoggingConfig = None, verbose: bool = False):
     format_map = {
         "simple": "%(levelname)s - %(message)s",
         "detailed": "%(asctime)s - %(levelname)-8s - %(message)s",
-        "json": '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}',
     }
     log_format = format_map.get(logging_config.format, format_map["detailed"])
+    use_json = logging_config.format == "json"
 
-    # 设置处理器
+    # 设置处理器（由后台日志写入线程统一调用）
     handlers = []
 
-    # 控制台处理器
+    # 控制台处理器（print 已直接输出到控制台，不重复输出）
     if logging_config.console:
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(logging.Formatter(log_format))
+        console_handler = _BufferedStreamHandler()
+        console_handler.setFormatter(JsonFormatter() if use_json else logging.Formatter(log_format))
+        console_handler.addFilter(lambda record: record.name != PRINT_LOGGER_NAME)
         handlers.append(console_handler)
 
     # 文件处理器（支持轮转）
     try:
         max_bytes = _parse_size(logging_config.max_size)
-        file_handler = RotatingFileHandler(
+        file_handler = _BufferedRotatingFileHandler(
             logging_config.file,
             maxBytes=max_bytes,
             backupCount=logging_config.backup_count,
             encoding="utf-8",
         )
-        file_handler.setFormatter(logging.Formatter(log_format))
+        file_handler.setFormatter(JsonFormatter() if use_json else _SinkFormatter(log_format))
         handlers.append(file_handler)
     except Exception as e:
-        file_handler = logging.FileHandler(logging_config.file, encoding="utf-8")
-        file_handler.setFormatter(logging.Formatter(log_format))
+        file_handler = _BufferedFileHandler(logging_config.file, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter() if use_json else _SinkFormatter(log_format))
         handlers.append(file_handler)
         print(f"⚠️ 日志轮转设置失败，使用普通文件处理器: {e}")
 
+    # 启动日志写入线程（重复调用时先写完旧队列）
+    global _sink
+    if _sink is not None:
+        _sink.stop()
+    _sink = LogSink(handlers)
+    _sink.start()
+
+    # 入队前只保留消息本身，格式化由写入线程完成
+    queue_handler = _StructuredQueueHandler(_sink.queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    queue_handler.addFilter(_ContextFilter())
+
     # 配置根日志记录器
     # Python 3.8+ 支持 force 参数，Python 3.7 需要手动处理
     basic_config_args = {
         "level": log_level,
         "format": log_format,
-        "handlers": handlers,
+        "handlers": [queue_handler],
     }
 
     # Python 3.8+ 支持 force 参数
@@ -78,7 +280,47 @@ def setup_logging(logging_config: LoggingConfig = None, verbose: bool = False):
     logging.basicConfig(**basic_config_args)
 
     # 创建自定义print函数，同时输出到控制台和日志文件
-    _setup_print_redirect(log_file_path)
+    _setup_print_redirect(queue_handler)
+
+
+def setup_worker_logging(log_queue, level: int = logging.INFO):
+    """工作进程日志：所有记录（包括 print 重定向）经进程间队列交给主进程的日志写入线程"""
+    queue_handler = _StructuredQueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    queue_handler.addFilter(_ContextFilter())
+
+    basic_config_args = {"level": level, "handlers": [queue_handler]}
+    if sys.version_info >= (3, 8):
+        basic_config_args["force"] = True
+    logging.basicConfig(**basic_config_args)
+
+    _setup_print_redirect(queue_handler)
+
+
+def forward_log_records(log_queue):
+    """在主进程中把工作进程的日志记录转交给日志写入线程，收到 None 时结束"""
+    while True:
+        try:
+            record = log_queue.get()
+        except (EOFError, OSError):
+            break
+        if record is None:
+            break
+        if _sink is not None:
+            _sink.queue.put(record)
+        else:
+            logging.getLogger(record.name).handle(record)
+
+
+def stop_logging():
+    """写完缓冲的日志并停止写入线程"""
+    global _sink
+    if _sink is not None:
+        _sink.stop()
+        _sink = None
+
+
+atexit.register(stop_logging)
 
 
 def _parse_size(size_str: str) -> int:
@@ -94,25 +336,35 @@ def _parse_size(size_str: str) -> int:
         return int(size_str)
 
 
-def _setup_print_redirect(log_file_path: Path):
-    """设置print重定向到日志文件"""
+def _setup_print_redirect(queue_handler: QueueHandler):
+    """设置print重定向到日志文件（经日志队列写入，不再逐次打开文件）"""
     import builtins
-    
-    # 保存原始print函数
-    original_print = builtins.print
+
+    global _original_print
+    # 保存原始print函数（重复调用时不嵌套）
+    if _original_print is None:
+        _original_print = builtins.print
+    original_print = _original_print
+
+    print_logger = logging.getLogger(PRINT_LOGGER_NAME)
+    print_logger.handlers = [queue_handler]
+    print_logger.setLevel(logging.INFO)
+    print_logger.propagate = False
 
     def custom_print(*args, **kwargs):
         """自定义print函数，同时输出到控制台和日志文件"""
         # 输出到控制台
         original_print(*args, **kwargs)
-        
-        # 写入到日志文件
+
+        # 写入其他文件对象（如 traceback 格式化时的 StringIO）的输出不记录
+        target = kwargs.get("file")
+        if target is not None and target not in (sys.stdout, sys.stderr):
+            return
+
+        # 写入到日志队列
         try:
-            with open(log_file_path, "a", encoding="utf-8") as f:
-                output = " ".join(str(arg) for arg in args) if args else ""
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"[{timestamp}] {output}\n")
-                f.flush()
+            output = " ".join(str(arg) for arg in args) if args else ""
+            print_logger.info(output)
         except Exception:
             pass  # 静默失败，避免影响程序运行
 
@@ -0,0 +1,385 @@
+import abc
+import asyncio
+import bisect
+import logging
+import math
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+# 请求延迟直方图的默认桶边界（秒）
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 直方图额外导出的分位数
+EXPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: Dict[str, str] = None) -> str:
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.extend(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    """指标基类，按标签值保存各时间序列
+
+    多进程分片时，工作进程定期上报快照（merge_remote），导出时与本进程的数据合并；
+    工作进程结束后其累计值并入本进程（finish_remote）。
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._remote: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def merge_remote(self, source: str, data: Dict[Tuple[str, ...], Any]):
+        """保存其他进程最近一次上报的快照（替换该来源之前的快照）"""
+        self._remote[source] = data
+
+    def finish_remote(self, source: str):
+        """来源进程已结束：把它最后的快照并入本进程的数据"""
+        data = self._remote.pop(source, None)
+        if data:
+            self._absorb(data)
+
+    @abc.abstractmethod
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        """本进程各时间序列数据的可序列化副本"""
+
+    @abc.abstractmethod
+    def _absorb(self, data: Dict[Tuple[str, ...], Any]):
+        """把已结束进程的快照并入本进程的数据"""
+
+    @abc.abstractmethod
+    def _render_samples(self) -> List[str]:
+        """返回该指标所有时间序列的样本行"""
+
+
+class _ValueMetric(_Metric):
+    """每个时间序列只有一个数值的指标（Counter、Gauge）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        return dict(self._values)
+
+    def _absorb(self, data: Dict[Tuple[str, ...], float]):
+        for key, value in data.items():
+            self._values[key] = self._values.get(key, 0) + value
+
+    def _merged_values(self) -> Dict[Tuple[str, ...], float]:
+        if not self._remote:
+            return self._values
+        merged = dict(self._values)
+        for data in self._remote.values():
+            for key, value in data.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._merged_values().items()
+        ]
+
+
+class Counter(_ValueMetric):
+    """单调递增计数器"""
+
+    metric_type = "counter"
+
+
+class Gauge(_ValueMetric):
+    """可增可减的瞬时值"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def _absorb(self, data: Dict[Tuple[str, ...], float]):
+        # 瞬时值只在进程运行期间有意义，进程结束后不再计入
+        pass
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """固定桶直方图，内存占用与观测次数无关"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        return {key: (list(series.counts), series.sum, series.count) for key, series in self._series.items()}
+
+    def _absorb(self, data: Dict[Tuple[str, ...], Tuple[List[int], float, int]]):
+        for key, values in data.items():
+            self._add_series(self._series, key, *values)
+
+    def _add_series(self, target: Dict[Tuple[str, ...], _HistogramSeries], key, counts, total: float, count: int):
+        series = target.get(key)
+        if series is None:
+            series = target[key] = _HistogramSeries(len(self.buckets))
+        series.counts = [a + b for a, b in zip(series.counts, counts)]
+        series.sum += total
+        series.count += count
+
+    def _merged_series(self) -> Dict[Tuple[str, ...], _HistogramSeries]:
+        if not self._remote:
+            return self._series
+        merged: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        for key, series in self._series.items():
+            self._add_series(merged, key, series.counts, series.sum, series.count)
+        for data in self._remote.values():
+            for key, values in data.items():
+                self._add_series(merged, key, *values)
+        return merged
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def mean(self, **labels) -> float:
+        series = self._series.get(self._key(labels))
+        return series.sum / series.count if series and series.count else 0.0
+
+    def quantile(self, q: float, **labels) -> float:
+        """按桶内线性插值估算分位数"""
+        series = self._series.get(self._key(labels))
+        return self._quantile(series, q) if series else 0.0
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> float:
+        if series.count == 0:
+            return 0.0
+        rank = q * series.count
+        cumulative = 0
+        for index, bucket_count in enumerate(series.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                if upper == math.inf:
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-2] if len(self.buckets) > 1 else 0.0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        quantile_name = f"{self.name}_quantile"
+        lines.append(f"# HELP {quantile_name} Estimated quantiles of {self.name}")
+        lines.append(f"# TYPE {quantile_name} gauge")
+        for key, series in self._merged_series().items():
+            for q in EXPORTED_QUANTILES:
+                labels = _format_labels(self.labelnames, key, {"quantile": str(q)})
+                lines.append(f"{quantile_name}{labels} {_format_value(self._quantile(series, q))}")
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, series in self._merged_series().items():
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets, series.counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, {"le": _format_value(upper)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+        """本进程全部指标的快照，供工作进程上报给主进程"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def merge_remote(self, source: str, snapshot: Dict[str, Dict[Tuple[str, ...], Any]]):
+        for name, data in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge_remote(source, data)
+
+    def finish_remote(self, source: str):
+        for metric in self._metrics.values():
+            metric.finish_remote(source)
+
+    def render(self) -> str:
+        """导出 Prometheus 文本格式"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """本地 Prometheus 文本格式指标端点（GET /metrics）"""
+
+    def __init__(self, registry: "MetricsRegistry", host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        print(f"📈 指标端点已启动: http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            # 读取并丢弃请求头
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+            if len(parts) >= 2 and parts[0] == "GET" and path in ("/metrics", "/"):
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body = "404 Not Found", b"not found\n"
+                content_type = "text/plain; charset=utf-8"
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logging.debug(f"⚠️ 指标请求处理失败: {e}")
+        finally:
+            writer.close()
+
+
+# 进程内默认注册表及内置指标
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "weread_request_latency_seconds", "HTTP request latency per user", ("user",)
+)
+RATE_LIMIT_WAIT = registry.histogram(
+    "weread_rate_limit_wait_seconds",
+    "Time requests spent waiting for the rate limiter",
+    ("user",),
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+READ_SUCCESSES = registry.counter(
+    "weread_read_success_total", "Reading requests accepted by the server", ("user",)
+)
+READ_FAILURES = registry.counter(
+    "weread_read_failure_total", "Reading requests rejected or failed", ("user",)
+)
+READ_FALLBACKS = registry.counter(
+    "weread_read_fallback_total", "Reading requests accepted via a fallback path", ("user", "kind")
+)
+COOKIE_REFRESHES = registry.counter(
+    "weread_cookie_refresh_total", "Cookie renewal attempts", ("user", "result")
+)
+ACTIVE_SESSIONS = registry.gauge("weread_active_sessions", "Reading sessions currently running")
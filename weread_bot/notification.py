@@ -1,74 +1,269 @@
-import requests
 import urllib.parse
 import asyncio
 import json
+import time
 import logging
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple
+import httpx
 from .config import NotificationChannel
+from .retry import RetryPolicy
+
+
+# 各通道单条消息的长度上限（UTF-8字节，已为标题预留余量），可通过通道配置 max_message_bytes 覆盖
+CHANNEL_MESSAGE_LIMITS = {
+    "pushplus": 20000,
+    "telegram": 4000,
+    "wxpusher": 1000,
+    "bark": 3000,
+    "ntfy": 4000,
+    "feishu": 20000,
+    "wework": 2000,
+    "dingtalk": 18000,
+}
+DEFAULT_MESSAGE_LIMIT = 4000
+
+DIGEST_SEPARATOR = "\n\n" + "─" * 16 + "\n\n"
+
+
+def _truncate_utf8(text: str, limit: int) -> Tuple[str, str]:
+    """按UTF-8字节数切分文本，保证不截断多字节字符"""
+    encoded = text.encode("utf-8")
+    if len(encoded) <= limit:
+        return text, ""
+    head = encoded[:limit].decode("utf-8", errors="ignore")
+    return head, text[len(head):]
+
+
+def build_digest_chunks(messages: List[str], limit: int) -> List[str]:
+    """将多条消息合并为摘要，并按字节上限拆分为若干段"""
+    # 为分段序号预留空间
+    body_limit = max(64, limit - 32)
+    separator_size = len(DIGEST_SEPARATOR.encode("utf-8"))
+    chunks: List[str] = []
+    current: List[str] = []
+    current_size = 0
+
+    for message in messages:
+        while message:
+            part, message = _truncate_utf8(message, body_limit)
+            part_size = len(part.encode("utf-8"))
+            extra = part_size + (separator_size if current else 0)
+            if current and current_size + extra > body_limit:
+                chunks.append(DIGEST_SEPARATOR.join(current))
+                current, current_size = [], 0
+                extra = part_size
+            current.append(part)
+            current_size += extra
+
+    if current:
+        chunks.append(DIGEST_SEPARATOR.join(current))
+
+    if len(chunks) > 1:
+        chunks = [f"📬 通知汇总 ({index}/{len(chunks)})\n\n{chunk}" for index, chunk in enumerate(chunks, start=1)]
+    return chunks
+
+
+@dataclass
+class ChannelResult:
+    """单个通道的发送结果"""
+    name: str
+    success: bool
+    elapsed: float = 0.0
+    error: str = ""
+
+
+@dataclass
+class NotificationSummary:
+    """一次通知分发的结果汇总"""
+    results: List[ChannelResult] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def success_count(self) -> int:
+        return sum(1 for result in self.results if result.success)
+
+    @property
+    def success(self) -> bool:
+        return self.total == 0 or self.success_count > 0
+
+    @property
+    def failed_channels(self) -> List[str]:
+        return [result.name for result in self.results if not result.success]
+
+    def format(self) -> str:
+        summary = f"📊 通知发送完成: {self.success_count}/{self.total} 个通道成功"
+        if self.failed_channels:
+            summary += f"，失败通道: {', '.join(self.failed_channels)}"
+        return summary
 
 
 class NotificationService:
-    """通知服务 - 支持多种通知渠道"""
-    
-    def __init__(self, config):
+    """通知服务 - 支持多种通知渠道
+
+    基于共享的 httpx.AsyncClient 并发向所有启用的通道发送，
+    每个通道独立超时与重试，慢通道不会阻塞其他通道。
+    """
+
+    # 单个通道（含重试）的整体超时时间（秒）
+    CHANNEL_TIMEOUT = 60
+
+    def __init__(self, config, client: httpx.AsyncClient = None, channel_timeout: float = CHANNEL_TIMEOUT):
         self.config = config
+        self.channel_timeout = channel_timeout
+        self._client = client
+        self._owns_client = client is None
+        self._proxy_clients: Dict[Tuple[Tuple[str, str], ...], httpx.AsyncClient] = {}
+
+    def _get_client(self, proxies: dict = None) -> httpx.AsyncClient:
+        """获取共享客户端，配置了代理的通道使用按代理缓存的独立客户端"""
+        if proxies:
+            key = tuple(sorted(proxies.items()))
+            if key not in self._proxy_clients:
+                mounts = {
+                    f"{scheme}://": httpx.AsyncHTTPTransport(proxy=proxy_url)
+                    for scheme, proxy_url in proxies.items()
+                    if scheme in ("http", "https") and proxy_url
+                }
+                self._proxy_clients[key] = httpx.AsyncClient(mounts=mounts)
+            return self._proxy_clients[key]
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient()
+            self._owns_client = True
+        return self._client
+
+    async def aclose(self):
+        """关闭通知服务持有的HTTP客户端"""
+        for client in self._proxy_clients.values():
+            await client.aclose()
+        self._proxy_clients.clear()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def send_notification_async(self, message: str) -> bool:
-        """异步发送通知（在线程池中执行）"""
-        return await asyncio.to_thread(self.send_notification, message)
+        """异步发送通知"""
+        summary = await self.dispatch(message)
+        return summary.success
 
     def send_notification(self, message: str) -> bool:
         """同步发送通知"""
+        async def _send():
+            try:
+                return await self.send_notification_async(message)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_send())
+
+    async def dispatch(self, message: str) -> NotificationSummary:
+        """并发发送通知到所有启用的通道，返回结果汇总"""
+        summary = NotificationSummary()
         if not self.config.enabled:
-            return True
+            return summary
+
+        channels = [c for c in self.config.channels if c.enabled]
+        if not channels:
+            logging.warning("⚠️ 没有启用的通知通道")
+            return summary
 
-        success_count = 0
-        total_channels = len([c for c in self.config.channels if c.enabled])
-        if total_channels == 0:
+        summary.results = list(
+            await asyncio.gather(*(self._send_with_timeout(message, channel) for channel in channels))
+        )
+        print(summary.format())
+        return summary
+
+    async def dispatch_digest(self, messages: List[str]) -> NotificationSummary:
+        """将多条消息合并为摘要，按各通道的长度限制分段后并发发送"""
+        summary = NotificationSummary()
+        if not self.config.enabled or not messages:
+            return summary
+
+        channels = [c for c in self.config.channels if c.enabled]
+        if not channels:
             logging.warning("⚠️ 没有启用的通知通道")
-            return True
-
-        for channel in self.config.channels:
-            if channel.enabled:
-                try:
-                    ok = self._send_notification_to_channel(message, channel)
-                    if ok:
-                        success_count += 1
-                        print(f"✅ 通道 {channel.name} 通知发送成功")
-                    else:
-                        logging.warning(f"⚠️ 通道 {channel.name} 通知发送失败")
-                except Exception as e:
-                    logging.error(f"❌ 通道 {channel.name} 通知发送异常: {e}")
-
-        print(f"📊 通知发送完成: {success_count}/{total_channels} 个通道成功")
-        return success_count > 0
-
-    def _send_notification_to_channel(self, message: str, channel: NotificationChannel) -> bool:
+            return summary
+
+        summary.results = list(
+            await asyncio.gather(*(self._send_digest_to_channel(messages, channel) for channel in channels))
+        )
+        print(f"{summary.format()} (合并 {len(messages)} 条消息)")
+        return summary
+
+    @staticmethod
+    def get_message_limit(channel: NotificationChannel) -> int:
+        """获取通道单条消息的字节上限"""
+        cfg = channel.config or {}
+        try:
+            return int(cfg.get("max_message_bytes") or CHANNEL_MESSAGE_LIMITS.get(channel.name, DEFAULT_MESSAGE_LIMIT))
+        except (TypeError, ValueError):
+            return CHANNEL_MESSAGE_LIMITS.get(channel.name, DEFAULT_MESSAGE_LIMIT)
+
+    async def _send_digest_to_channel(self, messages: List[str], channel: NotificationChannel) -> ChannelResult:
+        """按顺序发送某通道的所有摘要分段"""
+        results = [
+            await self._send_with_timeout(chunk, channel)
+            for chunk in build_digest_chunks(messages, self.get_message_limit(channel))
+        ]
+        return ChannelResult(
+            channel.name,
+            all(result.success for result in results),
+            sum(result.elapsed for result in results),
+            "; ".join(result.error for result in results if result.error),
+        )
+
+    async def _send_with_timeout(self, message: str, channel: NotificationChannel) -> ChannelResult:
+        """带超时地发送到单个通道，异常不会影响其他通道"""
+        start_time = time.monotonic()
+        error = ""
+        try:
+            ok = await asyncio.wait_for(
+                self._send_notification_to_channel(message, channel), timeout=self.channel_timeout
+            )
+            if ok:
+                print(f"✅ 通道 {channel.name} 通知发送成功")
+            else:
+                logging.warning(f"⚠️ 通道 {channel.name} 通知发送失败")
+        except asyncio.TimeoutError:
+            ok = False
+            error = f"超时({self.channel_timeout}秒)"
+            logging.error(f"❌ 通道 {channel.name} 通知发送超时")
+        except Exception as e:
+            ok = False
+            error = str(e)
+            logging.error(f"❌ 通道 {channel.name} 通知发送异常: {e}")
+        return ChannelResult(channel.name, ok, time.monotonic() - start_time, error)
+
+    async def _send_notification_to_channel(self, message: str, channel: NotificationChannel) -> bool:
         """发送通知到特定通道"""
         name = channel.name
         cfg = channel.config or {}
         
         if name == "pushplus":
-            return self._send_pushplus(message, cfg)
+            return await self._send_pushplus(message, cfg)
         elif name == "telegram":
-            return self._send_telegram(message, cfg)
+            return await self._send_telegram(message, cfg)
         elif name == "wxpusher":
-            return self._send_wxpusher(message, cfg)
+            return await self._send_wxpusher(message, cfg)
         elif name == "bark":
-            return self._send_bark(message, cfg)
+            return await self._send_bark(message, cfg)
         elif name == "ntfy":
-            return self._send_ntfy(message, cfg)
+            return await self._send_ntfy(message, cfg)
         elif name == "feishu":
-            return self._send_feishu(message, cfg)
+            return await self._send_feishu(message, cfg)
         elif name == "wework":
-            return self._send_wework(message, cfg)
+            return await self._send_wework(message, cfg)
         elif name == "dingtalk":
-            return self._send_dingtalk(message, cfg)
+            return await self._send_dingtalk(message, cfg)
         else:
             logging.warning(f"⚠️ 未知的通知通道: {name}")
             return False
 
-    def _send_pushplus(self, message: str, config: dict) -> bool:
+    async def _send_pushplus(self, message: str, config: dict) -> bool:
         """发送PushPlus通知"""
         token = config.get("token")
         if not token:
@@ -77,9 +272,9 @@ class NotificationService:
 
         url = "https://www.pushplus.plus/send"
         data = {"token": token, "title": "微信读书自动阅读报告", "content": message}
-        return self._http_post(url, data)
+        return await self._http_post(url, data)
 
-    def _send_telegram(self, message: str, config: dict) -> bool:
+    async def _send_telegram(self, message: str, config: dict) -> bool:
         """发送Telegram通知"""
         bot_token = config.get("bot_token")
         chat_id = config.get("chat_id")
@@ -90,9 +285,9 @@ class NotificationService:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         data = {"chat_id": chat_id, "text": message}
         proxies = config.get("proxy", {})
-        return self._http_post(url, data, proxies=proxies, use_json=True, timeout=30)
+        return await self._http_post(url, data, proxies=proxies, use_json=True, timeout=30)
 
-    def _send_wxpusher(self, message: str, config: dict) -> bool:
+    async def _send_wxpusher(self, message: str, config: dict) -> bool:
         """发送WxPusher通知"""
         spt = config.get("spt")
         if not spt:
@@ -100,15 +295,9 @@ class NotificationService:
             return False
 
         url = f"https://wxpusher.zjiecode.com/api/send/message/{spt}/{urllib.parse.quote(message)}"
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            logging.error(f"❌ WxPusher通知发送失败: {e}")
-            return False
+        return await self._http_request("GET", url, timeout=10, max_retries=1)
 
-    def _send_bark(self, message: str, config: dict) -> bool:
+    async def _send_bark(self, message: str, config: dict) -> bool:
         """发送Bark通知"""
         server = config.get("server")
         device_key = config.get("device_key")
@@ -120,9 +309,9 @@ class NotificationService:
         data = {"title": "微信读书自动阅读报告", "body": message}
         if config.get("sound"):
             data["sound"] = config["sound"]
-        return self._http_post(url, data)
+        return await self._http_post(url, data)
 
-    def _send_ntfy(self, message: str, config: dict) -> bool:
+    async def _send_ntfy(self, message: str, config: dict) -> bool:
         """发送Ntfy通知"""
         server = config.get("server")
         topic = config.get("topic")
@@ -133,20 +322,16 @@ class NotificationService:
         url = f"{server.rstrip('/')}/{topic}"
         headers = {
             "Content-Type": "text/plain; charset=utf-8",
-            "Title": "微信读书自动阅读报告",
+            "Title": "微信读书自动阅读报告".encode("utf-8"),
         }
         if config.get("token"):
             headers["Authorization"] = f"Bearer {config['token']}"
 
-        try:
-            response = requests.post(url, data=message.encode("utf-8"), headers=headers, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            logging.error(f"❌ Ntfy通知发送失败: {e}")
-            return False
+        return await self._http_request(
+            "POST", url, content=message.encode("utf-8"), headers=headers, timeout=10, max_retries=1
+        )
 
-    def _send_feishu(self, message: str, config: dict) -> bool:
+    async def _send_feishu(self, message: str, config: dict) -> bool:
         """发送飞书通知"""
         webhook_url = config.get("webhook_url")
         if not webhook_url:
@@ -169,9 +354,9 @@ class NotificationService:
         else:
             data = {"msg_type": "text", "content": {"text": f"微信读书自动阅读报告\n\n{message}"}}
 
-        return self._http_post(webhook_url, data)
+        return await self._http_post(webhook_url, data)
 
-    def _send_wework(self, message: str, config: dict) -> bool:
+    async def _send_wework(self, message: str, config: dict) -> bool:
         """发送企业微信通知"""
         webhook_url = config.get("webhook_url")
         if not webhook_url:
@@ -184,9 +369,9 @@ class NotificationService:
         else:
             data = {"msgtype": "text", "text": {"content": f"微信读书自动阅读报告\n\n{message}"}}
 
-        return self._http_post(webhook_url, data)
+        return await self._http_post(webhook_url, data)
 
-    def _send_dingtalk(self, message: str, config: dict) -> bool:
+    async def _send_dingtalk(self, message: str, config: dict) -> bool:
         """发送钉钉通知"""
         webhook_url = config.get("webhook_url")
         if not webhook_url:
@@ -205,9 +390,9 @@ class NotificationService:
         else:
             data = {"msgtype": "text", "text": {"content": f"微信读书自动阅读报告\n\n{message}"}}
 
-        return self._http_post(webhook_url, data)
+        return await self._http_post(webhook_url, data)
 
-    def _http_post(
+    async def _http_post(
         self,
         url: str,
         data: Dict[str, Any],
@@ -217,22 +402,95 @@ class NotificationService:
         max_retries: int = 3,
     ) -> bool:
         """通用HTTP POST请求"""
+        if use_json:
+            return await self._http_request(
+                "POST", url, proxies=proxies, timeout=timeout, max_retries=max_retries, json=data
+            )
+        headers = {"Content-Type": "application/json"}
+        return await self._http_request(
+            "POST",
+            url,
+            proxies=proxies,
+            timeout=timeout,
+            max_retries=max_retries,
+            content=json.dumps(data).encode("utf-8"),
+            headers=headers,
+        )
+
+    async def _http_request(
+        self,
+        method: str,
+        url: str,
+        proxies: dict = None,
+        timeout: int = 10,
+        max_retries: int = 3,
+        **kwargs,
+    ) -> bool:
+        """通用异步HTTP请求，失败后短暂退避重试"""
+        client = self._get_client(proxies)
         for attempt in range(max_retries):
             try:
-                if use_json:
-                    response = requests.post(url, json=data, proxies=proxies, timeout=timeout)
-                else:
-                    headers = {"Content-Type": "application/json"}
-                    response = requests.post(
-                        url, data=json.dumps(data).encode("utf-8"), headers=headers, timeout=timeout
-                    )
+                response = await client.request(method, url, timeout=timeout, **kwargs)
                 response.raise_for_status()
                 return True
             except Exception as e:
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and RetryPolicy.is_retryable(e):
                     logging.debug(f"重试 {attempt + 1}/{max_retries}: {e}")
+                    await asyncio.sleep(attempt + 1)
                     continue
                 else:
-                    logging.error(f"❌ HTTP POST失败: {e}")
+                    logging.error(f"❌ HTTP {method}失败: {e}")
                     return False
         return False
+
+
+class NotificationAggregator:
+    """通知聚合器
+
+    在时间窗口内缓冲消息，窗口结束、显式 flush 或关闭时合并为摘要发送，
+    避免多用户运行时每个用户单独推送造成通道限流。
+    """
+
+    def __init__(self, service: NotificationService, window: float = 60):
+        self.service = service
+        self.window = max(0.0, window)
+        self._buffer: List[str] = []
+        self._flush_task: asyncio.Task = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, message: str):
+        """加入一条待发送消息，窗口到期后自动合并发送"""
+        if not message:
+            return
+        self._buffer.append(message)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after(self.window))
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"❌ 通知摘要发送失败: {e}")
+
+    async def flush(self) -> NotificationSummary:
+        """立即合并并发送缓冲区中的所有消息"""
+        task = self._flush_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            self._flush_task = None
+
+        async with self._lock:
+            messages, self._buffer = self._buffer, []
+            if not messages:
+                return NotificationSummary()
+            return await self.service.dispatch_digest(messages)
+
+    async def aclose(self):
+        """关闭前发送剩余消息"""
+        await self.flush()
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import UserConfig, WeReadConfig
+from .scheduler import wait_for_shutdown
+
+# 可以在运行中直接替换的配置：顶层字段直接赋值，
+# 配置段原地更新（会话引用同一个对象，下一次读取即生效）
+LIVE_FIELDS = ("startup_delay", "max_concurrent_users", "curl_file_path", "curl_content")
+LIVE_SECTIONS = ("reading", "human_simulation", "hack", "daemon", "schedule", "notification", "cookie")
+# 修改后需要重启才能生效的配置
+RESTART_FIELDS = (
+    "startup_mode", "worker_processes", "hot_reload", "hot_reload_interval",
+    "network", "logging", "metrics", "state",
+)
+
+FileSignature = Optional[Tuple[int, int]]
+
+_observer_class = None
+_observer_checked = False
+
+
+def _load_observer():
+    """首次监视文件时才导入 watchdog（可选依赖），未安装时返回 None"""
+    global _observer_class, _observer_checked
+    if not _observer_checked:
+        _observer_checked = True
+        try:
+            from watchdog.observers import Observer
+            _observer_class = Observer
+        except ImportError:
+            _observer_class = None
+    return _observer_class
+
+
+@dataclass
+class ConfigDiff:
+    """两次加载的配置之间的差异"""
+    added_users: List[UserConfig] = field(default_factory=list)
+    removed_users: List[str] = field(default_factory=list)
+    changed_users: List[UserConfig] = field(default_factory=list)
+    changed_sections: List[str] = field(default_factory=list)
+    restart_required: List[str] = field(default_factory=list)
+    # 全局CURL（文件内容、路径或 WEREAD_CURL_STRING）发生变化，影响未单独配置CURL的会话
+    global_curl_changed: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added_users or self.removed_users or self.changed_users
+            or self.changed_sections or self.restart_required or self.global_curl_changed
+        )
+
+    def describe(self) -> str:
+        parts = []
+        if self.added_users:
+            parts.append(f"新增用户 {', '.join(u.name for u in self.added_users)}")
+        if self.removed_users:
+            parts.append(f"移除用户 {', '.join(self.removed_users)}")
+        if self.changed_users:
+            parts.append(f"更新用户 {', '.join(u.name for u in self.changed_users)}")
+        if self.changed_sections:
+            parts.append(f"更新配置 {', '.join(self.changed_sections)}")
+        if self.global_curl_changed:
+            parts.append("更新全局CURL")
+        return "，".join(parts) or "无变化"
+
+
+def diff_configs(old: WeReadConfig, new: WeReadConfig, changed_files: Iterable[str] = ()) -> ConfigDiff:
+    """计算配置差异；changed_files 中的CURL文件发生变化时，引用它的用户视为已更新"""
+    diff = ConfigDiff()
+    changed_files = {_normalize(path) for path in changed_files}
+
+    old_users = {user.name: user for user in old.users}
+    new_users = {user.name: user for user in new.users}
+    for name, user in new_users.items():
+        previous = old_users.get(name)
+        if previous is None:
+            diff.added_users.append(user)
+        elif previous != user or (user.file_path and _normalize(user.file_path) in changed_files):
+            diff.changed_users.append(user)
+    diff.removed_users = [name for name in old_users if name not in new_users]
+
+    for name in LIVE_FIELDS + LIVE_SECTIONS:
+        if getattr(old, name) != getattr(new, name):
+            diff.changed_sections.append(name)
+    for name in RESTART_FIELDS:
+        if getattr(old, name) != getattr(new, name):
+            diff.restart_required.append(name)
+    diff.global_curl_changed = bool(
+        "curl_file_path" in diff.changed_sections
+        or "curl_content" in diff.changed_sections
+        or (new.curl_file_path and _normalize(new.curl_file_path) in changed_files)
+    )
+    return diff
+
+
+def apply_live_changes(config: WeReadConfig, new: WeReadConfig, diff: ConfigDiff):
+    """把可热更新的部分写入正在使用的配置对象，保持各配置段的对象引用不变"""
+    config.users = new.users
+    for name in diff.changed_sections:
+        if name in LIVE_FIELDS:
+            setattr(config, name, getattr(new, name))
+            continue
+        section, source = getattr(config, name), getattr(new, name)
+        for f in fields(section):
+            setattr(section, f.name, getattr(source, f.name))
+
+
+def watched_paths(config_path: str, config: WeReadConfig) -> Set[str]:
+    """需要监视的文件：配置文件、全局和各用户的CURL文件"""
+    paths = {config_path}
+    if config.curl_file_path:
+        paths.add(config.curl_file_path)
+    paths.update(user.file_path for user in config.users if user.file_path)
+    return {_normalize(path) for path in paths}
+
+
+def _normalize(path: str) -> str:
+    return os.path.abspath(path)
+
+
+def _signature(path: str) -> FileSignature:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _WakeHandler:
+    """watchdog 事件处理器，任何事件都只唤醒监视循环（观察者只调用 dispatch）"""
+
+    def __init__(self, wake: Callable[[], None]):
+        self._wake = wake
+
+    def dispatch(self, event):
+        self._wake()
+
+
+class FileWatcher:
+    """文件变化监视器
+
+    安装了 watchdog 时由 inotify 等系统通知唤醒，否则按 interval 轮询；
+    两种方式都以 (mtime, size) 比较确认实际发生变化的文件，并在连续写入结束后（debounce）才回调。
+    """
+
+    def __init__(self, shutdown_event: asyncio.Event, interval: float = 5.0, debounce: float = 1.0):
+        self.shutdown_event = shutdown_event
+        self.interval = max(0.5, interval)
+        self.debounce = debounce
+        self._signatures: Dict[str, FileSignature] = {}
+        self._wakeup = asyncio.Event()
+        self._observer = None
+        self._watched_dirs: Set[str] = set()
+
+    @property
+    def paths(self) -> List[str]:
+        return sorted(self._signatures)
+
+    @property
+    def mode(self) -> str:
+        return "watchdog" if _load_observer() is not None else "polling"
+
+    def watch(self, paths: Iterable[str]):
+        """设置需要监视的文件（可重复调用以更新列表）"""
+        paths = set(paths)
+        self._signatures = {path: self._signatures.get(path, _signature(path)) for path in paths}
+        if _load_observer() is not None:
+            self._watch_directories({str(Path(path).parent) for path in paths})
+
+    def _watch_directories(self, directories: Set[str]):
+        loop = asyncio.get_running_loop()
+        if self._observer is None:
+            self._observer = _load_observer()()
+            self._observer.daemon = True
+            self._observer.start()
+        handler = _WakeHandler(lambda: loop.call_soon_threadsafe(self._wakeup.set))
+        for directory in directories - self._watched_dirs:
+            if os.path.isdir(directory):
+                self._observer.schedule(handler, directory, recursive=False)
+                self._watched_dirs.add(directory)
+
+    def _changed(self) -> Set[str]:
+        changed = set()
+        for path, previous in self._signatures.items():
+            current = _signature(path)
+            if current != previous:
+                self._signatures[path] = current
+                changed.add(path)
+        return changed
+
+    async def run(self, on_change: Callable[[Set[str]], "asyncio.Future"]):
+        """监视直到收到关闭信号，on_change 为接收变化文件集合的协程函数"""
+        try:
+            while not self.shutdown_event.is_set():
+                if self._observer is not None:
+                    await self._wait_for_event()
+                elif await wait_for_shutdown(self.shutdown_event, self.interval):
+                    break
+
+                changed = self._changed()
+                if not changed:
+                    continue
+                # 等待编辑器/部署工具写完，把同一批修改合并为一次重载
+                while await wait_for_shutdown(self.shutdown_event, self.debounce) is False:
+                    more = self._changed()
+                    if not more:
+                        break
+                    changed |= more
+                if self.shutdown_event.is_set():
+                    break
+                try:
+                    await on_change(changed)
+                except Exception as e:
+                    logging.error(f"❌ 配置热重载失败: {e}", exc_info=True)
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer = None
+
+    async def _wait_for_event(self):
+        self._wakeup.clear()
+        waiters = [
+            asyncio.ensure_future(self.shutdown_event.wait()),
+            asyncio.ensure_future(self._wakeup.wait()),
+        ]
+        try:
+            # 仍然设置超时兜底，防止个别文件系统（如网络挂载）不发通知
+            await asyncio.wait(waiters, timeout=max(self.interval, 60), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
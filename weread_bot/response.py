@@ -0,0 +1,63 @@
+import json
+import logging
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .credited import CreditedExtractor, get_extractor
+
+
+def debug_enabled() -> bool:
+    """根日志记录器是否输出 DEBUG，用于跳过昂贵的调试信息构建"""
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+
+class ResponseEvaluation:
+    """阅读接口响应的评估结果
+
+    响应体只解析一次，succ / synckey / 记入时长一次性计算完成，
+    原始文本只在访问 raw_text 时才解码。
+    """
+
+    __slots__ = ("response", "data", "parsed", "succ", "has_synckey", "credited")
+
+    def __init__(
+        self,
+        response,
+        data: Dict[str, Any],
+        parsed: bool,
+        fallback_credited: int = 0,
+        extractor: CreditedExtractor = None,
+    ):
+        self.response = response
+        self.data = data
+        self.parsed = parsed
+        self.succ = bool(data.get("succ") or data.get("success"))
+        self.has_synckey = "synckey" in data
+        self.credited = 0
+        if self.succ:
+            extracted = (extractor or get_extractor()).extract(data)
+            self.credited = extracted if extracted is not None else fallback_credited
+
+    @property
+    def raw_text(self) -> str:
+        try:
+            return self.response.text
+        except Exception:
+            return ""
+
+
+def evaluate_response(response, fallback_credited: int = 0, extractor: CreditedExtractor = None) -> ResponseEvaluation:
+    """解析并评估阅读接口响应，fallback_credited 为响应中没有时长字段时的记入值"""
+    try:
+        content = response.content
+        data = orjson.loads(content) if orjson is not None else json.loads(content)
+        parsed = True
+    except Exception:
+        data, parsed = {}, False
+    if not isinstance(data, dict):
+        data = {}
+    return ResponseEvaluation(response, data, parsed, fallback_credited, extractor)
@@ -0,0 +1,99 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from .utils import RandomHelper
+
+
+# 可重试的HTTP状态码：超时、限流和服务端临时故障
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# 可重试的传输层异常：超时、网络中断、服务端协议异常
+RETRYABLE_EXCEPTIONS = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+
+
+class RetryBudget:
+    """会话级重试预算，限制整个会话内的重试总次数"""
+
+    def __init__(self, max_retries: int = 20):
+        self.max_retries = max(0, max_retries)
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_retries - self.used)
+
+    def try_consume(self) -> bool:
+        if self.used >= self.max_retries:
+            return False
+        self.used += 1
+        return True
+
+
+class RetryPolicy:
+    """重试策略：指数退避 + 去相关抖动，支持 Retry-After 头
+
+    base_delay/max_delay 来自 NetworkConfig.retry_delay（如 "5-15"），
+    首次重试在该区间内随机，之后按去相关抖动增长，最长不超过 cap 秒。
+    """
+
+    def __init__(self, max_attempts: int = 3, retry_delay: str = "5-15", cap: float = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay, self.max_delay = RandomHelper.parse_range(retry_delay)
+        self.base_delay = max(0.0, self.base_delay)
+        self.max_delay = max(self.base_delay, self.max_delay)
+        self.cap = max(self.max_delay, cap)
+
+    @classmethod
+    def from_network_config(cls, network_config) -> "RetryPolicy":
+        """根据网络配置创建重试策略"""
+        return cls(
+            max_attempts=network_config.retry_times,
+            retry_delay=network_config.retry_delay,
+            cap=network_config.retry_max_delay,
+        )
+
+    @staticmethod
+    def is_retryable(exc: Exception) -> bool:
+        """判断异常是否值得重试，4xx等永久性错误立即失败"""
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(exc, RETRYABLE_EXCEPTIONS)
+
+    def next_delay(self, previous_delay: float, exc: Exception = None) -> float:
+        """计算下一次重试前的等待时间"""
+        if previous_delay <= 0:
+            delay = random.uniform(self.base_delay, self.max_delay)
+        else:
+            delay = min(self.cap, random.uniform(self.base_delay, previous_delay * 3))
+
+        retry_after = self.get_retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.cap))
+        return delay
+
+    @staticmethod
+    def get_retry_after(exc: Exception) -> Optional[float]:
+        """从响应的 Retry-After 头中解析等待秒数"""
+        if not isinstance(exc, httpx.HTTPStatusError):
+            return None
+        value = exc.response.headers.get("retry-after")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
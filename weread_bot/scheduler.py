@@ -0,0 +1,87 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+
+async def wait_for_shutdown(shutdown_event: asyncio.Event, timeout: Optional[float]) -> bool:
+    """休眠 timeout 秒，收到关闭信号时立即返回；返回是否已请求关闭"""
+    if timeout is not None and timeout <= 0:
+        return shutdown_event.is_set()
+    try:
+        await asyncio.wait_for(shutdown_event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    return shutdown_event.is_set()
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """调度队列中的任务，按 (到期时间, 优先级, 入队顺序) 排序"""
+    due: float
+    priority: int
+    seq: int
+    name: str = field(compare=False)
+    payload: Any = field(compare=False, default=None)
+    cancelled: bool = field(compare=False, default=False)
+
+
+class JobScheduler:
+    """基于最小堆的任务调度器
+
+    空闲时只休眠到最早到期的任务（或收到关闭信号、有更早的任务入队），不做周期性轮询。
+    """
+
+    def __init__(self, shutdown_event: asyncio.Event):
+        self.shutdown_event = shutdown_event
+        self._heap: List[ScheduledJob] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return sum(1 for job in self._heap if not job.cancelled)
+
+    def schedule(self, due: float, name: str, payload: Any = None, priority: int = 0) -> ScheduledJob:
+        """在 due（Unix 时间戳）加入任务，priority 越小越先执行"""
+        job = ScheduledJob(due, priority, next(self._seq), name, payload)
+        heapq.heappush(self._heap, job)
+        if self._heap[0] is job:
+            self._wakeup.set()
+        return job
+
+    def cancel(self, job: ScheduledJob):
+        """取消任务（惰性删除）"""
+        job.cancelled = True
+
+    def peek(self) -> Optional[ScheduledJob]:
+        """最早到期的任务"""
+        self._drop_cancelled()
+        return self._heap[0] if self._heap else None
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+
+    async def next_job(self) -> Optional[ScheduledJob]:
+        """等待并取出下一个到期任务，收到关闭信号时返回 None"""
+        while not self.shutdown_event.is_set():
+            job = self.peek()
+            timeout = None
+            if job is not None:
+                timeout = job.due - time.time()
+                if timeout <= 0:
+                    return heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            waiters = [
+                asyncio.ensure_future(self.shutdown_event.wait()),
+                asyncio.ensure_future(self._wakeup.wait()),
+            ]
+            try:
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        return None
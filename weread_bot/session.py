@@ -1,15 +1,23 @@
 import time
-import random
-import hashlib
 import asyncio
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple
-
-from .http_client import HttpClient
+from typing import Tuple
+
+from .http_client import HttpClient, HttpConnectionPool
+from .logger import log_context, bind_log_context
+from .metrics import ACTIVE_SESSIONS, COOKIE_REFRESHES, READ_FAILURES, READ_FALLBACKS, READ_SUCCESSES
+from .cookies import get_cookie_lifecycle
+from .credited import get_extractor
+from .response import debug_enabled, evaluate_response
+from .retry import RetryPolicy
+from .signing import ReadPayloadSigner
+from .state import UserState, get_state_store
+from .stats import OrderedSet, P2Quantile, RunningStats
 from .reading import SmartReadingManager
-from .utils import encode_data, calculate_hash, RandomHelper, CurlParser
+from .curl import read_curl_file
+from .utils import RandomHelper, CurlParser
 from .config import WeReadConfig, UserConfig
 
 
@@ -30,18 +38,26 @@ class ReadingSession:
         self.credited_seconds = 0  # 服务器可能记入的有效阅读时长
         self.successful_reads = 0
         self.failed_reads = 0
-        self.books_read: List[str] = []
-        self.books_read_names: List[str] = []
-        self.chapters_read: List[str] = []
+        self.books_read = OrderedSet()
+        self.books_read_names = OrderedSet()
+        self.chapters_read = OrderedSet()
         self.breaks_taken = 0
         self.total_break_time = 0
-        self.response_times: List[float] = []
+        # 响应时间使用流式统计，内存占用与请求次数无关
+        self.response_stats = RunningStats()
+        self.response_p95 = P2Quantile(0.95)
+
+    def record_response_time(self, response_time: float):
+        self.response_stats.add(response_time)
+        self.response_p95.add(response_time)
 
     @property
     def average_response_time(self) -> float:
-        if self.response_times:
-            return sum(self.response_times) / len(self.response_times)
-        return 0.0
+        return self.response_stats.mean
+
+    @property
+    def p95_response_time(self) -> float:
+        return self.response_p95.value
 
     @property
     def success_rate(self) -> float:
@@ -56,7 +72,7 @@ class ReadingSession:
 
     def get_statistics_summary(self) -> str:
         """获取统计摘要"""
-        books_info = ", ".join(set(self.books_read_names)) if self.books_read_names else "无书名信息"
+        books_info = ", ".join(self.books_read_names) if self.books_read_names else "无书名信息"
         credited_minutes = self.credited_seconds // 60
         credited_seconds_rem = self.credited_seconds % 60
         return f"""📊 微信读书自动阅读统计报告
@@ -67,8 +83,8 @@ class ReadingSession:
 ✅ 成功请求: {self.successful_reads}次
 ❌ 失败请求: {self.failed_reads}次
 📈 成功率: {self.success_rate:.1f}%
-📚 阅读书籍: {len(set(self.books_read))}本 ({books_info})
-📄 阅读章节: {len(set(self.chapters_read))}个
+📚 阅读书籍: {len(self.books_read)}本 ({books_info})
+📄 阅读章节: {len(self.chapters_read)}个
 ☕ 休息次数: {self.breaks_taken}次 (共{self.total_break_time}秒)
 🚀 平均响应: {self.average_response_time:.2f}秒
 🧾 服务器记入时长: {credited_minutes}分{credited_seconds_rem}秒
@@ -102,15 +118,25 @@ class WeReadSessionManager:
         "s": "36cc0815",
     }
 
-    def __init__(self, config: WeReadConfig, user_config: UserConfig = None):
+    def __init__(
+        self,
+        config: WeReadConfig,
+        user_config: UserConfig = None,
+        http_pool: HttpConnectionPool = None,
+    ):
         self.config = config
         self.user_config = user_config
         self.user_name = user_config.name if user_config else "default"
         self.reading_config = config.reading
+        # 传入共享连接池时复用其连接，关闭会话只释放本会话的客户端（cookie jar）
         self.http_client = HttpClient(
             config.network.timeout, 
             config.network.retry_times, 
-            config.network.rate_limit
+            config.network.rate_limit,
+            pool=http_pool,
+            user=self.user_name,
+            retry_policy=RetryPolicy.from_network_config(config.network),
+            retry_budget=config.network.retry_budget,
         )
         self.reading_manager = SmartReadingManager(self.reading_config)
         self.session_stats = ReadingSession(self.user_name)
@@ -123,6 +149,14 @@ class WeReadSessionManager:
         self.headers = {}
         self.cookies = {}
         self.data = self.DEFAULT_DATA.copy()
+        self.signer = ReadPayloadSigner(self.KEY)
+        # 所有请求路径共用同一个记入时长提取器（同一字段配置的会话之间也共享）
+        self.credited_extractor = get_extractor(config.hack.credited_keys)
+        # 持久化的会话状态（Cookie、阅读位置、当日计数），在会话开始时才加载
+        self.state_store = get_state_store(config.state.file) if config.state.enabled else None
+        self.state: UserState = None
+        # 进程内共享的Cookie生命周期管理（有效期判断、错峰续期、并发刷新合并）
+        self.cookie_lifecycle = get_cookie_lifecycle(config.cookie)
         self.user_ps = None
         self.user_pc = None
         self.user_app_id = None
@@ -131,16 +165,37 @@ class WeReadSessionManager:
         
         self._load_curl_config()
 
-    def _load_curl_config(self):
-        """加载CURL配置"""
+    def reload_user_config(self, user_config: UserConfig):
+        """热重载：换用新的用户配置重新解析CURL，替换请求头、Cookie和设备标识，保留当前阅读位置"""
+        previous = (
+            self.user_config, self.headers, self.cookies, self.data,
+            self.user_ps, self.user_pc, self.user_app_id,
+        )
+        self.user_config = user_config
+        self.data = self.DEFAULT_DATA.copy()
+        try:
+            self._load_curl_config(keep_position=True)
+        except Exception:
+            (
+                self.user_config, self.headers, self.cookies, self.data,
+                self.user_ps, self.user_pc, self.user_app_id,
+            ) = previous
+            logging.warning(f"⚠️ 用户 {self.user_name} 新的CURL配置无效，继续使用原配置")
+            return
+        # 新CURL里的 wr_skey 有效期未知，下次请求前重新刷新
+        self.cookie_lifecycle.forget(self.user_name)
+        self._consecutive_failures = 0
+        print(f"🔄 用户 {self.user_name} 已切换到新的CURL配置")
+
+    def _load_curl_config(self, keep_position: bool = False):
+        """加载CURL配置，keep_position 为 True 时不使用CURL中的书籍/章节覆盖当前阅读位置"""
         curl_content = ""
 
         # 如果是多用户模式，优先使用用户特定的配置
         if self.user_config:
             if self.user_config.file_path and Path(self.user_config.file_path).exists():
                 try:
-                    with open(self.user_config.file_path, "r", encoding="utf-8") as f:
-                        curl_content = f.read().strip()
+                    curl_content = read_curl_file(self.user_config.file_path).strip()
                     print(f"✅ 用户 {self.user_name} 已从文件加载CURL配置: {self.user_config.file_path}")
                 except Exception as e:
                     logging.error(f"❌ 用户 {self.user_name} CURL配置文件读取失败: {e}")
@@ -152,8 +207,7 @@ class WeReadSessionManager:
         if not curl_content:
             if self.config.curl_file_path and Path(self.config.curl_file_path).exists():
                 try:
-                    with open(self.config.curl_file_path, "r", encoding="utf-8") as f:
-                        curl_content = f.read().strip()
+                    curl_content = read_curl_file(self.config.curl_file_path).strip()
                     print(f"✅ 已从全局文件加载CURL配置: {self.config.curl_file_path}")
                 except Exception as e:
                     logging.error(f"❌ 全局CURL配置文件读取失败: {e}")
@@ -192,7 +246,7 @@ class WeReadSessionManager:
                     
                     print(f"✅ 用户 {self.user_name} 已使用CURL中的请求数据")
 
-                    if "b" in curl_data and "c" in curl_data:
+                    if "b" in curl_data and "c" in curl_data and not keep_position:
                         self.reading_manager.set_curl_data(curl_data["b"], curl_data["c"])
                 else:
                     logging.warning(f"⚠️ 用户 {self.user_name} CURL数据缺少必需字段: {missing_fields}")
@@ -210,6 +264,16 @@ class WeReadSessionManager:
 
     async def start_reading_session(self) -> ReadingSession:
         """开始阅读会话"""
+        # 在当前任务中绑定用户，结构化日志中的每条记录都带有 user 字段
+        ACTIVE_SESSIONS.inc()
+        try:
+            with log_context(user=self.user_name):
+                return await self._run_reading_session()
+        finally:
+            ACTIVE_SESSIONS.dec()
+
+    async def _run_reading_session(self) -> ReadingSession:
+        """执行阅读会话主流程"""
         user_info = f" (用户: {self.user_name})" if self.user_config else ""
         print(f"🚀 微信读书阅读机器人启动{user_info}")
         print(f"📋 配置信息: 阅读模式 {self.reading_config.mode}, 目标时长 {self.reading_config.target_duration} 分钟")
@@ -226,8 +290,9 @@ class WeReadSessionManager:
 
         print(f"🎯 本次目标阅读时长: {target_minutes} 分钟")
 
-        # 刷新cookie
-        if not await self._refresh_cookie():
+        # 恢复上次保存的状态，Cookie仍在有效期内时跳过刷新
+        self._restore_state()
+        if not await self._refresh_cookie(force=False):
             raise Exception("Cookie刷新失败，程序终止")
 
         # 确保阅读管理器已初始化（存在可读书籍/章节）
@@ -255,6 +320,10 @@ class WeReadSessionManager:
         credited_seconds = 0
          # 安全限制，避免因持续失败导致无限循环（最多允许达到目标时长的3倍）
         max_wall_seconds = max(target_seconds * 3, target_seconds + 600)
+        # 会话期间在错峰时间点主动续期Cookie
+        cookie_task = asyncio.create_task(
+            self.cookie_lifecycle.keep_fresh(self.user_name, self._refresh_cookie)
+        )
 
         try:
             while credited_seconds < target_seconds and self.session_stats.actual_duration_seconds < max_wall_seconds:
@@ -264,15 +333,18 @@ class WeReadSessionManager:
 
                     if success:
                         self.session_stats.successful_reads += 1
+                        READ_SUCCESSES.inc(user=self.user_name)
                         credited_seconds += credited
                         # 立即将last_time设为现在，下一次rt基于当前时间计算
                         last_time = int(time.time())
+                        self._save_progress(credited)
                         print(f"✅ 阅读成功，已记入 {credited} 秒（累计 {credited_seconds} 秒 / 目标 {target_seconds} 秒）")
                     else:
                         self.session_stats.failed_reads += 1
+                        READ_FAILURES.inc(user=self.user_name)
 
                     # 记录响应时间
-                    self.session_stats.response_times.append(response_time)
+                    self.session_stats.record_response_time(response_time)
 
                     # 更新实际运行时长（wall-clock），无论成功或失败都更新
                     current_time = datetime.now()
@@ -294,6 +366,7 @@ class WeReadSessionManager:
                 except Exception as e:
                     logging.error(f"❌ 阅读请求异常: {e}")
                     self.session_stats.failed_reads += 1
+                    READ_FAILURES.inc(user=self.user_name)
                     await asyncio.sleep(30)
 
             # 完成会话
@@ -304,12 +377,14 @@ class WeReadSessionManager:
             final_delta = self.session_stats.end_time - self.session_stats.start_time
             self.session_stats.actual_duration_seconds = int(final_delta.total_seconds())
             print("🎉 阅读任务完成！")
+            self._save_session_completed()
 
             if credited_seconds < target_seconds:
                 logging.warning(f"⚠️ 未能达到目标的记入时长: 目标 {target_seconds}s, 实际记入 {credited_seconds}s")
 
             return self.session_stats
         finally:
+            cookie_task.cancel()
             await self.http_client.close()
 
     async def _simulate_reading_request(self, last_time: int) -> Tuple[bool, float]:
@@ -320,6 +395,7 @@ class WeReadSessionManager:
         book_id, chapter_id = self.reading_manager.get_next_reading_position()
         self.data["b"] = book_id
         self.data["c"] = chapter_id
+        bind_log_context(book_id=book_id, chapter_id=chapter_id)
 
         # 设置章节索引（ci），如果有的话
         chapter_ci = getattr(self.reading_manager, "current_chapter_ci", None)
@@ -330,16 +406,13 @@ class WeReadSessionManager:
             self.data.pop("ci", None)
 
         # 记录阅读内容
-        if book_id not in self.session_stats.books_read:
-            self.session_stats.books_read.append(book_id)
+        if self.session_stats.books_read.add(book_id):
             book_name = self.reading_manager.book_names_map.get(
                 book_id, f"未知书籍({book_id[:10]}...)"
             )
-            if book_name not in self.session_stats.books_read_names:
-                self.session_stats.books_read_names.append(book_name)
-        
-        if chapter_id not in self.session_stats.chapters_read:
-            self.session_stats.chapters_read.append(chapter_id)
+            self.session_stats.books_read_names.add(book_name)
+
+        self.session_stats.chapters_read.add(chapter_id)
 
         # 确保用户身份标识符的正确性
         if self.user_ps:
@@ -349,17 +422,10 @@ class WeReadSessionManager:
         if self.user_app_id:
             self.data["appId"] = self.user_app_id
 
-        # 更新时间戳
-        current_time = int(time.time())
-        self.data["ct"] = current_time
-        self.data["rt"] = current_time - last_time
-        self.data["ts"] = int(current_time * 1000) + random.randint(0, 1000)
-        self.data["rn"] = random.randint(0, 1000)
-        
-        signature_string = f"{self.data['ts']}{self.data['rn']}{self.KEY}"
-        self.data["sg"] = hashlib.sha256(signature_string.encode()).hexdigest()
+        # 更新时间戳和 sg 签名
+        self.signer.stamp(self.data, last_time)
         # 先计算一个默认的s
-        calculated_s = calculate_hash(encode_data(self.data))
+        calculated_s = self.signer.signature(self.data)
         
         # 如果CURL提供了初始s，先尝试使用该s（有时CURL中的s是正确的）
         initial_s = getattr(self, "_initial_s_from_curl", None)
@@ -370,38 +436,15 @@ class WeReadSessionManager:
                 resp_try, rt_try = await self.http_client.post_raw(
                     self.READ_URL, headers=self.headers, cookies=self.cookies, json_data=self.data
                 )
-                try:
-                    raw_try = resp_try.text
-                except Exception:
-                    raw_try = ""
-                try:
-                    json_try = resp_try.json()
-                except Exception:
-                    json_try = {}
-
-                if bool(json_try.get("succ") or json_try.get("success")):
-                    # 提取记入时长
-                    def _extr(obj):
-                        if not isinstance(obj, dict):
-                            return None
-                        keys = ["addTime", "add_time", "readTime", "read_time", "time", "duration", "inc", "increase", "added", "addedTime"]
-                        for k in keys:
-                            if k in obj and isinstance(obj[k], (int, float)):
-                                return int(obj[k])
-                        for v in obj.values():
-                            if isinstance(v, dict):
-                                f = _extr(v)
-                                if f is not None:
-                                    return f
-                        return None
-
-                    extv = _extr(json_try)
-                    credited_try = extv if extv is not None else int(self.data.get("rt", 0)) if isinstance(self.data.get("rt", 0), (int, float)) else 0
-                    logging.info(f"✅ 使用CURL中的s字段首次尝试被接受，记入: {credited_try} 秒")
+                result_try = evaluate_response(resp_try, self._fallback_credited(), self.credited_extractor)
+
+                if result_try.succ:
+                    logging.info(f"✅ 使用CURL中的s字段首次尝试被接受，记入: {result_try.credited} 秒")
+                    READ_FALLBACKS.inc(user=self.user_name, kind="curl_s")
                     self._consecutive_failures = 0
-                    return True, rt_try, credited_try
-                else:
-                    logging.debug(f"❌ 使用CURL中的s字段尝试失败，继续使用计算的s进行请求 (尝试响应: {json_try} raw: {raw_try})")
+                    return True, rt_try, result_try.credited
+                elif debug_enabled():
+                    logging.debug(f"❌ 使用CURL中的s字段尝试失败，继续使用计算的s进行请求 (尝试响应: {result_try.data} raw: {result_try.raw_text})")
             except Exception as e:
                 logging.debug(f"⚠️ 使用CURL s 字段尝试请求异常: {e}")
 
@@ -409,73 +452,40 @@ class WeReadSessionManager:
         self.data["s"] = calculated_s
 
         try:
-            # 发送请求（使用 post_raw 以便获取原始响应文本）
-            # DEBUG：打印将要发送的请求（脱敏）
-            try:
-                masked_cookies = {
-                    k: (v[:4] + "***" if isinstance(v, str) and len(v) > 4 else "***")
-                    for k, v in self.cookies.items()
-                }
-            except Exception:
-                masked_cookies = {k: "***" for k in self.cookies.keys()}
+            # 发送请求（使用 post_raw 以便获取原始响应）
+            # DEBUG：打印将要发送的请求（脱敏），未开启DEBUG时不构建
+            if debug_enabled():
+                try:
+                    masked_cookies = {
+                        k: (v[:4] + "***" if isinstance(v, str) and len(v) > 4 else "***")
+                        for k, v in self.cookies.items()
+                    }
+                except Exception:
+                    masked_cookies = {k: "***" for k in self.cookies.keys()}
 
-            # 掩码敏感字段并打印请求要点
-            sanitized = {k: ("***" if k in ("ps", "pc") else self.data.get(k)) for k in ("b", "c", "ci", "rt", "ps", "pc")}
-            logging.debug(f"➡️ 发送阅读请求(摘要): {sanitized}, headers={list(self.headers.keys())}, cookies_keys={list(self.cookies.keys())}")
-            logging.debug(f"🔐 Cookies(脱敏): {masked_cookies}")
+                # 掩码敏感字段并打印请求要点
+                sanitized = {k: ("***" if k in ("ps", "pc") else self.data.get(k)) for k in ("b", "c", "ci", "rt", "ps", "pc")}
+                logging.debug(f"➡️ 发送阅读请求(摘要): {sanitized}, headers={list(self.headers.keys())}, cookies_keys={list(self.cookies.keys())}")
+                logging.debug(f"🔐 Cookies(脱敏): {masked_cookies}")
 
             response, response_time = await self.http_client.post_raw(
                 self.READ_URL, headers=self.headers, cookies=self.cookies, json_data=self.data
             )
 
-            # 读取原始文本并尝试解析为JSON
-            try:
-                raw_text = response.text
-            except Exception:
-                raw_text = ""
-
-            try:
-                response_data = response.json()
-            except Exception:
-                logging.debug(f"⚠️ 响应无法解析为JSON，原始响应: {raw_text}")
-                response_data = {}
-
-            logging.debug(f"📕 响应数据: {response_data} (raw: {raw_text})")
+            # 响应体只解析一次，原始文本仅在需要时解码
+            result = evaluate_response(response, self._fallback_credited(), self.credited_extractor)
+            response_data = result.data
+            if debug_enabled():
+                if not result.parsed:
+                    logging.debug(f"⚠️ 响应无法解析为JSON，原始响应: {result.raw_text}")
+                logging.debug(f"📕 响应数据: {response_data} (raw: {result.raw_text})")
 
             # 服务器返回成功标记（succ）通常意味着本次阅读被接受
-            succ_flag = bool(response_data.get("succ") or response_data.get("success"))
-            if succ_flag:
-                # 尝试从响应中提取服务器返回的时长增量（若存在）
-                def _extract_credited(obj):
-                    if not isinstance(obj, dict):
-                        return None
-                    keys = [
-                        "addTime",
-                        "add_time",
-                        "readTime",
-                        "read_time",
-                        "time",
-                        "duration",
-                        "inc",
-                        "increase",
-                        "added",
-                        "addedTime",
-                    ]
-                    for k in keys:
-                        if k in obj and isinstance(obj[k], (int, float)):
-                            return int(obj[k])
-                    for v in obj.values():
-                        if isinstance(v, dict):
-                            found = _extract_credited(v)
-                            if found is not None:
-                                return found
-                    return None
-
-                extracted = _extract_credited(response_data)
-                credited = extracted if extracted is not None else int(self.data.get("rt", 0)) if isinstance(self.data.get("rt", 0), (int, float)) else 0
+            if result.succ:
+                credited = result.credited
 
                 # 如果缺少 synckey，记录并尝试异步修复，但仍然认为本次可能已被记入
-                if "synckey" not in response_data:
+                if not result.has_synckey:
                     logging.warning(f"⚠️ 返回缺少 synckey，尝试异步修复，但仍计为已接受（响应: {response_data}）")
                     try:
                         asyncio.create_task(self._fix_no_synckey())
@@ -488,13 +498,13 @@ class WeReadSessionManager:
                 return True, response_time, credited
 
             # 非succ - 视为失败
-            logging.warning(f"❌ 请求失败或未被接受: {response_data} (raw: {raw_text})")
+            logging.warning(f"❌ 请求失败或未被接受: {response_data} (raw: {result.raw_text})")
             self._consecutive_failures += 1
 
             # On first failure, attempt a fallback using URL-encoded form data (some endpoints expect form-encoded body)
             if self._consecutive_failures == 1:
                 try:
-                    encoded_body = encode_data(self.data)
+                    encoded_body = self.signer.encode(self.data)
                     headers_form = self.headers.copy()
                     headers_form["Content-Type"] = "application/x-www-form-urlencoded"
 
@@ -503,42 +513,17 @@ class WeReadSessionManager:
                         self.READ_URL, headers=headers_form, cookies=self.cookies, data=encoded_body
                     )
 
-                    try:
-                        form_raw = form_resp.text
-                    except Exception:
-                        form_raw = ""
+                    form_result = evaluate_response(form_resp, self._fallback_credited(), self.credited_extractor)
+                    if debug_enabled():
+                        if not form_result.parsed:
+                            logging.debug(f"⚠️ 回退响应无法解析为JSON，原始响应: {form_result.raw_text}")
+                        logging.debug(f"📕 回退响应数据: {form_result.data} (raw: {form_result.raw_text})")
 
-                    try:
-                        form_data = form_resp.json()
-                    except Exception:
-                        logging.debug(f"⚠️ 回退响应无法解析为JSON，原始响应: {form_raw}")
-                        form_data = {}
-
-                    logging.debug(f"📕 回退响应数据: {form_data} (raw: {form_raw})")
-
-                    form_succ = bool(form_data.get("succ") or form_data.get("success"))
-                    if form_succ:
-                        extracted2 = None
-
-                        def _extract_credited2(obj):
-                            if not isinstance(obj, dict):
-                                return None
-                            keys2 = ["addTime", "add_time", "readTime", "read_time", "time", "duration", "inc", "increase", "added", "addedTime"]
-                            for k in keys2:
-                                if k in obj and isinstance(obj[k], (int, float)):
-                                    return int(obj[k])
-                            for v in obj.values():
-                                if isinstance(v, dict):
-                                    found2 = _extract_credited2(v)
-                                    if found2 is not None:
-                                        return found2
-                            return None
-
-                        extracted2 = _extract_credited2(form_data)
-                        credited2 = extracted2 if extracted2 is not None else (int(self.data.get("rt", 0)) if isinstance(self.data.get("rt", 0), (int, float)) else 0)
-                        logging.debug(f"✅ 表单回退请求被接受，计入时长: {credited2} 秒")
+                    if form_result.succ:
+                        logging.debug(f"✅ 表单回退请求被接受，计入时长: {form_result.credited} 秒")
+                        READ_FALLBACKS.inc(user=self.user_name, kind="form")
                         self._consecutive_failures = 0
-                        return True, form_rt, credited2
+                        return True, form_rt, form_result.credited
                     else:
                         logging.debug("🔁 表单回退请求未被接受，继续常规处理")
                 except Exception as e:
@@ -557,7 +542,7 @@ class WeReadSessionManager:
 
             if self._consecutive_failures >= 3:
                 error_msg = (
-                    f"连续{self._consecutive_failures}次阅读请求未被接受，最后响应: {response_data} (raw: {raw_text}). "
+                    f"连续{self._consecutive_failures}次阅读请求未被接受，最后响应: {response_data} (raw: {result.raw_text}). "
                     "请检查CURL请求中是否包含必要的请求数据(appId, ps, pc)或确认Cookie/Headers是否完整。"
                 )
                 logging.error(error_msg)
@@ -576,6 +561,11 @@ class WeReadSessionManager:
             logging.error(f"❌ 请求异常: {e}")
             return False, 0.0, 0
 
+    def _fallback_credited(self) -> int:
+        """响应中没有时长字段时，按本次请求的 rt 记入"""
+        rt = self.data.get("rt", 0)
+        return int(rt) if isinstance(rt, (int, float)) else 0
+
     async def _try_s_variants(self) -> Tuple[bool, float, int]:
         """尝试不同的s字段变体，看是否能让请求被接受。返回 (success, response_time, credited)"""
         # 防止重复尝试
@@ -585,7 +575,7 @@ class WeReadSessionManager:
         self._s_variants_tried = True
 
         # 生成候选s值
-        base = calculate_hash(encode_data(self.data))
+        base = self.signer.signature(self.data)
         candidates = []
         candidates.append(base)
         # 最后8位
@@ -611,42 +601,15 @@ class WeReadSessionManager:
                 resp, rt = await self.http_client.post_raw(
                     self.READ_URL, headers=self.headers, cookies=self.cookies, json_data=self.data
                 )
-                try:
-                    raw = resp.text
-                except Exception:
-                    raw = ""
-                try:
-                    resp_json = resp.json()
-                except Exception:
-                    logging.debug(f"⚠️ s 变体响应非JSON: {raw}")
-                    resp_json = {}
-
-                succ = bool(resp_json.get("succ") or resp_json.get("success"))
-                if succ:
-                    # 提取记入时长
-                    credited = 0
-                    def _ext(obj):
-                        if not isinstance(obj, dict):
-                            return None
-                        keys = ["addTime", "add_time", "readTime", "read_time", "time", "duration", "inc", "increase", "added", "addedTime"]
-                        for k in keys:
-                            if k in obj and isinstance(obj[k], (int, float)):
-                                return int(obj[k])
-                        for v in obj.values():
-                            if isinstance(v, dict):
-                                found = _ext(v)
-                                if found is not None:
-                                    return found
-                        return None
-                    extv = _ext(resp_json)
-                    if extv is not None:
-                        credited = extv
-                    else:
-                        credited = int(self.data.get("rt", 0)) if isinstance(self.data.get("rt", 0), (int, float)) else 0
+                variant_result = evaluate_response(resp, self._fallback_credited(), self.credited_extractor)
+                if not variant_result.parsed and debug_enabled():
+                    logging.debug(f"⚠️ s 变体响应非JSON: {variant_result.raw_text}")
 
-                    logging.info(f"✅ s 变体 {s_variant} 被接受，计入时长: {credited} 秒")
+                if variant_result.succ:
+                    logging.info(f"✅ s 变体 {s_variant} 被接受，计入时长: {variant_result.credited} 秒")
+                    READ_FALLBACKS.inc(user=self.user_name, kind="s_variant")
                     self._consecutive_failures = 0
-                    return True, rt, credited
+                    return True, rt, variant_result.credited
 
             except Exception as e:
                 logging.debug(f"⚠️ s 变体请求异常: {e}")
@@ -659,8 +622,21 @@ class WeReadSessionManager:
 
         return False, 0.0, 0
 
-    async def _refresh_cookie(self) -> bool:
-        """刷新cookie"""
+    async def _refresh_cookie(self, force: bool = True) -> bool:
+        """刷新cookie，force=False 时有效期内的Cookie直接复用；同一用户的并发刷新合并为一次"""
+        fresh = not force and self.cookie_lifecycle.is_fresh(self.user_name)
+        wr_skey = await self.cookie_lifecycle.refresh(self.user_name, self._renew_cookie, force=force)
+        if not wr_skey:
+            return False
+        self.cookies["wr_skey"] = wr_skey
+        if fresh:
+            remaining = int(self.cookie_lifecycle.expires_at(self.user_name) - time.time())
+            COOKIE_REFRESHES.inc(user=self.user_name, result="skipped")
+            print(f"♻️ Cookie仍在有效期内（剩余 {remaining} 秒），跳过刷新")
+        return True
+
+    async def _renew_cookie(self) -> str:
+        """调用续期接口获取新的wr_skey，失败时返回空字符串"""
         print("🍪 刷新cookie...")
 
         try:
@@ -685,16 +661,65 @@ class WeReadSessionManager:
 
             if not new_skey:
                 logging.error("❌ Cookie刷新失败，未找到wr_skey")
-                return False
+                COOKIE_REFRESHES.inc(user=self.user_name, result="failure")
+                return ""
 
             self.cookies["wr_skey"] = new_skey
+            self._save_cookie(new_skey)
+            COOKIE_REFRESHES.inc(user=self.user_name, result="success")
             print(f"✅ Cookie刷新成功，新密钥: {new_skey[:8]}***")
-            return True
+            return new_skey
 
         except Exception as e:
             logging.error(f"❌ Cookie刷新失败: {e}")
-
-        return False
+            COOKIE_REFRESHES.inc(user=self.user_name, result="failure")
+
+        return ""
+
+    def _restore_state(self):
+        """加载保存的会话状态，恢复阅读位置和上次刷新的Cookie"""
+        if not self.state_store:
+            return
+        self.state = self.state_store.get(self.user_name)
+        self.cookie_lifecycle.observe(self.user_name, self.state.wr_skey, self.state.renewed_at)
+
+        # 只恢复到仍在配置或CURL中的书籍章节，避免回到已移除的书
+        chapters = self.reading_manager.book_chapters_map.get(self.state.book_id)
+        if chapters and self.state.chapter_id in chapters:
+            self.reading_manager.set_curl_data(self.state.book_id, self.state.chapter_id, self.state.chapter_ci)
+            print(f"♻️ 用户 {self.user_name} 从上次位置继续阅读: {self.state.book_id[:10]}... / {self.state.chapter_id}")
+
+    def _save_cookie(self, wr_skey: str):
+        """保存刷新得到的Cookie及其有效期"""
+        if not self.state_store:
+            return
+        if self.state is None:
+            self.state = self.state_store.get(self.user_name)
+        now = time.time()
+        self.state.wr_skey = wr_skey
+        self.state.renewed_at = now
+        self.state.expires_at = now + self.config.cookie.ttl
+        self.state_store.save(self.state)
+
+    def _save_progress(self, credited: int):
+        """每次阅读成功后保存当前位置和记入时长，进程中断后可从这里继续"""
+        if not self.state:
+            return
+        self.state.roll_day()
+        self.state.book_id = self.data.get("b", "")
+        self.state.chapter_id = self.data.get("c", "")
+        self.state.chapter_ci = self.data.get("ci")
+        self.state.credited_today += credited
+        self.state.credited_total += credited
+        self.state_store.save(self.state)
+
+    def _save_session_completed(self):
+        """记录完成一次会话"""
+        if not self.state:
+            return
+        self.state.roll_day()
+        self.state.daily_sessions += 1
+        self.state_store.save(self.state)
 
     async def _fix_no_synckey(self):
         """修复synckey问题"""
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import math
+import queue
+import signal
+import threading
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional, Set
+
+from .config import NetworkConfig, UserConfig, WeReadConfig
+from .http_client import HttpConnectionPool
+from .logger import forward_log_records, setup_worker_logging
+from .metrics import registry as metrics_registry
+from .session import ReadingSession, WeReadSessionManager
+
+# 开启指标端点时，工作进程向主进程上报指标快照的间隔（秒）
+METRICS_REPORT_INTERVAL = 5.0
+
+
+@dataclass
+class UserSessionResult:
+    """单个用户阅读会话的执行结果（可跨进程传递）"""
+    name: str
+    stats: Optional[ReadingSession] = None
+    success: bool = False
+    error: str = ""
+
+
+async def run_user_session(
+    config: WeReadConfig,
+    user_config: UserConfig,
+    http_pool: HttpConnectionPool,
+    semaphore: asyncio.Semaphore,
+    is_shutdown: Callable[[], bool],
+    active_managers: Set[WeReadSessionManager] = None,
+) -> Optional[UserSessionResult]:
+    """在并发限制内执行单个用户的阅读会话，收到关闭信号时跳过尚未开始的用户"""
+    if is_shutdown():
+        print("📡 收到关闭信号，跳过后续用户")
+        return None
+
+    async with semaphore:
+        if is_shutdown():
+            return None
+
+        print(f"👤 开始执行用户 {user_config.name} 的阅读会话")
+        session_manager = WeReadSessionManager(config, user_config, http_pool=http_pool)
+        if active_managers is not None:
+            active_managers.add(session_manager)
+
+        try:
+            session_stats = await session_manager.start_reading_session()
+            print(f"📊 用户 {user_config.name} 会话统计:")
+            print(session_stats.get_statistics_summary())
+            return UserSessionResult(user_config.name, session_stats, True)
+        except Exception as e:
+            error_msg = f"❌ 用户 {user_config.name} 阅读会话执行失败: {e}"
+            logging.error(error_msg)
+            return UserSessionResult(user_config.name, None, False, error_msg)
+        finally:
+            if active_managers is not None:
+                active_managers.discard(session_manager)
+
+
+def partition_users(users: List[UserConfig], shards: int) -> List[List[UserConfig]]:
+    """按轮询方式把用户分配到各分片，保证各分片用户数最多相差1"""
+    shards = max(1, min(shards, len(users)))
+    return [users[index::shards] for index in range(shards)]
+
+
+def shard_network_config(network: NetworkConfig, shards: int) -> NetworkConfig:
+    """分片使用的网络配置：主机和全局限速按分片数平均分配（向上取整，不为0时至少为1）
+
+    每个工作进程有独立的限速器，不分配时对同一主机的总请求频率会放大为分片数倍；
+    按用户限速（rate_limit）不受影响，因为每个用户只在一个分片中执行。
+    """
+    def split(limit: int) -> int:
+        return max(1, math.ceil(limit / shards)) if limit > 0 else limit
+
+    return replace(
+        network,
+        host_rate_limit=split(network.host_rate_limit),
+        global_rate_limit=split(network.global_rate_limit),
+    )
+
+
+def _metrics_source(shard_index: int) -> str:
+    return f"shard-{shard_index}"
+
+
+async def _report_metrics(shard_index: int, result_queue):
+    """定期把本进程的指标快照发送给主进程"""
+    while True:
+        await asyncio.sleep(METRICS_REPORT_INTERVAL)
+        result_queue.put(("metrics", (shard_index, metrics_registry.snapshot())))
+
+
+async def _run_shard(
+    shard_index: int, config: WeReadConfig, users: List[UserConfig], concurrency: int, result_queue, shutdown_event
+):
+    """工作进程内的事件循环：独立的连接池，按分片内并发数执行用户会话"""
+    stopping = False
+
+    def is_shutdown() -> bool:
+        return stopping or shutdown_event.is_set()
+
+    def request_stop():
+        nonlocal stopping
+        stopping = True
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, request_stop)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    http_pool = HttpConnectionPool.from_network_config(config.network)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(user_config: UserConfig):
+        result = await run_user_session(config, user_config, http_pool, semaphore, is_shutdown)
+        if result is not None:
+            result_queue.put(("result", result))
+
+    metrics_task = None
+    if config.metrics.enabled:
+        metrics_task = asyncio.create_task(_report_metrics(shard_index, result_queue))
+
+    try:
+        await asyncio.gather(*(run_one(user_config) for user_config in users))
+    finally:
+        logging.info(http_pool.format_stats())
+        await http_pool.close()
+        if metrics_task is not None:
+            metrics_task.cancel()
+            # 结束前上报最终的指标
+            result_queue.put(("metrics", (shard_index, metrics_registry.snapshot())))
+
+
+def _worker_main(
+    shard_index: int,
+    config: WeReadConfig,
+    users: List[UserConfig],
+    concurrency: int,
+    result_queue,
+    log_queue,
+    shutdown_event,
+    log_level: int,
+):
+    """工作进程入口"""
+    # Ctrl+C 由主进程处理并通过 shutdown_event 转达，避免子进程被直接中断
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_worker_logging(log_queue, log_level)
+    try:
+        asyncio.run(_run_shard(shard_index, config, users, concurrency, result_queue, shutdown_event))
+    except Exception as e:
+        logging.error(f"❌ 工作进程 {shard_index} 异常退出: {e}", exc_info=True)
+    finally:
+        result_queue.put(("done", shard_index))
+
+
+class ShardedRunner:
+    """多进程分片执行器
+
+    把 config.users 按轮询分配给多个工作进程，每个进程拥有独立的事件循环和连接池；
+    主进程汇总各用户的 ReadingSession 结果和各进程上报的指标，并在收到关闭信号时通知所有工作进程。
+    """
+
+    def __init__(self, config: WeReadConfig, worker_processes: int):
+        self.config = config
+        self.shards = partition_users(config.users, worker_processes)
+        # 总并发数和主机/全局限速平均分配给各工作进程
+        self.concurrency = max(1, math.ceil(max(1, config.max_concurrent_users) / len(self.shards)))
+        self.shard_config = replace(config, network=shard_network_config(config.network, len(self.shards)))
+
+    async def run(
+        self,
+        is_shutdown: Callable[[], bool],
+        on_result: Callable[[UserSessionResult], None] = None,
+    ) -> List[UserSessionResult]:
+        import multiprocessing
+
+        ctx = multiprocessing.get_context("spawn")
+        result_queue = ctx.Queue()
+        log_queue = ctx.Queue()
+        shutdown_event = ctx.Event()
+
+        log_forwarder = threading.Thread(
+            target=forward_log_records, args=(log_queue,), name="weread-worker-logs", daemon=True
+        )
+        log_forwarder.start()
+
+        processes = [
+            ctx.Process(
+                target=_worker_main,
+                args=(
+                    index,
+                    self.shard_config,
+                    users,
+                    self.concurrency,
+                    result_queue,
+                    log_queue,
+                    shutdown_event,
+                    logging.getLogger().getEffectiveLevel(),
+                ),
+                name=f"weread-worker-{index}",
+                daemon=True,
+            )
+            for index, users in enumerate(self.shards)
+        ]
+        for process in processes:
+            process.start()
+        print(
+            f"🧩 已启动 {len(processes)} 个工作进程，"
+            f"每个进程 {[len(users) for users in self.shards]} 个用户，进程内并发 {self.concurrency}"
+        )
+
+        loop = asyncio.get_running_loop()
+        pending = set(range(len(processes)))
+        results: List[UserSessionResult] = []
+
+        def handle(message):
+            kind, payload = message
+            if kind == "result":
+                results.append(payload)
+                if on_result is not None:
+                    on_result(payload)
+            elif kind == "metrics":
+                shard_index, snapshot = payload
+                metrics_registry.merge_remote(_metrics_source(shard_index), snapshot)
+            elif kind == "done":
+                finish(payload)
+
+        def finish(index: int):
+            pending.discard(index)
+            metrics_registry.finish_remote(_metrics_source(index))
+
+        try:
+            while pending:
+                if is_shutdown() and not shutdown_event.is_set():
+                    print("📡 通知所有工作进程停止启动新的会话...")
+                    shutdown_event.set()
+
+                try:
+                    message = await loop.run_in_executor(None, result_queue.get, True, 1.0)
+                except queue.Empty:
+                    # 异常退出（未发送完成消息）的工作进程不再等待
+                    for index in list(pending):
+                        if not processes[index].is_alive():
+                            while True:
+                                try:
+                                    handle(result_queue.get_nowait())
+                                except queue.Empty:
+                                    break
+                            if index in pending:
+                                finish(index)
+                                logging.error(
+                                    f"❌ 工作进程 {index} 异常退出 (exitcode={processes[index].exitcode})"
+                                )
+                    continue
+                handle(message)
+        finally:
+            if not shutdown_event.is_set():
+                shutdown_event.set()
+            for process in processes:
+                await loop.run_in_executor(None, process.join, 10)
+                if process.is_alive():
+                    process.terminate()
+            log_queue.put(None)
+            await loop.run_in_executor(None, log_forwarder.join, 5)
+
+        return results
@@ -0,0 +1,72 @@
+import time
+import random
+import hashlib
+import urllib.parse
+from typing import Any, Dict, List, Tuple
+
+from .utils import calculate_hash
+
+
+# 每次请求都会变化的字段，每次重新编码；其余字段按值缓存编码结果
+DYNAMIC_FIELDS = frozenset({"ct", "rt", "ts", "rn", "sg"})
+
+
+class ReadPayloadSigner:
+    """阅读请求签名引擎
+
+    与 encode_data + calculate_hash 结果完全一致，但：
+    - 静态字段（appId、b、c、ps、pc 等）的 "k=v" 编码结果按值缓存，只在换书/换章时重新编码
+    - 字段排序结果按字段集合缓存
+    - 动态字段（ct、rt、ts、rn、sg）为整数或十六进制串时跳过 URL 编码
+    - sg 使用预先编码的 KEY 字节计算
+    """
+
+    def __init__(self, key: str):
+        self._key_bytes = key.encode()
+        self._pairs: Dict[str, Tuple[Any, str]] = {}
+        self._orders: Dict[Tuple[str, ...], List[str]] = {}
+
+    def stamp(self, data: Dict[str, Any], last_time: int, current_time: int = None) -> Dict[str, Any]:
+        """写入本次请求的时间戳、随机数和 sg 签名"""
+        if current_time is None:
+            current_time = int(time.time())
+        ts = int(current_time * 1000) + random.randint(0, 1000)
+        rn = random.randint(0, 1000)
+        data["ct"] = current_time
+        data["rt"] = current_time - last_time
+        data["ts"] = ts
+        data["rn"] = rn
+        data["sg"] = self.sign_sg(ts, rn)
+        return data
+
+    def sign_sg(self, ts: int, rn: int) -> str:
+        return hashlib.sha256(f"{ts}{rn}".encode() + self._key_bytes).hexdigest()
+
+    def encode(self, data: Dict[str, Any]) -> str:
+        """按键排序并 URL 编码，等价于 utils.encode_data"""
+        keys = tuple(data)
+        order = self._orders.get(keys)
+        if order is None:
+            order = self._orders[keys] = sorted(keys)
+
+        parts = []
+        for k in order:
+            value = data[k]
+            if k in DYNAMIC_FIELDS:
+                parts.append(self._encode_pair(k, value))
+                continue
+            cached = self._pairs.get(k)
+            if cached is None or type(cached[0]) is not type(value) or cached[0] != value:
+                cached = self._pairs[k] = (value, self._encode_pair(k, value))
+            parts.append(cached[1])
+        return "&".join(parts)
+
+    def signature(self, data: Dict[str, Any]) -> str:
+        """计算请求的 s 字段"""
+        return calculate_hash(self.encode(data))
+
+    @staticmethod
+    def _encode_pair(k: str, value: Any) -> str:
+        if type(value) is int:
+            return f"{k}={value}"
+        return f"{k}={urllib.parse.quote(str(value), safe='')}"
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+# 首次使用时才导入的依赖（yaml 在加载配置时导入，其余取决于启动模式与配置）
+DEFERRED_MODULES = ("croniter", "yaml", "sqlite3", "multiprocessing", "numpy", "watchdog")
+
+# 在子进程中执行：导入应用并加载一次配置，分别计时
+_PROFILE_CODE = """
+import contextlib, io, sys, time
+start = time.perf_counter()
+import weread_bot.app
+imported = time.perf_counter()
+from weread_bot.config_manager import ConfigManager
+with contextlib.redirect_stdout(io.StringIO()):
+    ConfigManager(sys.argv[1], None if sys.argv[2] == "-" else sys.argv[2])
+loaded = time.perf_counter()
+print((imported - start) * 1000, (loaded - imported) * 1000)
+"""
+
+
+class ImportRecord(NamedTuple):
+    """-X importtime 的一行：模块名、嵌套深度、自身与累计耗时（微秒）"""
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """解析 python -X importtime 输出到 stderr 的内容"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 表头
+        name = parts[2].rstrip()
+        module = name.lstrip(" ")
+        # 顶层模块前有1个空格，每深一层多2个空格
+        depth = max(0, (len(name) - len(module) - 1) // 2)
+        records.append(ImportRecord(module, depth, self_us, cumulative_us))
+    return records
+
+
+def profile_startup(config_path: str, cache_path: Optional[str] = None) -> str:
+    """在 -X importtime 子进程中重放启动过程，返回耗时分析报告"""
+    env = dict(os.environ)
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (package_root, env.get("PYTHONPATH"))))
+    command = [
+        sys.executable, "-X", "importtime", "-c", _PROFILE_CODE,
+        config_path, "-" if cache_path is None else cache_path,
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"启动耗时分析失败: {errors[-1] if errors else result.returncode}")
+
+    import_ms, config_ms = (float(value) for value in result.stdout.split()[-2:])
+    records = parse_importtime(result.stderr)
+    return format_report(records, import_ms, config_ms, config_path)
+
+
+def format_report(
+    records: List[ImportRecord], import_ms: float, config_ms: float, config_path: str, top: int = 15
+) -> str:
+    """生成报告：weread_bot 各模块累计耗时、自身耗时最多的模块和按需导入的依赖"""
+    imported = {record.name.split(".")[0] for record in records}
+    lines = [
+        "⏱️ 启动耗时分析 (python -X importtime)",
+        f"  📦 导入 weread_bot.app: {import_ms:.1f} 毫秒",
+        f"  ⚙️  加载配置 ({config_path}): {config_ms:.1f} 毫秒",
+        "",
+        "  weread_bot 模块（累计，含其导入的依赖）:",
+    ]
+    own = sorted(
+        (r for r in records if r.name.startswith("weread_bot")),
+        key=lambda r: r.cumulative_us, reverse=True,
+    )
+    lines += [f"    {r.cumulative_us / 1000:8.1f} 毫秒  {r.name}" for r in own]
+
+    lines += ["", f"  自身耗时最多的 {top} 个模块:"]
+    heaviest = sorted(records, key=lambda r: r.self_us, reverse=True)[:top]
+    lines += [f"    {r.self_us / 1000:8.1f} 毫秒  {r.name}" for r in heaviest]
+
+    deferred = [name for name in DEFERRED_MODULES if name not in imported]
+    loaded = [name for name in DEFERRED_MODULES if name in imported]
+    lines += ["", f"  ⏳ 按需导入（本次启动未加载）: {', '.join(deferred) or '无'}"]
+    if loaded:
+        lines.append(f"  📥 本次启动已加载: {', '.join(loaded)}")
+    return "\n".join(lines)
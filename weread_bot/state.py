@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+@dataclass
+class UserState:
+    """单个用户的持久化会话状态"""
+    user: str
+    wr_skey: str = ""
+    renewed_at: float = 0.0
+    expires_at: float = 0.0
+    book_id: str = ""
+    chapter_id: str = ""
+    chapter_ci: Optional[int] = None
+    daily_date: str = ""
+    daily_sessions: int = 0
+    credited_today: int = 0
+    credited_total: int = 0
+    updated_at: float = 0.0
+
+    def roll_day(self, today: str = None):
+        """跨天时清零当日计数"""
+        today = today or date.today().isoformat()
+        if self.daily_date != today:
+            self.daily_date = today
+            self.daily_sessions = 0
+            self.credited_today = 0
+
+
+_COLUMNS = tuple(f.name for f in fields(UserState))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_state (
+    user TEXT PRIMARY KEY,
+    wr_skey TEXT,
+    renewed_at REAL,
+    expires_at REAL,
+    book_id TEXT,
+    chapter_id TEXT,
+    chapter_ci INTEGER,
+    daily_date TEXT,
+    daily_sessions INTEGER,
+    credited_today INTEGER,
+    credited_total INTEGER,
+    updated_at REAL
+)
+"""
+
+_UPSERT = (
+    f"INSERT OR REPLACE INTO user_state ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+)
+
+
+class StateStore:
+    """基于 SQLite 的用户会话状态存储
+
+    首次访问时才打开数据库并一次性读入所有用户状态，之后的读取都走内存；
+    每次保存立即写入（WAL 模式），多个工作进程可以共用同一个数据库文件。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional["sqlite3.Connection"] = None
+        self._states: Optional[Dict[str, UserState]] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> "sqlite3.Connection":
+        # 未启用状态持久化时不导入 sqlite3
+        import sqlite3
+
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> Dict[str, UserState]:
+        import sqlite3
+
+        if self._states is None:
+            try:
+                rows = self._connect().execute(f"SELECT {', '.join(_COLUMNS)} FROM user_state").fetchall()
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 会话状态加载失败，本次运行从空状态开始: {e}")
+                rows = []
+            self._states = {row[0]: UserState(*row) for row in rows}
+            logging.debug(f"💾 已从 {self.path} 加载 {len(self._states)} 个用户的会话状态")
+        return self._states
+
+    def get(self, user: str) -> UserState:
+        """获取用户状态，不存在时返回新的空状态（不写入）"""
+        with self._lock:
+            state = self._load().get(user)
+            return UserState(**asdict(state)) if state else UserState(user)
+
+    def save(self, state: UserState):
+        """保存用户状态"""
+        import sqlite3
+
+        state.updated_at = time.time()
+        with self._lock:
+            self._load()[state.user] = UserState(**asdict(state))
+            try:
+                conn = self._connect()
+                conn.execute(_UPSERT, tuple(getattr(state, name) for name in _COLUMNS))
+                conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ 会话状态保存失败 ({state.user}): {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_stores: Dict[str, StateStore] = {}
+
+
+def get_state_store(path: str) -> StateStore:
+    """获取指定路径的共享状态存储（每个进程一个实例）"""
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = StateStore(path)
+    return store
@@ -0,0 +1,149 @@
+import math
+from typing import Dict, Hashable, Iterable, Iterator, List
+
+
+class RunningStats:
+    """Welford 在线算法：常数内存计算均值、方差、最小值和最大值"""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def __getstate__(self):
+        return (self.count, self.mean, self._m2, self.min, self.max)
+
+    def __setstate__(self, state):
+        self.count, self.mean, self._m2, self.min, self.max = state
+
+
+class P2Quantile:
+    """P² 算法流式分位数估计（Jain & Chlamtac），只保存5个标记点"""
+
+    __slots__ = ("q", "_initial", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, q: float):
+        self.q = q
+        self._initial: List[float] = []
+        self._heights: List[float] = []
+        self._positions: List[float] = []
+        self._desired: List[float] = []
+        self._increments: List[float] = []
+
+    def add(self, value: float):
+        if not self._heights:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                q = self.q
+                self._heights = sorted(self._initial)
+                self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+                self._desired = [1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0]
+                self._increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+                self._initial = []
+            return
+
+        h, n = self._heights, self._positions
+        if value < h[0]:
+            h[0] = value
+            k = 0
+        elif value >= h[4]:
+            h[4] = value
+            k = 3
+        else:
+            k = 0
+            while k < 3 and value >= h[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if h[i - 1] < candidate < h[i + 1]:
+                    h[i] = candidate
+                else:
+                    h[i] = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        if self._heights:
+            return self._heights[2]
+        if not self._initial:
+            return 0.0
+        ordered = sorted(self._initial)
+        return ordered[min(len(ordered) - 1, int(round(self.q * (len(ordered) - 1))))]
+
+    def __getstate__(self):
+        return (self.q, self._initial, self._heights, self._positions, self._desired, self._increments)
+
+    def __setstate__(self, state):
+        self.q, self._initial, self._heights, self._positions, self._desired, self._increments = state
+
+
+class OrderedSet:
+    """保持插入顺序的集合，O(1) 成员判断"""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Iterable[Hashable] = ()):
+        self._items: Dict[Hashable, None] = dict.fromkeys(items)
+
+    def add(self, item: Hashable) -> bool:
+        """添加元素，返回是否为新元素"""
+        if item in self._items:
+            return False
+        self._items[item] = None
+        return True
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __getstate__(self):
+        return list(self._items)
+
+    def __setstate__(self, state):
+        self._items = dict.fromkeys(state)
@@ -5,7 +5,29 @@ import random
 import hashlib
 import logging
 import urllib.parse
-from typing import Tuple, Dict, Any
+from functools import reduce
+from itertools import cycle
+from operator import lshift, xor
+from typing import Tuple, Dict, Any, List, Sequence
+
+from .curl import ParsedCurlCache, clone_parsed, parse_curl_tokens, tokenize_curl
+
+# NumPy 只有 calculate_hash_many 使用，首次调用时才导入（导入耗时约 0.1 秒）
+np = None
+_numpy_checked = False
+
+
+def load_numpy():
+    """导入并返回 NumPy，未安装时返回 None"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
 
 
 class RandomHelper:
@@ -29,8 +51,33 @@ class RandomHelper:
 
 
 class CurlParser:
+    # 所有会话共享的解析结果缓存，同一内容只解析一次
+    cache = ParsedCurlCache()
+
     @staticmethod
     def parse_curl_command(curl_command: str) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
+        """解析curl命令，返回 (headers, cookies, data) 的副本，调用方可以随意修改"""
+        key = hashlib.blake2b(curl_command.encode("utf-8"), digest_size=16).digest()
+        parsed = CurlParser.cache.get(key)
+        if parsed is None:
+            parsed = CurlParser._parse(curl_command)
+            CurlParser.cache.put(key, parsed)
+        return clone_parsed(parsed)
+
+    @staticmethod
+    def _parse(curl_command: str) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
+        try:
+            parsed = parse_curl_tokens(tokenize_curl(curl_command))
+        except ValueError as e:
+            logging.debug(f"curl命令无法按shell规则拆分({e})，回退为正则解析")
+            return CurlParser._parse_with_regex(curl_command)
+        # 引号错位的命令可能拆分成功但什么也提取不到，此时再用正则尝试
+        if not any(parsed):
+            return CurlParser._parse_with_regex(curl_command)
+        return parsed
+
+    @staticmethod
+    def _parse_with_regex(curl_command: str) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
         headers_temp = {}
 
         # 支持单引号和双引号
@@ -82,20 +129,106 @@ def encode_data(data: dict) -> str:
     return "&".join(encoded_pairs)
 
 
+# calculate_hash 中两路累加的移位量：第一路固定为 1,3,...,29 循环，
+# 第二路从 (length-1)%30 开始每次递减2（模30），周期均为15
+_SHIFT_PERIOD = 15
+_ODD_SHIFTS = tuple(range(1, 30, 2))
+_DESC_SHIFTS = tuple(tuple((start - 2 * k) % 30 for k in range(_SHIFT_PERIOD)) for start in range(30))
+
+
+def _xor_fold(data: bytes, shifts: Tuple[int, ...]) -> int:
+    """异或 data[i] << shifts[i % 15]：先按15字节分组整体异或，再对每个字节移位一次"""
+    pad = -len(data) % _SHIFT_PERIOD
+    if pad:
+        data += bytes(pad)
+    # 整个字节串视为大整数，按分组数折半异或，直到只剩一个分组
+    folded = int.from_bytes(data, "big")
+    chunks = len(data) // _SHIFT_PERIOD
+    while chunks > 1:
+        high = chunks // 2
+        low_bits = (chunks - high) * _SHIFT_PERIOD * 8
+        folded = (folded >> low_bits) ^ (folded & ((1 << low_bits) - 1))
+        chunks -= high
+    result = 0
+    for byte, shift in zip(folded.to_bytes(_SHIFT_PERIOD, "big"), shifts):
+        result ^= byte << shift
+    return result
+
+
 def calculate_hash(input_string: str) -> str:
+    # 0x7FFFFFFF 掩码对异或满足分配律，逐步掩码等价于对全部移位值异或后再掩码一次，
+    # 且移位量以15为周期，因此可以先分组异或再移位，结果与逐字符循环完全一致
     _7032f5 = 0x15051505
     _cc1055 = _7032f5
     length = len(input_string)
-    _19094e = length - 1
 
-    while _19094e > 0:
-        char_code = ord(input_string[_19094e])
-        shift_amount = (length - _19094e) % 30
-        _7032f5 = 0x7FFFFFFF & (_7032f5 ^ char_code << shift_amount)
-
-        prev_char_code = ord(input_string[_19094e - 1])
-        prev_shift_amount = _19094e % 30
-        _cc1055 = 0x7FFFFFFF & (_cc1055 ^ prev_char_code << prev_shift_amount)
-        _19094e -= 2
+    if length > 1:
+        second_shifts = _DESC_SHIFTS[(length - 1) % 30]
+        if input_string.isascii():
+            # 请求参数经过URL编码，总是ASCII
+            raw = input_string.encode("ascii")
+            _7032f5 ^= _xor_fold(raw[length - 1:0:-2], _ODD_SHIFTS)
+            _cc1055 ^= _xor_fold(raw[length - 2::-2], second_shifts)
+        else:
+            _7032f5 = reduce(xor, map(lshift, map(ord, input_string[length - 1:0:-2]), cycle(_ODD_SHIFTS)), _7032f5)
+            _cc1055 = reduce(xor, map(lshift, map(ord, input_string[length - 2::-2]), cycle(second_shifts)), _cc1055)
+        _7032f5 &= 0x7FFFFFFF
+        _cc1055 &= 0x7FFFFFFF
 
     return hex(_7032f5 + _cc1055)[2:].lower()
+
+
+# 批量计算时每批处理的字符串数量，限制填充矩阵的内存占用
+HASH_BATCH_SIZE = 2048
+
+
+def calculate_hash_many(input_strings: Sequence[str]) -> List[str]:
+    """批量计算 calculate_hash，结果与逐个调用完全一致
+
+    安装了 NumPy 时把一批字符串右对齐填充为码点矩阵，用数组运算完成分组异或、移位和掩码；
+    未安装时回退为逐个调用 calculate_hash。
+    """
+    if len(input_strings) < 2 or load_numpy() is None:
+        return [calculate_hash(s) for s in input_strings]
+
+    results: List[str] = []
+    for start in range(0, len(input_strings), HASH_BATCH_SIZE):
+        results.extend(_calculate_hash_batch(input_strings[start:start + HASH_BATCH_SIZE]))
+    return results
+
+
+def _calculate_hash_batch(input_strings: Sequence[str]) -> List[str]:
+    # 按字符到末尾的距离 d（末字符 d=1）分析：
+    #   第一路取 d 为奇数且下标 i>0 的字符，移位 d%30
+    #   第二路取 d 为偶数的字符，移位 (length+1-d)%30
+    # 移位只取决于 d 模30的余数，因此先把同余的码点异或到一起，再对30个分组各移位一次
+    count = len(input_strings)
+    lengths = np.fromiter((len(s) for s in input_strings), dtype=np.int64, count=count)
+    width = max(30, -(-int(lengths.max()) // 30) * 30)
+
+    # 反转后拼接，字符串内偏移即 d-1
+    codes = np.frombuffer("".join(s[::-1] for s in input_strings).encode("utf-32-le"), dtype=np.uint32)
+    ends = np.cumsum(lengths)
+    rows = np.repeat(np.arange(count), lengths)
+    offsets = np.arange(codes.size) - np.repeat(ends - lengths, lengths)
+
+    matrix = np.zeros((count, width), dtype=np.int64)
+    matrix[rows, offsets] = codes
+    # groups[:, k] 为所有 d ≡ k+1 (mod 30) 的码点异或
+    groups = np.bitwise_xor.reduce(matrix.reshape(count, width // 30, 30), axis=1)
+
+    first_groups = groups[:, 0::2]
+    second_groups = groups[:, 1::2]
+
+    # 奇数长度时 d=length 对应下标0，不属于第一路，从所在分组中异或掉
+    odd = (lengths % 2) == 1
+    if odd.any():
+        first_groups[odd, ((lengths[odd] - 1) % 30) // 2] ^= codes[ends[odd] - 1]
+
+    first_shifts = np.arange(1, 30, 2, dtype=np.int64)[None, :]
+    second_shifts = (lengths[:, None] - np.arange(1, 30, 2, dtype=np.int64)[None, :]) % 30
+
+    # 码点最多21位，左移不超过29位，int64 不会溢出；先掩码再异或与逐步掩码等价
+    first_hash = np.bitwise_xor.reduce((first_groups << first_shifts) & 0x7FFFFFFF, axis=1) ^ 0x15051505
+    second_hash = np.bitwise_xor.reduce((second_groups << second_shifts) & 0x7FFFFFFF, axis=1) ^ 0x15051505
+    return [hex(a + b)[2:] for a, b in zip(first_hash.tolist(), second_hash.tolist())]